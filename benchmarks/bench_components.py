@@ -0,0 +1,107 @@
+"""Benchmark for the memory taken by the components of big netlists, and for the time taken by the passes over their
+topology (parsing, condensing the equivalent components, building the node graph and finding the direction of each
+component in the loops). None of these passes solve anything, so they run on netlists with up to 100,000 components.
+The netlists are parsed from a file, and the time to just read the file is shown alongside. Run it with:
+
+    python benchmarks/bench_components.py
+"""
+
+import argparse
+import gc
+import math
+import os
+import tempfile
+import time
+import tracemalloc
+
+from generators import GENERATORS
+from rtds_circuit_analysis.equivalent_circuit import condense_circuit
+from rtds_circuit_analysis.parse_netlist import parse_components
+from rtds_circuit_analysis.solve_circuit import find_direction_sequence, find_loops, find_node_graph
+
+
+def components_memory(lines: list[str]) -> tuple[list, float]:
+    """Parses the netlist, measuring the memory taken by the components (sympy caches its values, so they are parsed
+    once before measuring).
+
+    Args:
+        lines (list[str]): The lines for the netlist.
+
+    Returns:
+        tuple[list, float]: The components, and the memory they take (in bytes, per component).
+    """
+    parse_components(lines, None)
+    gc.collect()
+    tracemalloc.start()
+    components, _ = parse_components(lines, None)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return components, memory / len(components)
+
+
+def read_file(path: str) -> int:
+    """Reads a file line by line, without parsing anything.
+
+    Args:
+        path (str): The path for the file.
+
+    Returns:
+        int: Number of lines.
+    """
+    with open(path, encoding="utf-8") as file:
+        return sum(1 for _ in file)
+
+
+def best_time(function, repeat: int) -> float:
+    """Finds the best time (out of a few runs) for a function.
+
+    Args:
+        function: The function, without arguments.
+        repeat (int): Number of runs.
+
+    Returns:
+        float: Best time, in seconds.
+    """
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark for the memory and topology passes over big netlists")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1000, 10000, 100000])
+    parser.add_argument("--circuits", nargs="+", choices=list(GENERATORS), default=["rlc_ladder", "storage_banks"])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(
+        f"{'circuit':<14} {'components':>10} {'bytes/comp':>11} {'read (s)':>9} {'parse (s)':>10} {'condense (s)':>13} "
+        f"{'graph (s)':>10} {'directions (s)':>15}"
+    )
+    directory = tempfile.TemporaryDirectory()
+    for name in args.circuits:
+        for size in args.sizes:
+            # Every generator adds two or three components for each unit of size
+            lines = GENERATORS[name](max(1, size // 3), True)
+            path = os.path.join(directory.name, f"{name}_{size}.cir")
+            with open(path, "w", encoding="utf-8") as file:
+                file.write("\n".join(lines) + "\n")
+            components, memory = components_memory(lines)
+            read = best_time(lambda: read_file(path), args.repeat)
+            parse = best_time(lambda: parse_components(path, None), args.repeat)
+            condense = best_time(lambda: condense_circuit(list(components)), args.repeat)
+            graph = best_time(lambda: find_node_graph(components), args.repeat)
+            loops = find_loops(components, "fundamental")
+            directions = best_time(lambda: [find_direction_sequence(loop) for loop in loops], args.repeat)
+            print(
+                f"{name:<14} {len(components):>10} {memory:>11.0f} {read:>9.4f} {parse:>10.4f} {condense:>13.4f} "
+                f"{graph:>10.4f} {directions:>15.4f}"
+            )
+    directory.cleanup()
+
+
+if __name__ == "__main__":
+    main()
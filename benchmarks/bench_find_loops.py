@@ -0,0 +1,62 @@
+"""Benchmark for the time taken to find the loops of a circuit, for each loop strategy.
+
+The circuits are square resistor grids (mesh-like circuits are the worst case for the minimum cycle basis), with sizes
+from 10 to 10,000 components. Run it with:
+
+    python benchmarks/bench_find_loops.py
+"""
+
+import argparse
+import math
+import time
+
+from generators import grid_side, resistor_grid
+from rtds_circuit_analysis.parse_netlist import parse_components
+from rtds_circuit_analysis.solve_circuit import find_loops
+
+
+def time_find_loops(components: list, strategy: str, repeat: int) -> float:
+    """Finds the best time (out of a few runs) to find the loops for a circuit.
+
+    Args:
+        components (list): List of components for the circuit.
+        strategy (str): The loop strategy.
+        repeat (int): Number of runs.
+
+    Returns:
+        float: Best time, in seconds.
+    """
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        find_loops(components, strategy)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark for the loop strategies in find_loops")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[10, 30, 100, 300, 1000, 3000, 10000])
+    parser.add_argument(
+        "--max-minimum",
+        type=int,
+        default=3000,
+        help="Largest circuit (in components) to run the minimum strategy for, since it scales poorly",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'components':>10} {'loops':>7} {'minimum (s)':>12} {'fundamental (s)':>16}")
+    for size in args.sizes:
+        components, _ = parse_components(resistor_grid(grid_side(size)), None)
+        fundamental = time_find_loops(components, "fundamental", args.repeat)
+        loops = len(find_loops(components, "fundamental"))
+        if len(components) <= args.max_minimum:
+            minimum = f"{time_find_loops(components, 'minimum', 1):12.4f}"
+        else:
+            minimum = f"{'skipped':>12}"
+        print(f"{len(components):>10} {loops:>7} {minimum} {fundamental:16.4f}")
+
+
+if __name__ == "__main__":
+    main()
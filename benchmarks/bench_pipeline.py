@@ -0,0 +1,236 @@
+"""Benchmark for each stage of the pipeline (from parsing the netlist to writing the Vitis code), for circuits of
+growing size, built by the generators in ``generators.py``.
+
+The results are written as JSON, so two runs can be compared, and the regressions found. Run it with:
+
+    python benchmarks/bench_pipeline.py --output results.json
+    python benchmarks/bench_pipeline.py --output new.json --compare results.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+
+import networkx as nx
+import sympy as sp
+from generators import GENERATORS
+
+from rtds_circuit_analysis import Circuit
+from rtds_circuit_analysis.diference_equations import differential_to_difference
+from rtds_circuit_analysis.equivalent_circuit import condense_circuit, expand_circuit
+from rtds_circuit_analysis.mna import find_mna_solutions
+from rtds_circuit_analysis.numeric import clean_results, find_numeric_solutions
+from rtds_circuit_analysis.parse_data import parse_data
+from rtds_circuit_analysis.parse_netlist import parse_components
+from rtds_circuit_analysis.solve_circuit import (
+    associate_values,
+    find_component_voltages,
+    find_current_equations,
+    find_currents,
+    find_incidence_matrix,
+    find_loop_equations,
+    find_loops,
+    find_node_graph,
+    find_node_voltages,
+    find_states,
+    find_unknowns,
+    simplify_results,
+)
+from rtds_circuit_analysis.state_space import discretize_state_space, find_inputs, find_state_space
+from rtds_vitis.vitis_code import print_vitis_code
+
+STAGES = (
+    "parse_components",
+    "condense_circuit",
+    "find_loops",
+    "linsolve",
+    "simplify_results",
+    "differential_to_difference",
+    "print_vitis_code",
+)
+
+
+class StageTimer:
+    """Measures the time taken by each stage, in seconds."""
+
+    def __init__(self):
+        self.times = {}
+
+    @contextlib.contextmanager
+    def __call__(self, stage: str):
+        start = time.perf_counter()
+        yield
+        self.times[stage] = self.times.get(stage, 0) + time.perf_counter() - start
+
+
+def run_pipeline(lines: list[str], time_step: str, solver: str, numeric: bool) -> dict[str, float]:
+    """Runs every stage of the pipeline for a netlist, the same way :class:`~rtds_circuit_analysis.Circuit` does.
+
+    Args:
+        lines (list[str]): The lines for the netlist.
+        time_step (str): The time step for the circuit.
+        solver (str): The solver ("kirchhoff" or "mna").
+        numeric (bool): If the circuit is solved through the numeric engine.
+
+    Returns:
+        dict[str, float]: The time for each stage that was run.
+    """
+    timer = StageTimer()
+
+    with timer("parse_components"):
+        components, time_step = parse_components(lines, time_step)
+        parse_data(components)
+
+    with timer("condense_circuit"):
+        circuit = condense_circuit(list(components))
+        node_graph = find_node_graph(circuit)
+
+    if numeric:
+        with timer("linsolve"):
+            solutions = find_numeric_solutions(circuit)
+    elif solver == "mna":
+        with timer("linsolve"):
+            solutions = find_mna_solutions(circuit)
+    else:
+        with timer("find_loops"):
+            loops = find_loops(circuit)
+        with timer("linsolve"):
+            equations = find_loop_equations(loops)
+            equations += find_current_equations(circuit, find_incidence_matrix(node_graph))
+            solutions = list(sp.linsolve(equations, *find_unknowns(circuit)))[0]
+
+    with timer("simplify_results"):
+        associate_values(circuit, solutions, numeric)
+        states = find_states(circuit)
+        circuit = expand_circuit(circuit)
+        results = (
+            find_currents(circuit),
+            find_component_voltages(circuit),
+            find_node_voltages(circuit, nx.bfs_edges(node_graph.to_undirected(), "0")),
+            states,
+        )
+        (clean_results if numeric else simplify_results)(*results)
+
+    if not states:
+        return timer.times
+
+    with timer("differential_to_difference"):
+        if numeric:
+            state_space = find_state_space(states, results[2], find_inputs(components), numeric=True)
+            forward = discretize_state_space(state_space, "forward", float(time_step))
+            discretize_state_space(state_space, "backward", float(time_step))
+            discretize_state_space(state_space, "trapezoidal", float(time_step))
+        else:
+            forward, _, _ = differential_to_difference(states, time_step)
+
+    with timer("print_vitis_code"):
+        # The solutions from the previous stages are reused, so only the code generation is measured
+        solved = Circuit("\n".join(lines), str(time_step), solver, numeric)
+        solved.__dict__.update(states=states, node_voltages=results[2], forward=forward)
+        args = argparse.Namespace(filepath="benchmark.cir", fixed=32, point=16, forward=True, backward=False, cse=False)
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            print_vitis_code(solved, args)
+
+    return timer.times
+
+
+def metadata(args: argparse.Namespace) -> dict:
+    """Info about the machine and the options for the run, so runs can be compared fairly.
+
+    Args:
+        args (argparse.Namespace): The arguments for the benchmark.
+
+    Returns:
+        dict: The info.
+    """
+    return {
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sympy": sp.__version__,
+        "machine": platform.machine(),
+        "solver": args.solver,
+        "numeric": args.numeric,
+        "time_step": args.time_step,
+    }
+
+
+def compare(results: list[dict], previous: list[dict], threshold: float) -> list[str]:
+    """Finds the stages that got slower than in a previous run.
+
+    Args:
+        results (list[dict]): The results for this run.
+        previous (list[dict]): The results for the previous run.
+        threshold (float): Ratio between the new and the old time, above which a stage is a regression.
+
+    Returns:
+        list[str]: A description for each regression.
+    """
+    # Times this small are mostly noise
+    minimum_time = 0.01
+    previous = {(result["generator"], result["size"]): result["stages"] for result in previous}
+    regressions = []
+    for result in results:
+        old_stages = previous.get((result["generator"], result["size"]), {})
+        for stage, new_time in result["stages"].items():
+            old_time = old_stages.get(stage)
+            if old_time is None or max(old_time, new_time) < minimum_time:
+                continue
+            if new_time > threshold * old_time:
+                regressions.append(
+                    f"{result['generator']} (size {result['size']}) {stage}: {old_time:.4f}s -> {new_time:.4f}s"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark for each stage of the pipeline")
+    parser.add_argument("--generators", nargs="+", choices=list(GENERATORS), default=list(GENERATORS))
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--solver", choices=["kirchhoff", "mna"], default="kirchhoff")
+    parser.add_argument("--numeric", action="store_true", help="Gives numeric values to the passive components")
+    parser.add_argument("--time-step", default="1e-6")
+    parser.add_argument(
+        "--max-seconds",
+        type=float,
+        default=30,
+        help="Once a size takes longer than this, the bigger sizes for the same generator are skipped (the time for a "
+        "single size can't be limited, so small sizes are recommended for symbolic circuits)",
+    )
+    parser.add_argument("--output", help="File to write the results to, as JSON")
+    parser.add_argument("--compare", metavar="PREVIOUS", help="Results from a previous run, to find regressions")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Slowdown ratio considered a regression")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'generator':>14} {'size':>5} {'components':>10} " + " ".join(f"{stage[:12]:>12}" for stage in STAGES))
+    for generator in args.generators:
+        for size in sorted(args.sizes):
+            lines = GENERATORS[generator](size, args.numeric)
+            stages = run_pipeline(lines, args.time_step, args.solver, args.numeric)
+            results.append({"generator": generator, "size": size, "components": len(lines), "stages": stages})
+
+            times = " ".join(f"{stages[stage]:12.4f}" if stage in stages else f"{'-':>12}" for stage in STAGES)
+            print(f"{generator:>14} {size:>5} {len(lines):>10} {times}", flush=True)
+            if sum(stages.values()) > args.max_seconds:
+                break
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump({"metadata": metadata(args), "results": results}, file, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            regressions = compare(results, json.load(file)["results"], args.threshold)
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
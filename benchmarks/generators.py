@@ -0,0 +1,159 @@
+"""Parameterized netlists for the benchmarks, that grow with a single size parameter.
+
+Each generator receives the size, and if the passive components get numeric values (instead of literals), and returns
+the lines for the netlist. Sources always get literal values, so they show up as inputs in the solutions.
+"""
+
+import math
+from typing import Callable
+
+
+def value(name: str, number: str, numeric: bool) -> str:
+    """The value for a component.
+
+    Args:
+        name (str): The name for the component, used as its literal value.
+        number (str): The numeric value for the component.
+        numeric (bool): If the numeric value is used.
+
+    Returns:
+        str: The value, as written in the netlist.
+    """
+    return number if numeric else name
+
+
+def rc_ladder(sections: int, numeric: bool = False) -> list[str]:
+    """A ladder of RC sections, fed by a voltage source. Each section adds a state.
+
+    Args:
+        sections (int): Number of sections.
+        numeric (bool, optional): If the passive components get numeric values. Defaults to False.
+
+    Returns:
+        list[str]: The lines for the netlist.
+    """
+    lines = ["V1 N0 0 Vin"]
+    for i in range(1, sections + 1):
+        lines.append(f"R{i} N{i - 1} N{i} {value(f'R{i}', '1k', numeric)}")
+        lines.append(f"C{i} N{i} 0 {value(f'C{i}', '1u', numeric)}")
+    return lines
+
+
+def rlc_ladder(sections: int, numeric: bool = False) -> list[str]:
+    """A ladder of RLC sections (series resistor and inductor, shunt capacitor), fed by a voltage source. Each section
+    adds two states.
+
+    Args:
+        sections (int): Number of sections.
+        numeric (bool, optional): If the passive components get numeric values. Defaults to False.
+
+    Returns:
+        list[str]: The lines for the netlist.
+    """
+    lines = ["V1 N0 0 Vin"]
+    for i in range(1, sections + 1):
+        lines.append(f"R{i} N{i - 1} M{i} {value(f'R{i}', '10', numeric)}")
+        lines.append(f"L{i} M{i} N{i} {value(f'L{i}', '1m', numeric)}")
+        lines.append(f"C{i} N{i} 0 {value(f'C{i}', '1u', numeric)}")
+    return lines
+
+
+def resistor_grid(side: int, numeric: bool = False) -> list[str]:
+    """A square resistor grid, fed by a voltage source. Mesh-like circuits are the worst case for finding the loops.
+
+    Args:
+        side (int): Number of nodes in each side of the grid (at least 2).
+        numeric (bool, optional): If the resistors get numeric values. Defaults to False.
+
+    Returns:
+        list[str]: The lines for the netlist, with about ``2 * side**2`` components.
+    """
+    side = max(2, side)
+    lines = ["V1 N0_0 0 V1", f"RG N{side - 1}_{side - 1} 0 {value('RG', '1k', numeric)}"]
+    for row in range(side):
+        for column in range(side):
+            if column + 1 < side:
+                name = f"RH{row}_{column}"
+                lines.append(f"{name} N{row}_{column} N{row}_{column + 1} {value(name, '1k', numeric)}")
+            if row + 1 < side:
+                name = f"RV{row}_{column}"
+                lines.append(f"{name} N{row}_{column} N{row + 1}_{column} {value(name, '1k', numeric)}")
+    return lines
+
+
+def grid_side(components: int) -> int:
+    """Finds the side for a :func:`resistor_grid` with about the given number of components.
+
+    Args:
+        components (int): Approximate number of components.
+
+    Returns:
+        int: The side for the grid.
+    """
+    return max(2, round(math.sqrt(components / 2)))
+
+
+def star_network(branches: int, numeric: bool = False) -> list[str]:
+    """A star network, where every branch (a resistor, and a capacitor to ground) is connected to the same central node.
+
+    Args:
+        branches (int): Number of branches.
+        numeric (bool, optional): If the passive components get numeric values. Defaults to False.
+
+    Returns:
+        list[str]: The lines for the netlist.
+    """
+    lines = ["V1 IN 0 Vin", f"R0 IN S {value('R0', '100', numeric)}"]
+    for i in range(1, branches + 1):
+        lines.append(f"R{i} S O{i} {value(f'R{i}', '1k', numeric)}")
+        lines.append(f"C{i} O{i} 0 {value(f'C{i}', '1u', numeric)}")
+    return lines
+
+
+def storage_banks(size: int, numeric: bool = False) -> list[str]:
+    """A bank of capacitors in parallel, and a chain of inductors in series, which are each replaced by a single
+    equivalent component before solving the circuit.
+
+    Args:
+        size (int): Number of capacitors, and of inductors.
+        numeric (bool, optional): If the passive components get numeric values. Defaults to False.
+
+    Returns:
+        list[str]: The lines for the netlist.
+    """
+    lines = ["V1 IN 0 Vin", f"R1 IN A {value('R1', '10', numeric)}", f"R2 B 0 {value('R2', '10', numeric)}"]
+    for i in range(1, size + 1):
+        lines.append(f"C{i} A 0 {value(f'C{i}', '1u', numeric)}")
+        start = "A" if i == 1 else f"M{i - 1}"
+        end = "B" if i == size else f"M{i}"
+        lines.append(f"L{i} {start} {end} {value(f'L{i}', '1m', numeric)}")
+    return lines
+
+
+def cell_chain(cells: int, numeric: bool = False) -> list[str]:
+    """A chain of RLC loops, where each loop only shares a single node with the next one, so each loop is solved apart
+    (see :func:`~rtds_circuit_analysis.solve_circuit.find_blocks`).
+
+    Args:
+        cells (int): Number of loops.
+        numeric (bool, optional): If the passive components get numeric values. Defaults to False.
+
+    Returns:
+        list[str]: The lines for the netlist.
+    """
+    lines = ["V1 N0 0 Vin", f"R0 N0 0 {value('R0', '100', numeric)}"]
+    for i in range(1, cells + 1):
+        lines.append(f"R{i} N{i - 1} M{i} {value(f'R{i}', '10', numeric)}")
+        lines.append(f"L{i} M{i} N{i} {value(f'L{i}', '1m', numeric)}")
+        lines.append(f"C{i} N{i - 1} N{i} {value(f'C{i}', '1u', numeric)}")
+    return lines
+
+
+GENERATORS: dict[str, Callable[[int, bool], list[str]]] = {
+    "rc_ladder": rc_ladder,
+    "rlc_ladder": rlc_ladder,
+    "resistor_grid": resistor_grid,
+    "star_network": star_network,
+    "storage_banks": storage_banks,
+    "cell_chain": cell_chain,
+}
@@ -0,0 +1,121 @@
+"""Functions related to solving sparse systems of linear equations one block at a time. Each unknown is matched to an
+equation it appears in, and the equations are split in the strongly connected components of their dependencies
+(Tarjan's algorithm), which are solved in block triangular order (as in the Dulmage-Mendelsohn decomposition). The
+unknowns found in each block are substituted in the next ones, so most unknowns are found from a single equation"""
+
+import networkx as nx
+import sympy as sp
+
+
+def match_unknowns(equations: list[sp.Expr], unknowns: list[sp.Symbol]) -> dict[int, int] | None:
+    """Matches each unknown to a different equation it appears in (a maximum matching of the bipartite graph between
+    the equations and the unknowns).
+
+    Args:
+        equations (list[sp.Expr]): The equations (each one equal to zero).
+        unknowns (list[sp.Symbol]): The unknowns.
+
+    Returns:
+        dict[int, int] | None: Dictionary that relates the index of each matched equation to the index of its unknown.
+        None if some unknown can't be matched (the system is structurally singular).
+    """
+    indices = {unknown: j for j, unknown in enumerate(unknowns)}
+    graph = nx.Graph()
+    graph.add_nodes_from(("equation", i) for i in range(len(equations)))
+    graph.add_nodes_from(("unknown", j) for j in range(len(unknowns)))
+    for i, equation in enumerate(equations):
+        for symbol in equation.free_symbols:
+            if symbol in indices:
+                graph.add_edge(("equation", i), ("unknown", indices[symbol]))
+
+    top_nodes = [("equation", i) for i in range(len(equations))]
+    matching = nx.bipartite.hopcroft_karp_matching(graph, top_nodes)
+    if any(("unknown", j) not in matching for j in range(len(unknowns))):
+        return None
+    return {i: matching[("equation", i)][1] for i in range(len(equations)) if ("equation", i) in matching}
+
+
+def triangular_blocks(equations: list[sp.Expr], unknowns: list[sp.Symbol], matching: dict[int, int]) -> list[list[int]]:
+    """Splits the matched equations in blocks, in the order they can be solved: every unknown in the equations of a
+    block is either matched to an equation in the same block, or to one in an earlier block.
+
+    Args:
+        equations (list[sp.Expr]): The equations (each one equal to zero).
+        unknowns (list[sp.Symbol]): The unknowns.
+        matching (dict[int, int]): The unknown matched to each equation (see :func:`match_unknowns`).
+
+    Returns:
+        list[list[int]]: The indices of the equations in each block.
+    """
+    equation_for = {unknowns[j]: i for i, j in matching.items()}
+    graph = nx.DiGraph()
+    graph.add_nodes_from(matching)
+    for i in matching:
+        for symbol in equations[i].free_symbols:
+            if symbol in equation_for and equation_for[symbol] != i:
+                graph.add_edge(i, equation_for[symbol])
+
+    # The edges go from each equation to the ones it depends on, so the blocks are solved in reverse topological order
+    condensed = nx.condensation(graph)
+    order = reversed(list(nx.topological_sort(condensed)))
+    return [sorted(condensed.nodes[block]["members"]) for block in order]
+
+
+def solve_block(equations: list[sp.Expr], unknowns: list[sp.Symbol]) -> list[sp.Expr] | None:
+    """Solves the equations in a block. Blocks with a single equation (most of them, in sparse systems) are solved
+    directly, since setting up ``sp.linsolve`` takes longer than solving them.
+
+    Args:
+        equations (list[sp.Expr]): The equations in the block, with the unknowns from the earlier blocks substituted.
+        unknowns (list[sp.Symbol]): The unknowns matched to the equations.
+
+    Returns:
+        list[sp.Expr] | None: The value for each unknown. None if the block has no unique solution.
+    """
+    if len(equations) == 1:
+        (equation,), (unknown,) = equations, unknowns
+        # The equation is linear, so it is coefficient * unknown + constant
+        coefficient = equation.diff(unknown)
+        if coefficient == 0 or coefficient.has(unknown):
+            return None
+        return [-equation.xreplace({unknown: 0}) / coefficient]
+
+    solutions = sp.linsolve(equations, unknowns)
+    if not solutions or any(value.has(*unknowns) for value in next(iter(solutions))):
+        return None
+    return list(next(iter(solutions)))
+
+
+def linsolve_triangular(equations: list[sp.Expr], unknowns: list[sp.Symbol]) -> sp.Set:
+    """Solves a system of linear equations like ``sp.linsolve``, but one block at a time (see
+    :func:`triangular_blocks`), so each call to ``sp.linsolve`` only has the few unknowns that are really coupled. The
+    equations left out of the matching (the redundant ones) are only checked against the solution.
+
+    If the system has no unique solution, it is solved whole by ``sp.linsolve`` instead, so the results are the same
+    as its own (a parametric solution, or an empty set).
+
+    Args:
+        equations (list[sp.Expr]): The equations (each one equal to zero).
+        unknowns (list[sp.Symbol]): The unknowns.
+
+    Returns:
+        sp.Set: The solution, as a set with a single tuple (with the value for each unknown, in order).
+    """
+    equations = [sp.sympify(equation) for equation in equations]
+    matching = match_unknowns(equations, unknowns)
+    if matching is None:
+        return sp.linsolve(equations, unknowns)
+
+    solved = {}
+    for block in triangular_blocks(equations, unknowns, matching):
+        block_unknowns = [unknowns[matching[i]] for i in block]
+        block_equations = [equations[i].xreplace(solved) for i in block]
+        values = solve_block(block_equations, block_unknowns)
+        if values is None:
+            return sp.linsolve(equations, unknowns)
+        solved.update(zip(block_unknowns, values))
+
+    for i, equation in enumerate(equations):
+        if i not in matching and sp.cancel(equation.xreplace(solved)) != 0:
+            return sp.linsolve(equations, unknowns)
+    return sp.FiniteSet(tuple(solved[unknown] for unknown in unknowns))
@@ -0,0 +1,135 @@
+"""Functions related to caching the solutions for a circuit on disk, so solving the same netlist again is almost
+instantaneous"""
+
+import hashlib
+import os
+import pickle
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+
+import sympy as sp
+
+from rtds_circuit_analysis.parse_netlist import Component
+from rtds_circuit_analysis.profiling import stage
+
+# Changing how the results are stored invalidates every entry in the cache
+CACHE_FORMAT = 1
+# Once the cache is bigger than this, the least recently used entries are removed
+MAX_CACHE_SIZE = 256 * 1024**2
+
+
+def package_version() -> str:
+    """Finds the version for the installed package.
+
+    Returns:
+        str: The version, or "unknown" if the package isn't installed.
+    """
+    try:
+        return version("rtds-circuit-analysis")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def default_cache_dir() -> Path:
+    """Finds the directory used for the cache when none is given, following the XDG specification.
+
+    Returns:
+        Path: The directory (it isn't created here).
+    """
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "rtds-circuit-analysis"
+
+
+def cache_key(components: list[Component], time_step: sp.Expr | None, *options) -> str:
+    """Finds the key for a circuit, which is the same for every netlist that results in the same components, even if
+    they are written differently (different spacing, units, letter case, etc).
+
+    Args:
+        components (list[Component]): The components for the circuit, as given by
+          :func:`~rtds_circuit_analysis.parse_netlist.parse_components`.
+        time_step (sp.Expr | None): The time step for the circuit.
+        *options: Any other option that changes the results (the solver, etc).
+
+    Returns:
+        str: The key, as a hexadecimal SHA-256 hash.
+    """
+    normalized = [f"{CACHE_FORMAT} {package_version()}", sp.srepr(time_step), *map(repr, options)]
+    for component in components:
+        normalized.append(f"{component.name} {' '.join(component.nodes)} {sp.srepr(component.value)}")
+    return hashlib.sha256("\n".join(normalized).encode()).hexdigest()
+
+
+class ResultCache:
+    """The solutions for a single circuit, stored in a directory shared by every circuit. Each circuit is a pickle file,
+    named after its key.
+
+    Args:
+        directory (str | Path): The directory for the cache. It is created if it doesn't exist.
+        key (str): The key for the circuit (see :func:`cache_key`).
+        max_size (int, optional): Size (in bytes) for the whole directory, before the least recently used circuits are
+          removed. Defaults to MAX_CACHE_SIZE.
+    """
+
+    def __init__(self, directory: str | Path, key: str, max_size: int = MAX_CACHE_SIZE):
+        self.directory = Path(directory)
+        self.path = self.directory / f"{key}.pickle"
+        self.max_size = max_size
+
+    def load(self) -> dict[str, object]:
+        """Loads the solutions stored for the circuit, and marks them as recently used.
+
+        Returns:
+            dict[str, object]: Dictionary that relates each solution name to its value. Empty if nothing was stored, or
+            if the file can't be read.
+        """
+        try:
+            with stage("cache_load"), open(self.path, "rb") as file:
+                results = pickle.load(file)
+            os.utime(self.path)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return {}
+        return results if isinstance(results, dict) else {}
+
+    def store(self, name: str, value: object):
+        """Adds a solution to the ones stored for the circuit. The file is replaced atomically, so other processes never
+        read it half written. Failing to write the cache never stops the program.
+
+        Args:
+            name (str): The name for the solution.
+            value (object): The solution.
+        """
+        results = self.load()
+        results[name] = value
+        temporary = self.path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with stage("cache_store"), open(temporary, "wb") as file:
+                pickle.dump(results, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, self.path)
+        except OSError:
+            temporary.unlink(missing_ok=True)
+            return
+        evict(self.directory, self.max_size)
+
+
+def evict(directory: Path, max_size: int):
+    """Removes the least recently used circuits from the cache, until it is no bigger than the maximum size.
+
+    Args:
+        directory (Path): The directory for the cache.
+        max_size (int): The maximum size (in bytes) for the directory.
+    """
+    entries = []
+    for path in directory.glob("*.pickle"):
+        try:
+            status = path.stat()
+        except OSError:
+            continue
+        entries.append((status.st_mtime, status.st_size, path))
+
+    size = sum(entry_size for _, entry_size, _ in entries)
+    for _, entry_size, path in sorted(entries):
+        if size <= max_size:
+            break
+        path.unlink(missing_ok=True)
+        size -= entry_size
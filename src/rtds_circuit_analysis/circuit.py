@@ -1,16 +1,75 @@
 import os
+from functools import cached_property, update_wrapper
 from typing import TYPE_CHECKING
 
-from rtds_circuit_analysis.diference_equations import differential_to_difference
+import networkx as nx
+import sympy as sp
+
+from rtds_circuit_analysis.cache import ResultCache, cache_key
+from rtds_circuit_analysis.diference_equations import DISCRETE_METHODS, discretize, discretize_methods
+from rtds_circuit_analysis.evaluation import CompiledSolution, compile_solution, evaluate_compiled
 from rtds_circuit_analysis.format_output import format_output
+from rtds_circuit_analysis.numeric import check_numeric_values, clean_results, is_numeric
 from rtds_circuit_analysis.parse_data import parse_data
-from rtds_circuit_analysis.parse_netlist import get_lines, parse_components
-from rtds_circuit_analysis.solve_circuit import solve_circuit
+from rtds_circuit_analysis.parse_netlist import Component, parse_components, parse_value
+from rtds_circuit_analysis.profiling import Profiler, StageStats, profiling, record_expressions, stage
+from rtds_circuit_analysis.simulation import (
+    CHUNK_SIZE,
+    SimulationResult,
+    find_discrete_system,
+    input_chunks,
+    merge_results,
+    simulate_chunks,
+)
+from rtds_circuit_analysis.utils import error_message, worker_count
+from rtds_circuit_analysis.solve_circuit import (
+    SOLVERS,
+    find_component_voltages,
+    find_currents,
+    find_node_voltages,
+    simplify_results,
+    solve_components,
+)
+from rtds_circuit_analysis.state_space import StateSpace, discretize_state_space, find_inputs, find_state_space
+from rtds_circuit_analysis.topology import (
+    Template,
+    find_shared_template,
+    identity_template,
+    share_template,
+    store_topology,
+    stored_topologies,
+    structure_graph,
+    topology_key,
+)
 
 if TYPE_CHECKING:
+    import numpy
     import sympy
 
-    from rtds_circuit_analysis.parse_data import Component
+
+# Solutions that are stored in the on-disk cache
+CACHED_RESULTS = (
+    "currents",
+    "component_voltages",
+    "node_voltages",
+    "states",
+    "forward",
+    "backward",
+    "trapezoidal",
+    "_state_space",
+)
+
+def cached_result(function):
+    """Works like ``functools.cached_property``, but the value is also stored in the on-disk cache for the circuit, if
+    it has one."""
+
+    def wrapper(self):
+        with self._profiling():
+            value = function(self)
+            self._store(function.__name__, value)
+        return value
+
+    return cached_property(update_wrapper(wrapper, function))
 
 
 class Circuit:
@@ -22,49 +81,457 @@ class Circuit:
         time_step (str, optional): Value for the time step, used in the difference state equations. It is recommended to
           pass it in exponential form (ex.: ``"2.5e-6"``) **Needs to be a string**, passing it as a float may cause
           issues. Defaults to None.
+        solver (str, optional): Method used to solve the circuit. ``"kirchhoff"`` solves the loop and node equations
+          for the current/voltage of every component, while ``"mna"`` uses the Modified Nodal Analysis, whose system of
+          equations grows with the number of nodes instead of the number of components (recommended for big circuits).
+          Defaults to "kirchhoff".
+        numeric (bool | None, optional): Solves the circuit with floats, through NumPy/SciPy, instead of exact symbolic
+          algebra (much faster, but the results have float coefficients). Sources can still have symbolic values, but
+          every other component needs a numeric one. If None, the circuit is solved numerically only if every value
+          in the netlist is a number. Defaults to None.
+        workers (int, optional): Number of processes used for the independent symbolic jobs (solving each block of the
+          circuit, simplifying each expression, and finding each discrete method). 1 does everything in the current
+          process, and 0 uses every core in the machine. The results are the same for any number of processes. Defaults
+          to 1.
+        cache_dir (str | None, optional): Directory for the on-disk cache of solutions. Every solution is stored there
+          once calculated, and creating a circuit with the same components, time step, solver and engine (even from a
+          differently written netlist) loads them back, instead of solving the circuit again. If None, nothing is
+          cached. Defaults to None.
+        profiler (Profiler | None, optional): Measures the time, number of calls and expression sizes for each stage
+          of solving the circuit (see :attr:`timings`), and can also run the chosen stages under ``cProfile``. If None,
+          nothing is measured. Defaults to None.
+        share_topology (bool, optional): Finds the solutions from a template shared by every circuit with the same
+          topology (the same types of components, connected the same way), whatever the names and values of their
+          components and nodes. The template is solved once, with a symbol as the value of each component, and each
+          circuit only substitutes its own values in it (see :meth:`with_values`). The templates are kept for the whole
+          process, and also in the on-disk cache, if there is one. Defaults to False.
+
+    The solutions for the circuit (:attr:`currents`, :attr:`node_voltages`, :attr:`forward`, etc.) are only calculated
+    the first time they are accessed, and only the stages each one of them depends on are run. So, for example, getting
+    the node voltages won't calculate any of the discrete state equations. The only exception is when :attr:`workers`
+    isn't 1: getting a discrete method also finds the other ones alongside it, in other processes.
 
     Attributes:
-        components (list[Component]): List of components for the circuit.
-        currents (dict[str, sympy.Expr]): Dictionary that relates each component name to its currents. Does not include
-          trivial components, which are current sources and inductors.
-        component_voltages (dict[str, sympy.Expr]): Dictionary that relates each component name to its voltages. Does
-          not include trivial components, which are voltage sources and capacitors.
-        node_voltages (dict[str, sympy.Expr]): Dictionary that relates each node name to its voltages.
-        states (dict[str, sympy.Expr]): Dictionary that relates each energy storage component to its continuous state
-          equation. **It only includes the right hand side of the equation!**
-        forward (dict[str, sympy.Expr]): Dictionary that relates each energy storage component to its discrete state
-          equation, using the forward method. **It only includes the right hand side of the equation!**
-        backward (dict[str, sympy.Expr]): Dictionary that relates each energy storage component to its discrete state
-          equation, using the backward method. **It only includes the right hand side of the equation!**
-        trapezoidal (dict[str, sympy.Expr]): Dictionary that relates each energy storage component to its discrete state
-          equation, using the trapezoidal method. **It only includes the right hand side of the equation!**
+        components (list[Component]): List of components for the circuit. Their ``current`` and ``voltage`` attributes
+          are set up once the circuit is solved.
         time_step (sympy.Rational | None): The time step for the circuit.
+        solver (str): Method used to solve the circuit.
+        numeric (bool): If the circuit is solved numerically.
+        workers (int): Number of processes used for the independent symbolic jobs.
+        profiler (Profiler | None): Measures each stage of solving the circuit.
+        share_topology (bool): If the solutions are found from a template shared by every circuit with the same
+          topology.
     """
 
-    def __init__(self, netlist: str, time_step: str | None = None):
-        if os.path.exists(netlist):
-            netlist = get_lines(netlist)
+    def __init__(
+        self,
+        netlist: str,
+        time_step: str | None = None,
+        solver: str = "kirchhoff",
+        numeric: bool | None = None,
+        workers: int = 1,
+        cache_dir: str | None = None,
+        profiler: Profiler | None = None,
+        share_topology: bool = False,
+    ):
+        if solver not in SOLVERS:
+            error_message(f"Unknown solver '{solver}'. Valid options are: {', '.join(SOLVERS)}.")
+
+        self.profiler = profiler
+        with self._profiling(), stage("parse_components"):
+            # Files are streamed line by line, instead of read whole
+            if not os.path.exists(netlist):
+                netlist = netlist.split("\n")
+
+            components, time_step = parse_components(netlist, time_step)
+            parse_data(components)
+
+        self._set_up(components, time_step, solver, numeric, workers, cache_dir, share_topology)
+
+    def _set_up(
+        self,
+        components: list["Component"],
+        time_step: "sympy.Expr | None",
+        solver: str,
+        numeric: bool | None,
+        workers: int,
+        cache_dir: str | None,
+        share_topology: bool = False,
+    ):
+        self.components = components
+        self.time_step = time_step
+        self.solver = solver
+        worker_count(workers)
+        self.workers = workers
+        self.share_topology = share_topology
+        self._compiled: dict[str, CompiledSolution] = {}
+        # If the circuit was created by with_values, so its solutions are found from the template (see _template)
+        self._derived = False
+
+        self.numeric = is_numeric(self.components) if numeric is None else numeric
+        if self.numeric:
+            check_numeric_values(self.components)
+
+        self._cache = None
+        if cache_dir is not None:
+            self._cache = ResultCache(cache_dir, cache_key(self.components, time_step, solver, self.numeric))
+            with self._profiling():
+                cached = self._cache.load()
+            self.__dict__.update((name, value) for name, value in cached.items() if name in CACHED_RESULTS)
+
+    def _new_circuit(self, components: list["Component"], numeric: bool, cache_dir: str | None) -> "Circuit":
+        # A circuit with the same options as this one, but with other components (and without parsing any netlist)
+        circuit = Circuit.__new__(Circuit)
+        circuit.profiler = self.profiler
+        circuit._set_up(components, self.time_step, self.solver, numeric, self.workers, cache_dir)
+        return circuit
+
+    def _profiling(self):
+        return profiling(self.profiler)
+
+    def _store(self, name: str, value):
+        if self._cache is not None:
+            self._cache.store(name, value)
+
+    @property
+    def timings(self) -> dict[str, StageStats]:
+        """dict[str, StageStats]: Statistics (wall time, number of calls and expression sizes) for each stage run so
+        far, in the order they were first run. Empty if the circuit has no profiler. The same statistics can be printed
+        as a table with ``circuit.profiler.report()``."""
+        return dict(self.profiler.stages) if self.profiler is not None else {}
+
+    @cached_property
+    def _template(self) -> Template:
+        # The circuit solved with a symbol as the value of each component (see rtds_circuit_analysis.topology). With
+        # share_topology, it is shared by every circuit with the same topology, in this process or in the on-disk cache
+        cache_dir = self._cache.directory if self._cache is not None else None
+        if not self.share_topology:
+            return self._own_template(cache_dir)
+
+        graph = structure_graph(self.components)
+        key = topology_key(graph, self.time_step, self.solver)
+        with stage("match_topology"):
+            template = find_shared_template(key, graph)
+            if template is None and cache_dir is not None:
+                for template_graph, components in stored_topologies(cache_dir, key):
+                    circuit = self._new_circuit(components, False, cache_dir)
+                    share_template(key, template_graph, identity_template(circuit, self._symbols(components)))
+                template = find_shared_template(key, graph)
+        if template is not None:
+            return template
+
+        template = self._own_template(cache_dir)
+        share_template(key, graph, template)
+        if cache_dir is not None:
+            store_topology(cache_dir, key, graph, template.circuit)
+        return template
+
+    @staticmethod
+    def _symbols(components: list["Component"]) -> dict[str, "sympy.Symbol"]:
+        return {component.name: sp.Symbol(component.name) for component in components}
+
+    def _own_template(self, cache_dir: "str | os.PathLike | None") -> Template:
+        # A circuit whose values are already distinct symbols is its own template
+        values = [component.value for component in self.components]
+        if not self.numeric and all(value.is_Symbol for value in values) and len(set(values)) == len(values):
+            return identity_template(self, {component.name: component.value for component in self.components})
+
+        symbols = self._symbols(self.components)
+        components = [
+            Component(component.name, component.nodes, symbols[component.name]) for component in self.components
+        ]
+        template = self._new_circuit(components, False, cache_dir)
+        return identity_template(template, symbols)
+
+    @cached_property
+    def _values(self) -> dict["sympy.Symbol", "sympy.Expr"] | None:
+        # The replacement for each symbol in the template, for the circuits whose solutions are found from it (the ones
+        # created by with_values, or with share_topology). None if the circuit is solved by itself
+        if not (self._derived or self.share_topology):
+            return None
+        template = self._template
+        if template.circuit is self:
+            return None
+        return template.substitutions(self.components)
+
+    def _substitute_template(self, name: str) -> dict[str, "sympy.Expr"] | None:
+        # Finds a solution from the same solution for the template
+        template = self._template
+        expressions = getattr(template.circuit, name)
+        if expressions is None:
+            return None
+        with self._profiling():
+            with stage("substitute_values"):
+                results = {key: expression.xreplace(self._values) for key, expression in expressions.items()}
+                results = template.rename(name, results)
+            self._simplify_results(results)
+        return results
+
+    @cached_property
+    def _solution(self) -> tuple[list["Component"], nx.MultiDiGraph, dict[str, "sympy.Expr"]]:
+        # The list is copied, since solving the circuit changes it (the components themselves are still the same)
+        with self._profiling():
+            return solve_components(list(self.components), self.solver, self.numeric, self.workers)
+
+    def _simplify_results(self, *dictionaries: dict[str, "sympy.Expr"]):
+        if self.numeric:
+            clean_results(*dictionaries)
         else:
-            netlist = netlist.strip().split("\n")
-
-        self.components, time_step = parse_components(netlist, time_step)
+            simplify_results(*dictionaries, workers=self.workers)
+
+    @cached_result
+    def currents(self) -> dict[str, "sympy.Expr"]:
+        """dict[str, sympy.Expr]: Dictionary that relates each component name to its currents. Does not include trivial
+        components, which are current sources and inductors."""
+        if self._values is not None:
+            return self._substitute_template("currents")
+        components, _, _ = self._solution
+        currents = find_currents(components)
+        self._simplify_results(currents)
+        return currents
+
+    @cached_result
+    def component_voltages(self) -> dict[str, "sympy.Expr"]:
+        """dict[str, sympy.Expr]: Dictionary that relates each component name to its voltages. Does not include trivial
+        components, which are voltage sources and capacitors."""
+        if self._values is not None:
+            return self._substitute_template("component_voltages")
+        components, _, _ = self._solution
+        component_voltages = find_component_voltages(components)
+        self._simplify_results(component_voltages)
+        return component_voltages
+
+    @cached_result
+    def node_voltages(self) -> dict[str, "sympy.Expr"]:
+        """dict[str, sympy.Expr]: Dictionary that relates each node name to its voltages."""
+        if self._values is not None:
+            return self._substitute_template("node_voltages")
+        components, node_graph, _ = self._solution
+        node_breadth_sequence = nx.bfs_edges(node_graph.to_undirected(), "0")
+        node_voltages = find_node_voltages(components, node_breadth_sequence)
+        self._simplify_results(node_voltages)
+        return node_voltages
+
+    @cached_result
+    def states(self) -> dict[str, "sympy.Expr"]:
+        """dict[str, sympy.Expr]: Dictionary that relates each energy storage component to its continuous state
+        equation. **It only includes the right hand side of the equation!**"""
+        if self._values is not None:
+            return self._substitute_template("states")
+        _, _, states = self._solution
+        states = dict(states)
+        self._simplify_results(states)
+        return states
+
+    def state_space(self) -> StateSpace:
+        """Finds the state-space form for the circuit, with the node voltages as the outputs. The inputs are the
+        symbols in the values of the sources.
+
+        Returns:
+            StateSpace: The state-space form for the circuit, with NumPy matrices if the circuit is solved numerically,
+            and sympy matrices otherwise.
+        """
+        return self._state_space
+
+    @cached_result
+    def _state_space(self) -> StateSpace:
+        inputs = find_inputs(self.components)
+        states, node_voltages = self.states, self.node_voltages
+        with stage("state_space"):
+            return find_state_space(states, node_voltages, inputs, self.numeric)
+
+    def _discretize(self, method: str) -> dict[str, "sympy.Expr"] | None:
+        # The solutions this depends on are found first, so they aren't measured as part of the discretization
+        states = self.states
+        if not states:
+            return None
+
+        if self.numeric and self.time_step is not None and self.time_step.is_number:
+            state_space = self._state_space
+            with stage(f"discretize_{method}"):
+                return discretize_state_space(state_space, method, float(self.time_step))
+
+        # The discretization for the template is only worth it for symbolic circuits (a numeric one is much faster)
+        if self._values is not None:
+            return self._substitute_template(method)
+
+        if self.workers == 1:
+            with stage(f"discretize_{method}"):
+                solutions = discretize(states, method, self.time_step)
+            record_expressions(f"discretize_{method}", solutions.values())
+            return solutions
+
+        # The methods that weren't found yet are found alongside this one, in other processes
+        methods = [method] + [other for other in DISCRETE_METHODS if other != method and other not in self.__dict__]
+        with stage("discretize_parallel"):
+            solutions = discretize_methods(states, methods, self.time_step, self.workers)
+        for other, solution in zip(methods[1:], solutions[1:]):
+            self.__dict__[other] = solution
+            self._store(other, solution)
+        return solutions[0]
+
+    @cached_result
+    def forward(self) -> dict[str, "sympy.Expr"] | None:
+        """dict[str, sympy.Expr] | None: Dictionary that relates each energy storage component to its discrete state
+        equation, using the forward method. **It only includes the right hand side of the equation!** None if the
+        circuit is stateless."""
+        return self._discretize("forward")
+
+    @cached_result
+    def backward(self) -> dict[str, "sympy.Expr"] | None:
+        """dict[str, sympy.Expr] | None: Dictionary that relates each energy storage component to its discrete state
+        equation, using the backward method. **It only includes the right hand side of the equation!** None if the
+        circuit is stateless."""
+        return self._discretize("backward")
+
+    @cached_result
+    def trapezoidal(self) -> dict[str, "sympy.Expr"] | None:
+        """dict[str, sympy.Expr] | None: Dictionary that relates each energy storage component to its discrete state
+        equation, using the trapezoidal method. **It only includes the right hand side of the equation!** None if the
+        circuit is stateless."""
+        return self._discretize("trapezoidal")
+
+    def with_values(self, **values: "str | float | sympy.Expr") -> "Circuit":
+        """Creates the same circuit, with other values for some of its components (sources included). Instead of
+        solving the new circuit from scratch, the solutions (discrete state equations included) are found from a
+        template: the circuit solved once with a symbol as the value of each component, which is kept by this circuit
+        (and shared by every circuit created from it). Each solution only costs substituting the values in it, and
+        simplifying it again. For numeric circuits, the results are cleaned up instead, and the discrete state equations
+        are found numerically from the state-space form (which is much faster than discretizing the template). For
+        example:
+
+        .. code-block:: python
+
+            circuit = Circuit("V1 1 0 V\nR1 1 2 10\nL1 2 3 1m\nC1 3 0 1u", "1e-6")
+            for resistance in ("5", "10", "20"):
+                tuned = circuit.with_values(R1=resistance, C1="2.2u")
+                tuned.trapezoidal
+
+        The template is solved the first time it is needed, symbolically, so the first call costs a full symbolic solve
+        (unless the values in the netlist are already distinct symbols). The solutions for the template are also
+        stored in the on-disk cache, if the circuit has one. The components for the new circuit aren't solved, so
+        their ``current`` and ``voltage`` attributes aren't set up.
 
-        self.time_step = time_step
+        Args:
+            **values: The new value for each component, by name (ex.: ``R1="1k"``). Strings are written like the values
+              in the netlist, and numbers are converted to exact fractions.
 
-        parse_data(self.components)
+        Returns:
+            Circuit: The new circuit, solved numerically if this one is.
+        """
+        names = [component.name for component in self.components]
+        unknown = sorted(set(values) - set(names))
+        if unknown:
+            error_message(
+                f"The values for {', '.join(unknown)} can't be changed. Valid components are: {', '.join(names)}."
+            )
+
+        components = []
+        for component in self.components:
+            value = values.get(component.name, component.value)
+            if component.name in values:
+                value = parse_value(value) if isinstance(value, str) else sp.nsimplify(value, rational=True)
+            components.append(Component(component.name, component.nodes, value))
+        parse_data(components)
+
+        circuit = self._new_circuit(components, self.numeric, None)
+        circuit.__dict__["_template"] = self._template
+        circuit._derived = True
+        return circuit
+
+    def evaluate(
+        self,
+        solution: str = "node_voltages",
+        **values: "numpy.typing.ArrayLike",
+    ) -> dict[str, "numpy.ndarray"]:
+        """Evaluates a solution for many values of its symbols at once. The solution is compiled into a NumPy function
+        the first time it is evaluated, and the compiled function is reused afterwards, so sweeping thousands of values
+        takes a single call.
+
+        The values are broadcast against each other, like in NumPy. For example, sweeping every combination of two
+        resistors:
+
+        .. code-block:: python
+
+            import numpy as np
+
+            voltages = circuit.evaluate(R1=np.linspace(1, 10, 100)[:, None], R2=np.linspace(1, 10, 50), Vin=5)
+            voltages["OUT"].shape  # (100, 50)
 
-        (
-            self.components,
-            self.currents,
-            self.component_voltages,
-            self.node_voltages,
-            self.states,
-        ) = solve_circuit(self.components)
+        Args:
+            solution (str, optional): Name of the solution to evaluate (``"currents"``, ``"component_voltages"``,
+              ``"node_voltages"``, ``"states"``, ``"forward"``, ``"backward"`` or ``"trapezoidal"``). Defaults to
+              "node_voltages".
+            **values: The value (a number, or an array) for every symbol in the solution. The names are the ones in the
+              solution (for the discrete methods, ``**{"VC1_{n-1}": ...}`` can be used).
+
+        Returns:
+            dict[str, numpy.ndarray]: Dictionary that relates each component/node to its values, all with the broadcast
+            shape of the given values.
+        """
+        if solution not in CACHED_RESULTS or solution.startswith("_"):
+            error_message(f"Unknown solution '{solution}'. Valid options are: {', '.join(CACHED_RESULTS[:-1])}.")
+        if solution not in self._compiled:
+            expressions = getattr(self, solution)
+            if not expressions:
+                error_message(f"The circuit has no '{solution}' to evaluate, since it is stateless.")
+            with self._profiling(), stage("compile_solution"):
+                self._compiled[solution] = compile_solution(expressions)
+        return evaluate_compiled(self._compiled[solution], values)
+
+    def simulate(
+        self,
+        inputs: dict[str, "numpy.typing.ArrayLike"],
+        method: str = "backward",
+        initial: dict[str, float] | None = None,
+        steps: int | None = None,
+        chunk_size: int = CHUNK_SIZE,
+        **parameters: float,
+    ) -> SimulationResult:
+        """Simulates the discrete state equations for a discrete method over time, the same way they run on the FPGA
+        (but with floats), to check them before the synthesis. The equations are turned into matrices once, and the
+        steps are run in chunks, so the memory used doesn't grow with the number of steps. For example:
+
+        .. code-block:: python
+
+            import numpy as np
+
+            circuit = Circuit("series_rlc.cir", "1e-6")
+            result = circuit.simulate({"V": np.ones(1_000_000)}, method="trapezoidal", R=10, L=1e-3, C=1e-6)
+            result.node_voltages["3"]  # Voltage for node 3 at each step
+
+        For simulations that don't fit in memory, use :func:`~rtds_circuit_analysis.simulation.simulate_chunks`
+        directly.
 
-        if self.states:
-            self.forward, self.backward, self.trapezoidal = differential_to_difference(self.states, time_step)
-        else:
-            self.forward = self.backward = self.trapezoidal = None
+        Args:
+            inputs (dict[str, numpy.typing.ArrayLike]): Dictionary that relates each input (the symbols in the values of
+              the sources) to its value at each step (a sequence), or to a constant value (a number).
+            method (str, optional): The discrete method, either "forward", "backward" or "trapezoidal". Defaults to
+              "backward".
+            initial (dict[str, float] | None, optional): Dictionary that relates state variables (ex.: ``"VC1"``) to
+              their initial values. The ones not given start at zero. Defaults to None.
+            steps (int | None, optional): Number of steps, including the initial state. If None, it is the length of
+              the input sequences. Defaults to None.
+            chunk_size (int, optional): Number of steps run at once. Defaults to CHUNK_SIZE.
+            **parameters: The value for every other symbol in the circuit (the symbolic values of the components, and
+              ``Ts`` if the circuit has no time step).
+
+        Returns:
+            SimulationResult: The states, node voltages and currents at each step.
+        """
+        if method not in DISCRETE_METHODS:
+            error_message(f"Unknown method '{method}'. Valid options are: {', '.join(DISCRETE_METHODS)}.")
+        equations = getattr(self, method)
+        if not equations:
+            error_message("The circuit has no state equations to simulate, since it is stateless.")
+
+        node_voltages, currents = self.node_voltages, self.currents
+        with self._profiling():
+            with stage("compile_simulation"):
+                system = find_discrete_system(equations, node_voltages, currents, self.components, parameters)
+            with stage("simulate"):
+                chunks = input_chunks(system, inputs, steps, chunk_size)
+                return merge_results(simulate_chunks(system, chunks, initial))
 
     def _formatted_components(self):
         return f'*** Components for the circuit ***\n{"\n".join(str(component) for component in self.components)}\n'
@@ -1,9 +1,14 @@
 """Functions related to converting differential equations to difference equations"""
 
 from dataclasses import dataclass
+from functools import partial
 from typing import Callable
 
 import sympy as sp
+from sympy.polys.matrices import DomainMatrix
+from sympy.solvers.solveset import NonlinearError
+
+from rtds_circuit_analysis.utils import parallel_map
 
 
 @dataclass
@@ -71,6 +76,9 @@ def trapezoidal(continuous_symbols: sp.Symbol) -> list[sp.Expr]:
     return (forward(continuous_symbols) + backward(continuous_symbols)) / 2
 
 
+DISCRETE_METHODS = {"forward": forward, "backward": backward, "trapezoidal": trapezoidal}
+
+
 def convert_to(
     discrete_method: Callable,
     variable: str,
@@ -185,24 +193,16 @@ def convert_explicit(
     return symbol_to_component(solutions)
 
 
-def differential_to_difference(
-    states_continuous: list[sp.Expr],
-    time_step: sp.Rational | None = None,
-) -> tuple[dict[str, sp.Expr], dict[str, sp.Expr], dict[str, sp.Expr]]:
-    """Transform the state equations in continuous form in the circuit, into their difference form, for the forward,
-    backward and trapezoidal methods.
+def to_state_variables(states_continuous: dict[str, sp.Expr]) -> dict[str, sp.Expr]:
+    """Turn the keys from the component name to the variable related to this component (the voltage for capacitors,
+    and the current for inductors).
 
     Args:
-        states_continuous (list[sp.Expr]): List of differential equations.
-        time_step (str | None): The time step for the circuit. If it is None, the expressions will receive the
-        time step as a "Ts" sympy symbol.
-
+        states_continuous (dict[str, sp.Expr]): Dictionary that relates each component to its state equation.
 
     Returns:
-        tuple[dict[str, sp.Expr], dict[str, sp.Expr], dict[str, sp.Expr]]: State equations in differential form,
-        for various methods.
+        dict[str, sp.Expr]: Dictionary that relates each state variable to its state equation.
     """
-    # Turn the keys from the component name to the variable related to this component.
     states_continuous_variables = {}
     for component, expression in states_continuous.items():
         match component[0]:
@@ -211,16 +211,229 @@ def differential_to_difference(
             case "L":
                 component = "I" + component
         states_continuous_variables[component] = expression
-    states_continuous = states_continuous_variables
+    return states_continuous_variables
+
+
+def to_integer_domain(matrix: sp.Matrix) -> DomainMatrix | None:
+    """Converts a matrix to a ``DomainMatrix`` over the integers (or over polynomials with integer coefficients), by
+    multiplying each row by the denominators in it.
+
+    Args:
+        matrix (sp.Matrix): The matrix to convert.
+
+    Returns:
+        DomainMatrix | None: The converted matrix. None if the matrix has values that can't be represented exactly
+        (floats, square roots, etc).
+    """
+    domain_matrix = DomainMatrix.from_Matrix(matrix)
+    domain = domain_matrix.domain
+    if domain.is_PolynomialRing or domain.is_FractionField:
+        if not (domain.domain.is_ZZ or domain.domain.is_QQ):
+            return None
+        domain_matrix = domain_matrix.convert_to(sp.ZZ.frac_field(*domain.symbols))
+    elif not (domain.is_ZZ or domain.is_QQ):
+        return None
+    _, domain_matrix = domain_matrix.clear_denoms_rowwise(convert=True)
+    return domain_matrix
+
+
+def linear_combination(coefficients: list, denominator, domain, symbols: list[sp.Expr]) -> sp.Expr:
+    """Writes ``sum(coefficients * symbols) / denominator`` as a sympy expression, in its lowest terms.
+
+    Args:
+        coefficients (list): The coefficient for each symbol, as elements of the domain.
+        denominator: The common denominator, as an element of the domain.
+        domain: The domain for the values (the integers, or polynomials with integer coefficients).
+        symbols (list[sp.Expr]): The symbols (the number 1 can be used for the constant part).
+
+    Returns:
+        sp.Expr: The expression. For integer domains, it is a sum of fractions, while for polynomial domains, it is a
+        single fraction (the same forms that ``sp.solve`` gives).
+    """
+    if domain.is_ZZ:
+        terms = (sp.Rational(int(value), int(denominator)) * symbol for value, symbol in zip(coefficients, symbols))
+        return sp.Add(*terms)
+
+    divisor = denominator
+    for value in coefficients:
+        divisor = domain.gcd(divisor, value)
+    # The denominator is kept with a positive leading coefficient
+    if domain.domain.is_negative(denominator.LC):
+        divisor = -divisor
+    denominator = domain.exquo(denominator, divisor)
+
+    numerator = []
+    for value, symbol in zip(coefficients, symbols):
+        value = domain.to_sympy(domain.exquo(value, divisor))
+        numerator.extend(term * symbol for term in sp.Add.make_args(value))
+    return sp.Add(*numerator) / domain.to_sympy(denominator)
+
+
+def state_matrices(
+    states_continuous: dict[str, sp.Expr],
+) -> tuple[list[sp.Symbol], list[sp.Symbol], sp.Matrix, sp.Matrix, sp.Matrix]:
+    """Writes the state equations as ``A * states + B * inputs + e``.
+
+    Args:
+        states_continuous (dict[str, sp.Expr]): Dictionary that relates each state variable to its state equation.
+
+    Returns:
+        tuple[list[sp.Symbol], list[sp.Symbol], sp.Matrix, sp.Matrix, sp.Matrix]: The state variables, the inputs (the
+        other symbols that vary with time, the ones beginning with V or I), and the matrices ``A``, ``B`` and ``e``.
+    """
+    states = [sp.Symbol(variable) for variable in states_continuous]
+    expressions = list(states_continuous.values())
+
+    inputs = set()
+    for expression in expressions:
+        inputs.update(symbol for symbol in expression.free_symbols if str(symbol)[0] in ("V", "I"))
+    inputs = sorted(inputs - set(states), key=str)
+
+    matrix, constants = sp.linear_eq_to_matrix(expressions, states + inputs)
+    return states, inputs, matrix[:, : len(states)], matrix[:, len(states) :], -constants
+
+
+def convert_matrix(
+    method: str,
+    states_continuous: dict[str, sp.Expr],
+    time_step: sp.Rational | None,
+) -> dict[str, sp.Expr] | None:
+    """Convert the state equations in continuous form into their (explicit) discrete form, through their matrix form.
+    Each method is a closed form matrix expression, where ``M x[n] = N [x[n-1], u[n-1], u[n], 1]``:
+
+    - Forward: ``x[n] = (I + Ts A) x[n-1] + Ts B u[n-1] + Ts e``
+    - Backward: ``(I - Ts A) x[n] = x[n-1] + Ts B u[n] + Ts e``
+    - Trapezoidal: ``(I - Ts/2 A) x[n] = (I + Ts/2 A) x[n-1] + Ts/2 B (u[n-1] + u[n]) + Ts e``
+
+    The system is solved fraction free (without dividing polynomials at every step), which is much faster than solving
+    it with ``sp.solve``, and gives the exact same expressions.
+
+    Args:
+        method (str): The discrete method, either "forward", "backward" or "trapezoidal".
+        states_continuous (dict[str, sp.Expr]): Dictionary that relates each state variable to its state equation.
+        time_step (sp.Rational | None): The time step for the circuit. If it is None, the expressions will receive the
+          time step as a "Ts" sympy symbol.
+
+    Returns:
+        dict[str, sp.Expr] | None: The state equations for the chosen method. None if the equations can't be written
+        in the matrix form with exact values.
+    """
+    try:
+        states, inputs, a, b, e = state_matrices(states_continuous)
+    except NonlinearError:
+        return None
+
+    if not time_step:
+        time_step = sp.Symbol("Ts")
+    identity = sp.eye(len(states))
+    old_states = [forward(state) for state in states]
+    old_inputs, new_inputs = [forward(i) for i in inputs], [backward(i) for i in inputs]
+
+    match method:
+        case "forward":
+            implicit = identity
+            explicit = sp.Matrix.hstack(identity + time_step * a, time_step * b, time_step * e)
+            symbols = old_states + old_inputs + [1]
+        case "backward":
+            implicit = identity - time_step * a
+            explicit = sp.Matrix.hstack(identity, time_step * b, time_step * e)
+            symbols = old_states + new_inputs + [1]
+        case "trapezoidal":
+            implicit = identity - time_step / 2 * a
+            half_step = time_step / 2
+            explicit = sp.Matrix.hstack(identity + half_step * a, half_step * b, half_step * b, time_step * e)
+            symbols = old_states + old_inputs + new_inputs + [1]
+
+    system = to_integer_domain(sp.Matrix.hstack(implicit, explicit))
+    if system is None:
+        return None
+    numerators, denominator = system[:, : len(states)].solve_den(system[:, len(states) :])
+
+    solutions = {}
+    for row, state in enumerate(states):
+        coefficients = [numerators[row, column].element for column in range(len(symbols))]
+        solutions[state] = linear_combination(coefficients, denominator, system.domain, symbols)
+
+    # Same order as the one from sp.solve (sorted by the state variables)
+    return {str(state)[1:]: solutions[state] for state in sorted(states, key=sp.default_sort_key)}
+
+
+def discretize(
+    states_continuous: dict[str, sp.Expr],
+    method: str,
+    time_step: sp.Rational | None = None,
+) -> dict[str, sp.Expr]:
+    """Transform the state equations in continuous form in the circuit, into their difference form, for a single
+    method. The equations are solved through their matrix form (see :func:`convert_matrix`), and only fall back to
+    ``sp.solve`` if they have values that can't be represented exactly.
+
+    Args:
+        states_continuous (dict[str, sp.Expr]): Dictionary that relates each component to its state equation.
+        method (str): The discrete method, either "forward", "backward" or "trapezoidal".
+        time_step (sp.Rational | None, optional): The time step for the circuit. If it is None, the expressions will
+          receive the time step as a "Ts" sympy symbol. Defaults to None.
+
+    Returns:
+        dict[str, sp.Expr]: State equations in difference form, for the chosen method.
+    """
+    states_continuous = to_state_variables(states_continuous)
+
+    solutions = convert_matrix(method, states_continuous, time_step)
+    if solutions is not None:
+        return solutions
 
     # Extract the symbols
     to_solve_for = []
     for variable in states_continuous:
         to_solve_for.append(sp.Symbol(variable + "_{n}"))
 
-    # Get the difference equations for each method
-    forward_solutions = convert_explicit(forward, states_continuous, to_solve_for, time_step)
-    backward_solutions = convert_explicit(backward, states_continuous, to_solve_for, time_step)
-    trapezoidal_solutions = convert_explicit(trapezoidal, states_continuous, to_solve_for, time_step)
+    return convert_explicit(DISCRETE_METHODS[method], states_continuous, to_solve_for, time_step)
+
+
+def discretize_methods(
+    states_continuous: dict[str, sp.Expr],
+    methods: list[str],
+    time_step: sp.Rational | None = None,
+    workers: int = 1,
+) -> list[dict[str, sp.Expr]]:
+    """Transform the state equations in continuous form in the circuit, into their difference form, for several methods.
+    Each method is independent from the others, so they can be found in parallel.
+
+    Args:
+        states_continuous (dict[str, sp.Expr]): Dictionary that relates each component to its state equation.
+        methods (list[str]): The discrete methods (see :func:`discretize`).
+        time_step (sp.Rational | None, optional): The time step for the circuit. If it is None, the expressions will
+          receive the time step as a "Ts" sympy symbol. Defaults to None.
+        workers (int, optional): Number of processes to use (see :func:`~rtds_circuit_analysis.utils.parallel_map`).
+          Defaults to 1.
+
+    Returns:
+        list[dict[str, sp.Expr]]: State equations in difference form, for each method (in the same order).
+    """
+    return parallel_map(partial(discretize, states_continuous, time_step=time_step), methods, workers)
+
+
+def differential_to_difference(
+    states_continuous: list[sp.Expr],
+    time_step: sp.Rational | None = None,
+    workers: int = 1,
+) -> tuple[dict[str, sp.Expr], dict[str, sp.Expr], dict[str, sp.Expr]]:
+    """Transform the state equations in continuous form in the circuit, into their difference form, for the forward,
+    backward and trapezoidal methods.
+
+    Args:
+        states_continuous (list[sp.Expr]): List of differential equations.
+        time_step (str | None): The time step for the circuit. If it is None, the expressions will receive the
+        time step as a "Ts" sympy symbol.
+        workers (int, optional): Number of processes used to find the methods, which are independent from each other.
+          1 doesn't create any process, and 0 uses every core in the machine. Defaults to 1.
+
+    Returns:
+        tuple[dict[str, sp.Expr], dict[str, sp.Expr], dict[str, sp.Expr]]: State equations in differential form,
+        for various methods.
+    """
+    forward_solutions, backward_solutions, trapezoidal_solutions = discretize_methods(
+        states_continuous, list(DISCRETE_METHODS), time_step, workers
+    )
 
     return forward_solutions, backward_solutions, trapezoidal_solutions
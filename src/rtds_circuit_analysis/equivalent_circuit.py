@@ -1,7 +1,7 @@
 """Functions related to assembling and disassembling equivalent capacitors/inductors"""
 
 from collections import Counter, defaultdict
-from copy import deepcopy
+from copy import copy
 from typing import DefaultDict, ValuesView
 
 import sympy as sp
@@ -13,6 +13,8 @@ from rtds_circuit_analysis.utils import flatten
 class EquivalentComponent(Component):
     """Represents an equivalent component (capacitor or inductor)"""
 
+    __slots__ = ("originals", "inverted_flags")
+
     def __init__(self, components, directions, equivalent_value):
         self.originals = components
         self.inverted_flags = directions
@@ -79,10 +81,9 @@ def remove_originals(
     Returns:
         list[Equivalent | Component]: List without the original components
     """
-    for equivalent_component in equivalent_comps:
-        for original in equivalent_component.originals:
-            circuit.remove(original)
-        circuit.append(equivalent_component)
+    originals = {id(original) for component in equivalent_comps for original in component.originals}
+    circuit[:] = [component for component in circuit if id(component) not in originals]
+    circuit.extend(equivalent_comps)
     return circuit
 
 
@@ -97,7 +98,7 @@ def find_equivalent_capacitors(circuit: list[EquivalentComponent | Component]) -
         single capacitor.
     """
 
-    def find_capacitors_for_each_nodes(circuit: list[Component]) -> DefaultDict[tuple[str], list[Component]]:
+    def find_capacitors_for_each_nodes(circuit: list[Component]) -> DefaultDict[tuple[int, int], list[Component]]:
         """Given a list of components, returns a dictionary that relates a pair of nodes as the key, and a list of
         capacitors connected to these nodes as the value.
 
@@ -105,26 +106,26 @@ def find_equivalent_capacitors(circuit: list[EquivalentComponent | Component]) -
             circuit (list[Component]): List of components.
 
         Returns:
-            DefaultDict[tuple[str], list[Component]]: Dictionary that relates the nodes and the capacitors.
+            DefaultDict[tuple[int, int], list[Component]]: Dictionary that relates the node IDs and the capacitors.
         """
 
         capacitors_for_each_nodes = defaultdict(list)
         for component in circuit:
             if component.type == "C":
-                capacitors_for_each_nodes[tuple(sorted(component.nodes))].append(component)
+                capacitors_for_each_nodes[tuple(sorted(component.node_ids))].append(component)
         return capacitors_for_each_nodes
 
     def remove_non_parallel_capacitors(
-        capacitors_for_each_nodes: DefaultDict[tuple[str], list[Component]],
-    ) -> DefaultDict[tuple[str], list[Component]]:
+        capacitors_for_each_nodes: DefaultDict[tuple[int, int], list[Component]],
+    ) -> DefaultDict[tuple[int, int], list[Component]]:
         """Removes all capacitors that does not have any capacitor in parallel to itself.
 
         Args:
-            capacitors_for_each_nodes (DefaultDict[tuple[str], list[Component]]): Dictionary that relates the nodes and
-            the capacitors.
+            capacitors_for_each_nodes (DefaultDict[tuple[int, int], list[Component]]): Dictionary that relates the node
+            IDs and the capacitors.
 
         Returns:
-            DefaultDict[tuple[str], list[Component]]: Dictionary, with nodes related to a single capacitor removed.
+            DefaultDict[tuple[int, int], list[Component]]: Dictionary, with nodes related to a single capacitor removed.
         """
         for nodes in list(capacitors_for_each_nodes):
             if len(capacitors_for_each_nodes[nodes]) == 1:
@@ -151,8 +152,8 @@ def find_equivalent_capacitors(circuit: list[EquivalentComponent | Component]) -
         """
         directions = []
         for capacitors in capacitors_groups:
-            reference_nodes = capacitors[0].nodes
-            directions.append([(capacitor.nodes != reference_nodes) for capacitor in capacitors])
+            reference_nodes = capacitors[0].node_ids
+            directions.append([(capacitor.node_ids != reference_nodes) for capacitor in capacitors])
         return directions
 
     capacitors_for_each_nodes = find_capacitors_for_each_nodes(circuit)
@@ -175,55 +176,65 @@ def find_equivalent_inductors(circuit: list[Component]) -> list[EquivalentCompon
         single inductor.
     """
 
-    def find_adjacent_component_and_node(node: str, circuit: list[Component]) -> tuple[Component, str]:
-        """Finds a component that is connected to a certain node, and the other node this component is connected to.
+    def find_adjacent_component_and_node(
+        node: int, adjacency: DefaultDict[int, list[Component]], passed: set[int]
+    ) -> tuple[Component, int] | None:
+        """Finds the first component (in the order of the netlist) that is connected to a certain node, and wasn't
+        passed through yet, and the other node this component is connected to.
 
         Args:
-            node (str): The node to find the component connected to
-            circuit (list[Component]): List of components
+            node (int): The ID for the node to find the component connected to
+            adjacency (DefaultDict[int, list[Component]]): Dictionary that relates each node ID to the components
+              connected to it, in reverse order. The components already passed through are dropped from its end.
+            passed (set[int]): The ``id`` for each component already passed through
 
         Returns:
-            tuple[Component, str]: The component connect to the node, and the other node for the component
+            tuple[Component, int] | None: The component connect to the node, and the ID for the other node for the
+            component. None if every component connected to the node was already passed through.
         """
-        for component in circuit:
-            if node in component.nodes:
-                nodes = component.nodes
-                other_node = nodes[1] if nodes[0] == node else nodes[0]
-                return component, other_node
+        components = adjacency[node]
+        while components and id(components[-1]) in passed:
+            components.pop()
+        if not components:
+            return None
+        component = components[-1]
+        node1, node2 = component.node_ids
+        return component, node2 if node1 == node else node1
 
     def series_inductors_branch(
-        node: str, external_nodes: list[str], circuit: list[Component]
+        node: int, external_nodes: set[int], adjacency: DefaultDict[int, list[Component]], passed: set[int]
     ) -> tuple[list[Component], list[Component], list[bool]]:
         """Starting from a certain external node, find a branch (sequence of components that starts and ends in an
         external node), and get the sequence of inductors in it, if any.
 
         Args:
-            node (str): The starting external node
-            external_nodes (list[str]): List of external nodes
-            circuit (list[Component]): List of components for the circuit
+            node (int): The ID for the starting external node
+            external_nodes (set[int]): IDs for the external nodes
+            adjacency (DefaultDict[int, list[Component]]): The components connected to each node (see
+              ``find_adjacent_component_and_node``)
+            passed (set[int]): The ``id`` for each component already passed through. The components in the branch are
+              added to it.
 
         Returns:
             tuple[list[Component], list[Component], list[bool]]: A tuple containing the list of components in the
             branch, the list of inductors in this branch, and the list of directions of each inductor, in relationship
             to the first.
         """
-        circuit = circuit.copy()
-
         branch = []
         inductors = []
         directions = []
         while True:
-            component, adjacent_node = find_adjacent_component_and_node(node, circuit)
+            component, adjacent_node = find_adjacent_component_and_node(node, adjacency, passed)
             # The directions tells us if the component is placed "along" the branch
-            direction = adjacent_node == component.nodes[1]
+            direction = adjacent_node == component.node_ids[1]
 
             branch.append(component)
             if component.type == "L":
                 inductors.append(component)
                 directions.append(direction)
 
-            # Removes the passed through component (so the next node doesn't become the same as the last one)
-            circuit.remove(component)
+            # Marks the passed through component (so the next node doesn't become the same as the last one)
+            passed.add(id(component))
 
             if adjacent_node in external_nodes:
                 break
@@ -250,40 +261,51 @@ def find_equivalent_inductors(circuit: list[Component]) -> list[EquivalentCompon
             tuple[list[list[Component]], list[list[bool]]]: Groups of inductors in parallel, and their directions
             related to the first.
         """
-        node_list = flatten(component.nodes for component in circuit)
+        node_list = flatten(component.node_ids for component in circuit)
         # External nodes: Nodes with three or more connections (beginnings of branches), or just one node ("terminals")
-        external_nodes = [i for i in Counter(node_list) if Counter(node_list)[i] != 2]
+        external_nodes = [node for node, connections in Counter(node_list).items() if connections != 2]
 
         # If there isn't a single external node, the first node is arbitrarily set as the external node
         if not external_nodes:
             external_nodes.append(node_list[0])
 
+        adjacency = defaultdict(list)
+        for component in reversed(circuit):
+            for node in dict.fromkeys(component.node_ids):
+                adjacency[node].append(component)
+
         inductor_groups = []
         directions = []
+        passed = set()
+        external_set = set(external_nodes)
         for node in external_nodes:
-            while any(node in component.nodes for component in circuit):
-                branch, inductors_in_series, series_directions = series_inductors_branch(node, external_nodes, circuit)
-                circuit = [i for i in circuit if i not in branch]
+            while find_adjacent_component_and_node(node, adjacency, passed) is not None:
+                branch = series_inductors_branch(node, external_set, adjacency, passed)
+                _, inductors_in_series, series_directions = branch
                 if len(inductors_in_series) > 1:
                     inductor_groups.append(inductors_in_series)
                     directions.append(series_directions)
         return inductor_groups, directions
 
     inductors_in_series_groups, directions_groups = series_inductors(circuit)
+    replaced = set()
+    new_components = []
     for inductors_in_series, directions in zip(inductors_in_series_groups, directions_groups):
         # For this loop, the first inductor is turned into an equivalent component, and all the others are turned into shorts
-        circuit.remove(inductors_in_series[0])
         for inductor in inductors_in_series[1:]:
-            circuit.remove(inductor)
-            inductor = deepcopy(inductor)
+            inductor = copy(inductor)
             inductor.type = "short"
             inductor.voltage = 0
             inductor.current = sp.Symbol(f"_I{inductor.name}")
-            circuit.append(inductor)
+            new_components.append(inductor)
+        replaced.update(id(inductor) for inductor in inductors_in_series)
 
         equivalent_inductance = sum(i.value for i in inductors_in_series)
         equivalent_inductor = EquivalentComponent(inductors_in_series, directions, equivalent_inductance)
-        circuit.append(equivalent_inductor)
+        new_components.append(equivalent_inductor)
+
+    circuit[:] = [component for component in circuit if id(component) not in replaced]
+    circuit.extend(new_components)
     return circuit
 
 
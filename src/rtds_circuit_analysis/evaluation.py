@@ -0,0 +1,70 @@
+"""Functions related to evaluating the solutions for a circuit over many parameter values at once, through NumPy"""
+
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
+import sympy as sp
+from numpy.typing import ArrayLike
+
+from rtds_circuit_analysis.utils import error_message
+
+
+@dataclass
+class CompiledSolution:
+    """A solution for the circuit, compiled into a single NumPy function.
+
+    Attributes:
+        keys (list[str]): The keys for the solution (component or node names), in the same order as the values returned
+          by the function.
+        symbols (list[str]): The names for the symbols the function receives, in order.
+        function (Callable): The function, which receives the value for each symbol (numbers or arrays), and returns
+          the value for each key.
+    """
+
+    keys: list[str]
+    symbols: list[str]
+    function: Callable
+
+
+def compile_solution(solution: dict[str, sp.Expr]) -> CompiledSolution:
+    """Compiles every expression in a solution into a single NumPy function, where the common subexpressions are only
+    evaluated once.
+
+    Args:
+        solution (dict[str, sp.Expr]): Dictionary that relates each component/node to its value.
+
+    Returns:
+        CompiledSolution: The compiled solution.
+    """
+    expressions = [sp.sympify(expression) for expression in solution.values()]
+    symbols = sorted(set().union(*(expression.free_symbols for expression in expressions)), key=str)
+    function = sp.lambdify(symbols, expressions, modules="numpy", cse=True)
+    return CompiledSolution(list(solution), [str(symbol) for symbol in symbols], function)
+
+
+def evaluate_compiled(compiled: CompiledSolution, values: dict[str, ArrayLike]) -> dict[str, np.ndarray]:
+    """Evaluates a compiled solution. The values for the symbols are broadcast against each other (like NumPy does), so
+    a sweep over many parameters can be done by giving each parameter its own axis.
+
+    Args:
+        compiled (CompiledSolution): The compiled solution.
+        values (dict[str, ArrayLike]): Dictionary that relates each symbol name to its value(s).
+
+    Returns:
+        dict[str, np.ndarray]: Dictionary that relates each component/node to its values, all with the broadcast shape.
+    """
+    unknown = [name for name in values if name not in compiled.symbols]
+    if unknown:
+        error_message(
+            f"The symbols {', '.join(unknown)} aren't in the solution. Valid symbols are: "
+            f"{', '.join(compiled.symbols) or 'none'}."
+        )
+    missing = [name for name in compiled.symbols if name not in values]
+    if missing:
+        error_message(f"Missing values for the symbols: {', '.join(missing)}.")
+
+    arrays = [np.asarray(values[name], dtype=float) for name in compiled.symbols]
+    shape = np.broadcast_shapes(*(array.shape for array in arrays))
+    results = compiled.function(*arrays)
+    return {key: np.broadcast_to(np.asarray(result, dtype=float), shape) for key, result in zip(compiled.keys, results)}
@@ -1,14 +1,11 @@
-from typing import TYPE_CHECKING
+import sympy as sp
 
 from rtds_circuit_analysis.parse_netlist import Component
 
-if TYPE_CHECKING:
-    import sympy as sp
-
 
 def object_value_association(
     lhs: str,
-    rhs: "sp.Expr",
+    rhs: sp.Expr,
     is_state: bool,
     lhs_is_derivative: bool,
     is_discrete: bool,
@@ -40,11 +37,12 @@ def object_value_association(
 
     middle_symbol = "=" if is_state else "-->"
 
-    return f"{lhs} {middle_symbol} {rhs}"
+    # Floats (from circuits solved numerically) are printed with only the digits they need
+    return f"{lhs} {middle_symbol} {sp.sstr(rhs, full_prec=False)}"
 
 
 def component_or_node_value_associations(
-    component_or_node_value_table: dict[str, "sp.Expr"],
+    component_or_node_value_table: dict[str, sp.Expr],
     filter_list: list[str],
     is_state: bool,
     lhs_is_derivative: bool,
@@ -108,7 +106,7 @@ def separate_existent(
 
 
 def format_output(
-    component_or_node_value_table: dict[str, "sp.Expr"],
+    component_or_node_value_table: dict[str, sp.Expr],
     components_or_nodes: list[str] | None,
     is_state: bool = False,
     lhs_is_derivative: bool = False,
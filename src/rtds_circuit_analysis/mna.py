@@ -0,0 +1,229 @@
+"""Functions related to solving the circuit through Modified Nodal Analysis (MNA)"""
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+import sympy as sp
+
+from rtds_circuit_analysis.block_triangular import linsolve_triangular
+from rtds_circuit_analysis.parse_netlist import Component
+from rtds_circuit_analysis.utils import error_message
+
+NO_UNIQUE_SOLUTION = (
+    "The circuit does not have a unique solution.\n"
+    "\033[1mHint\033[22m: Check for floating nodes, or for loops made up only of voltage sources/capacitors."
+)
+
+# Components that behave like voltage sources in the MNA, and thus need their currents as extra unknowns. Shorts are
+# voltage sources of 0V, and capacitors are voltage sources with their voltage as a state variable.
+VOLTAGE_TYPES = ("V", "C", "short")
+
+
+def is_voltage_type(component: Component) -> bool:
+    """Checks if the component behaves like a voltage source in the MNA. Resistors of 0 ohms are included, since their
+    conductance can't be stamped.
+
+    Args:
+        component (Component): The component to check.
+
+    Returns:
+        bool: True if the current through the component needs to be an unknown for the system.
+    """
+    return component.type in VOLTAGE_TYPES or (component.type == "R" and component.value == 0)
+
+
+@dataclass
+class MnaSystem:
+    """The sparse system of equations for the circuit, in the form ``matrix * unknowns = rhs * excitations``.
+
+    The unknowns are the voltage for every node (except the ground), followed by the current through every voltage
+    type component (voltage sources, capacitors and shorts). The excitations are the symbols that drive the circuit
+    (source values and state variables), and the number 1 for the numeric parts of the source values.
+
+    Both matrices are stored as dictionaries of dictionaries, where ``matrix[row][column]`` is the value in that
+    position. Positions that are zero are never stored.
+    """
+
+    nodes: list[str]
+    branches: list[Component]
+    excitations: list[sp.Expr] = field(default_factory=list)
+    matrix: defaultdict[int, dict[int, sp.Expr]] = field(default_factory=lambda: defaultdict(dict))
+    rhs: defaultdict[int, dict[int, sp.Expr]] = field(default_factory=lambda: defaultdict(dict))
+
+    @property
+    def size(self) -> int:
+        """Number of unknowns (and equations) for the system."""
+        return len(self.nodes) + len(self.branches)
+
+
+def find_node_indices(circuit: list[Component], ground: str = "0") -> dict[str, int]:
+    """Gives each node (except the ground) an index, in the order they first appear in the circuit.
+
+    Args:
+        circuit (list[Component]): List of components for the circuit.
+        ground (str, optional): The reference node, whose voltage is 0. Defaults to "0".
+
+    Returns:
+        dict[str, int]: Dictionary that relates each node name to its index.
+    """
+    node_indices = {}
+    for component in circuit:
+        for node in component.nodes:
+            if node != ground and node not in node_indices:
+                node_indices[node] = len(node_indices)
+    return node_indices
+
+
+def add_to_matrix(system: MnaSystem, row: int | None, column: int | None, value: sp.Expr):
+    """Adds a value to a position in the system's matrix. Rows or columns related to the ground are ignored.
+
+    Args:
+        system (MnaSystem): The system of equations.
+        row (int | None): The row for the value. None if the row relates to the ground.
+        column (int | None): The column for the value. None if the column relates to the ground.
+        value (sp.Expr): The value to add.
+    """
+    if row is None or column is None:
+        return
+    matrix_row = system.matrix[row]
+    matrix_row[column] = matrix_row.get(column, 0) + value
+
+
+def add_to_rhs(system: MnaSystem, row: int | None, value: sp.Expr):
+    """Adds a value to the right hand side of an equation, splitting it between its excitation and its coefficient.
+
+    Args:
+        system (MnaSystem): The system of equations.
+        row (int | None): The row for the equation. None if the row relates to the ground.
+        value (sp.Expr): The value to add (a source value or a state variable, possibly multiplied by a number).
+    """
+    if row is None or value == 0:
+        return
+    coefficient, excitation = sp.sympify(value).as_coeff_Mul()
+    if excitation not in system.excitations:
+        system.excitations.append(excitation)
+    column = system.excitations.index(excitation)
+    rhs_row = system.rhs[row]
+    rhs_row[column] = rhs_row.get(column, 0) + coefficient
+
+
+def stamp_components(circuit: list[Component], ground: str = "0") -> MnaSystem:
+    """Assembles the MNA system of equations, by adding the contribution (the "stamp") of each component to it.
+
+    Each node row holds the Kirchhoff Current Law for the node (currents leaving through the components equal the
+    currents injected into it), and each branch row holds the voltage across a voltage type component.
+
+    Args:
+        circuit (list[Component]): List of components for the circuit, with the equivalent components already in place.
+        ground (str, optional): The reference node, whose voltage is 0. Defaults to "0".
+
+    Returns:
+        MnaSystem: The system of equations for the circuit.
+    """
+    node_indices = find_node_indices(circuit, ground)
+    branches = [component for component in circuit if is_voltage_type(component)]
+    system = MnaSystem(list(node_indices), branches)
+
+    for component in circuit:
+        node1, node2 = (node_indices.get(node) for node in component.nodes)
+        match component.type:
+            case "R" if component.value != 0:
+                conductance = 1 / component.value
+                add_to_matrix(system, node1, node1, conductance)
+                add_to_matrix(system, node2, node2, conductance)
+                add_to_matrix(system, node1, node2, -conductance)
+                add_to_matrix(system, node2, node1, -conductance)
+            case "I":
+                # Current sources push their current out of their first node
+                add_to_rhs(system, node1, component.value)
+                add_to_rhs(system, node2, -component.value)
+            case "L":
+                # Inductors (with their current as a state variable) draw their current from their first node
+                add_to_rhs(system, node1, -component.current)
+                add_to_rhs(system, node2, component.current)
+
+    for i, component in enumerate(branches):
+        branch = len(node_indices) + i
+        # Voltage sources push their current out of their first node, while passive components draw it from there
+        direction = -1 if component.type == "V" else 1
+        node1, node2 = (node_indices.get(node) for node in component.nodes)
+        add_to_matrix(system, node1, branch, direction)
+        add_to_matrix(system, node2, branch, -direction)
+        add_to_matrix(system, branch, node1, 1)
+        add_to_matrix(system, branch, node2, -1)
+        add_to_rhs(system, branch, component.voltage or 0)
+
+    return system
+
+
+def solve_mna_system(system: MnaSystem) -> list[sp.Expr]:
+    """Solves the MNA system of equations, using the sparse linear solver from sympy on one block of coupled unknowns at
+    a time (see :func:`~rtds_circuit_analysis.block_triangular.linsolve_triangular`).
+
+    Args:
+        system (MnaSystem): The system of equations.
+
+    Returns:
+        list[sp.Expr]: The value for each unknown, in the same order as in the system.
+    """
+    if not system.excitations:
+        return [sp.Integer(0)] * system.size
+
+    unknowns = [sp.Dummy() for _ in range(system.size)]
+    equations = []
+    for row in range(system.size):
+        lhs = sp.Add(*(value * unknowns[column] for column, value in system.matrix.get(row, {}).items()))
+        rhs = sp.Add(*(value * system.excitations[column] for column, value in system.rhs.get(row, {}).items()))
+        equations.append(lhs - rhs)
+
+    solutions = linsolve_triangular(equations, unknowns)
+    if not solutions or any(solution.has(*unknowns) for solution in next(iter(solutions))):
+        error_message(NO_UNIQUE_SOLUTION)
+    return list(next(iter(solutions)))
+
+
+def component_solutions(circuit: list[Component], system: MnaSystem, values: list[sp.Expr]) -> list[sp.Expr]:
+    """Finds the same unknowns as the ones in :func:`~rtds_circuit_analysis.solve_circuit.find_unknowns`, from the
+    solution of the MNA system.
+
+    Args:
+        circuit (list[Component]): List of components for the circuit, with the equivalent components already in place.
+        system (MnaSystem): The system of equations for the circuit.
+        values (list[sp.Expr]): The value for each unknown of the system.
+
+    Returns:
+        list[sp.Expr]: The value for each unknown for the circuit (currents for resistors, capacitors and voltage
+        sources, and voltages for inductors and current sources).
+    """
+    node_voltages = dict(zip(system.nodes, values))
+    branch_currents = {component.name: value for component, value in zip(system.branches, values[len(system.nodes) :])}
+
+    solutions = []
+    for component in circuit:
+        voltage = node_voltages.get(component.nodes[0], 0) - node_voltages.get(component.nodes[1], 0)
+        if component.name in branch_currents:
+            solutions.append(branch_currents[component.name])
+        elif component.type == "R":
+            solutions.append(voltage / component.value)
+        else:
+            solutions.append(voltage)
+
+    return solutions
+
+
+def find_mna_solutions(circuit: list[Component], ground: str = "0") -> list[sp.Expr]:
+    """Solves the circuit through MNA, and finds the same unknowns as the ones in
+    :func:`~rtds_circuit_analysis.solve_circuit.find_unknowns`.
+
+    Args:
+        circuit (list[Component]): List of components for the circuit, with the equivalent components already in place.
+        ground (str, optional): The reference node. Any node gives the same currents and voltages for the components.
+          Defaults to "0".
+
+    Returns:
+        list[sp.Expr]: The value for each unknown for the circuit (currents for resistors, capacitors and voltage
+        sources, and voltages for inductors and current sources).
+    """
+    system = stamp_components(circuit, ground)
+    values = solve_mna_system(system)
+    return component_solutions(circuit, system, values)
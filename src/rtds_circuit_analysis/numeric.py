@@ -0,0 +1,205 @@
+"""Functions related to solving circuits where every component value is a number, through NumPy/SciPy instead of exact
+symbolic algebra"""
+
+import numpy as np
+import sympy as sp
+from scipy.sparse import csc_matrix
+from scipy.sparse.linalg import splu
+
+from rtds_circuit_analysis.mna import NO_UNIQUE_SOLUTION, MnaSystem, component_solutions, stamp_components
+from rtds_circuit_analysis.parse_netlist import Component
+from rtds_circuit_analysis.profiling import stage
+from rtds_circuit_analysis.utils import error_message
+
+# Values smaller than this (relative to the biggest value in the same expression) are rounding errors, and are removed
+RELATIVE_TOLERANCE = 1e-12
+
+
+def is_numeric(components: list[Component]) -> bool:
+    """Checks if every component value in the circuit is a number.
+
+    Args:
+        components (list[Component]): List of components for the circuit.
+
+    Returns:
+        bool: True if the circuit can be solved entirely through the numeric engine.
+    """
+    return all(sp.sympify(component.value).is_number for component in components)
+
+
+def check_numeric_values(components: list[Component]):
+    """Checks if the circuit can be solved through the numeric engine. Sources can have symbolic values (they become
+    inputs for the circuit), but every passive component needs a numeric value.
+
+    Args:
+        components (list[Component]): List of components for the circuit.
+    """
+    for component in components:
+        if component.type in ("R", "L", "C") and not sp.sympify(component.value).is_number:
+            error_message(
+                f"The component {component.name} has a symbolic value ({component.value}), so the circuit can't be "
+                "solved numerically.\n"
+                "\033[1mHint\033[22m: Only voltage and current sources can have symbolic values in numeric circuits."
+            )
+
+
+def chop(values: np.ndarray) -> np.ndarray:
+    """Removes the rounding errors from each row of an array, by zeroing the values that are negligible compared to the
+    biggest value in the same row.
+
+    Args:
+        values (np.ndarray): The array (with one or two dimensions).
+
+    Returns:
+        np.ndarray: The array, without the rounding errors.
+    """
+    values = np.atleast_2d(values)
+    threshold = RELATIVE_TOLERANCE * np.abs(values).max(axis=1, initial=0, keepdims=True)
+    return np.where(np.abs(values) <= threshold, 0.0, values)
+
+
+def to_number(value: float) -> sp.Expr:
+    """Converts a float into a sympy number. Unit values become integers, so they don't show up as coefficients.
+
+    Args:
+        value (float): The value to convert.
+
+    Returns:
+        sp.Expr: The sympy number.
+    """
+    if value in (1, -1):
+        return sp.Integer(int(value))
+    return sp.Float(value)
+
+
+def to_expressions(coefficients: np.ndarray, symbols: list[sp.Expr]) -> list[sp.Expr]:
+    """Turns each row of a coefficient matrix into the linear combination of the given symbols.
+
+    Args:
+        coefficients (np.ndarray): Matrix, with one column for each symbol.
+        symbols (list[sp.Expr]): The symbols (the number 1 can be used for the constant parts).
+
+    Returns:
+        list[sp.Expr]: One expression for each row of the matrix.
+    """
+    return [
+        sp.Add(*(to_number(value) * symbol for value, symbol in zip(row, symbols) if value != 0))
+        for row in chop(coefficients)
+    ]
+
+
+def to_float_matrices(system: MnaSystem) -> tuple[csc_matrix, np.ndarray]:
+    """Converts the MNA system into a sparse SciPy matrix, and a dense right hand side (one column for each excitation).
+
+    Args:
+        system (MnaSystem): The system of equations, with numeric coefficients.
+
+    Returns:
+        tuple[csc_matrix, np.ndarray]: The matrix and the right hand side for the system.
+    """
+    rows, columns, values = [], [], []
+    for row, matrix_row in system.matrix.items():
+        for column, value in matrix_row.items():
+            rows.append(row)
+            columns.append(column)
+            values.append(float(value))
+    matrix = csc_matrix((values, (rows, columns)), shape=(system.size, system.size))
+
+    rhs = np.zeros((system.size, len(system.excitations)))
+    for row, rhs_row in system.rhs.items():
+        for column, value in rhs_row.items():
+            rhs[row, column] = float(value)
+
+    return matrix, rhs
+
+
+def solve_numeric_system(system: MnaSystem) -> list[sp.Expr]:
+    """Solves the MNA system of equations through a sparse LU factorization, done only once for every excitation.
+
+    Args:
+        system (MnaSystem): The system of equations, with numeric coefficients.
+
+    Returns:
+        list[sp.Expr]: The value for each unknown, in the same order as in the system, as linear combinations (with
+        float coefficients) of the excitations.
+    """
+    if not system.excitations or not system.size:
+        return [sp.Integer(0)] * system.size
+
+    matrix, rhs = to_float_matrices(system)
+    try:
+        solutions = splu(matrix).solve(rhs)
+    except RuntimeError:
+        error_message(NO_UNIQUE_SOLUTION)
+    if not np.isfinite(solutions).all():
+        error_message(NO_UNIQUE_SOLUTION)
+
+    return to_expressions(solutions, system.excitations)
+
+
+def find_numeric_solutions(circuit: list[Component], ground: str = "0") -> list[sp.Expr]:
+    """Solves the circuit numerically, and finds the same unknowns as the ones in
+    :func:`~rtds_circuit_analysis.solve_circuit.find_unknowns`.
+
+    Args:
+        circuit (list[Component]): List of components for the circuit, with the equivalent components already in place.
+        ground (str, optional): The reference node (see :func:`~rtds_circuit_analysis.mna.find_mna_solutions`).
+          Defaults to "0".
+
+    Returns:
+        list[sp.Expr]: The value for each unknown for the circuit.
+    """
+    system = stamp_components(circuit, ground)
+    values = solve_numeric_system(system)
+    return component_solutions(circuit, system, values)
+
+
+def clean_expression(expression: sp.Expr) -> sp.Expr:
+    """The numeric counterpart of ``sp.simplify``. Expands the expression (so every symbol shows up only once), and
+    removes the rounding errors from it.
+
+    Args:
+        expression (sp.Expr): Linear expression with float coefficients.
+
+    Returns:
+        sp.Expr: The cleaned up expression.
+    """
+    terms = sp.expand(expression).as_coefficients_dict()
+    symbols = list(terms)
+    coefficients = np.array([[float(terms[symbol]) for symbol in symbols]])
+    return to_expressions(coefficients, symbols)[0]
+
+
+def clean_results(*dictionaries: list[dict[str, sp.Expr]]):
+    """Cleans up every value in a dictionary, through :func:`clean_expression`.
+
+    Args:
+        *dictionaries (list[dict[str, sp.Expr]]): List of dictionaries to clean up each.
+    """
+    with stage("simplify_results"):
+        for dictionary in dictionaries:
+            for key in dictionary:
+                dictionary[key] = clean_expression(dictionary[key])
+
+
+def linear_coefficients(expressions: list[sp.Expr], symbols: list[sp.Symbol]) -> tuple[np.ndarray, np.ndarray]:
+    """Finds the coefficient for each symbol in each linear expression.
+
+    Args:
+        expressions (list[sp.Expr]): The linear expressions.
+        symbols (list[sp.Symbol]): The symbols to find the coefficients for.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: A matrix with the coefficients (one row for each expression, one column for each
+        symbol), and a vector with the constant part of each expression.
+    """
+    columns = {symbol: i for i, symbol in enumerate(symbols)}
+    matrix = np.zeros((len(expressions), len(symbols)))
+    constants = np.zeros(len(expressions))
+    for row, expression in enumerate(expressions):
+        for term, coefficient in sp.expand(expression).as_coefficients_dict().items():
+            if term == 1:
+                constants[row] += float(coefficient)
+            else:
+                matrix[row, columns[term]] += float(coefficient)
+    return matrix, constants
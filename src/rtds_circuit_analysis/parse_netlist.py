@@ -1,50 +1,117 @@
 """Functions related to extracting and parsing data from a netlist"""
 
+import os
 import re
+from functools import lru_cache
+from typing import Iterable, Iterator
 
 import sympy as sp
 
-from rtds_circuit_analysis.utils import error_message
+from rtds_circuit_analysis.subcircuits import Element, Instance, Subcircuit, expand_instance
+from rtds_circuit_analysis.utils import NetlistError, error_message
+
+# Precompiled pattern for the number part of each value
+NUMBER_PATTERN = re.compile(r"[\d\.\-+eE]+")
+# Multiplier for each SI prefix
+SI_MULTIPLIERS = {
+    prefix: sp.Rational(10) ** exponent
+    for prefix, exponent in zip("pnμumkKMGT", (-12, -9, -6, -6, -3, 3, 3, 6, 9, 12))
+}
+# Number of distinct values kept by parse_value
+VALUE_CACHE_SIZE = 4096
+# The first letter for each type of component
+COMPONENT_TYPES = "VICLR"
+
+# The names for the nodes, and a dense integer ID for each one of them, shared by every circuit in the process (so the
+# same node name always has the same ID). The ground is always 0
+NODE_NAMES: list[str] = ["0"]
+NODE_IDS: dict[str, int] = {"0": 0}
+
+
+def node_id(node: str) -> int:
+    """Finds the integer ID for a node, giving it the next free one if the node wasn't seen before.
+
+    Args:
+        node (str): The name for the node.
+
+    Returns:
+        int: The ID.
+    """
+    identifier = NODE_IDS.get(node)
+    if identifier is None:
+        identifier = NODE_IDS[node] = len(NODE_NAMES)
+        NODE_NAMES.append(node)
+    return identifier
 
 
 class Component:
     """Represents a component in a circuit. Mostly for internal use, although you can use it to extract the voltage and
     current directly from a component.
 
+    The nodes are turned into integer IDs when the component is created (see :func:`node_id`), which the passes over
+    the topology of the circuit compare instead of the names. The names are kept for the results and for printing, as
+    the same string object for every component connected to each node.
+
     Attributes:
         name (str): The name of the component.
         type (str): What type the component is ("V" for voltage sources, "R" for resistors, etc)
         nodes (tuple[str]): The two nodes the component is connected to, in order
+        node_ids (tuple[int, int]): The IDs for the two nodes, in the same order
         value (sympy.Rational | sympy.Symbol): The value for the component (Volts for voltage sources, Ohms for
           resistors, etc)
         current: The current calculated for the component
         voltage: The voltage calculated for the component
     """
 
+    __slots__ = ("name", "type", "nodes", "node_ids", "value", "_current", "_voltage")
+
     def __init__(self, name: str, nodes: tuple[str], value: sp.Rational | sp.Symbol):
         self.name = name
         self.type = name[0]
-        self.nodes = nodes
-        # Strings beginning with "_" are the unknowns for the equations
+        self.node_ids = (node_id(nodes[0]), node_id(nodes[1]))
+        self.nodes = (NODE_NAMES[self.node_ids[0]], NODE_NAMES[self.node_ids[1]])
+        self.value = value
+        # The current and voltage are only set up once they are first needed (see _initial_values), since creating
+        # their symbols takes most of the time for parsing a big netlist
+
+    def _initial_values(self) -> tuple[sp.Expr | None, sp.Expr | None]:
+        # The current and voltage before the circuit is solved. Strings beginning with "_" are the unknowns for the
+        # equations
         match self.type:
             case "V":
-                self.value = self.voltage = value
-                self.current = sp.Symbol(f"_I{self.name}")
+                return sp.Symbol(f"_I{self.name}"), self.value
             case "I":
-                self.value = self.current = value
-                self.voltage = sp.Symbol(f"_V{self.name}")
+                return self.value, sp.Symbol(f"_V{self.name}")
             case "C":
-                self.voltage = sp.Symbol(f"V{self.name}")
-                self.current = sp.Symbol(f"_I{self.name}")
-                self.value = value
+                return sp.Symbol(f"_I{self.name}"), sp.Symbol(f"V{self.name}")
             case "L":
-                self.current = sp.Symbol(f"I{self.name}")
-                self.voltage = sp.Symbol(f"_V{self.name}")
-                self.value = value
-            case "R":
-                self.voltage = None
-                self.current = sp.Symbol(f"_I{self.name}")
-                self.value = value
+                return sp.Symbol(f"I{self.name}"), sp.Symbol(f"_V{self.name}")
+            case _:
+                return sp.Symbol(f"_I{self.name}"), None
+
+    @property
+    def current(self) -> sp.Expr:
+        try:
+            return self._current
+        except AttributeError:
+            self._current = self._initial_values()[0]
+            return self._current
+
+    @current.setter
+    def current(self, current: sp.Expr):
+        self._current = current
+
+    @property
+    def voltage(self) -> sp.Expr | None:
+        try:
+            return self._voltage
+        except AttributeError:
+            self._voltage = self._initial_values()[1]
+            return self._voltage
+
+    @voltage.setter
+    def voltage(self, voltage: sp.Expr | None):
+        self._voltage = voltage
 
     def __str__(self):
         if self.type == "short":
@@ -64,6 +131,7 @@ class Component:
         return f"Component({self.name}, {self.nodes}, {self.value})"
 
 
+@lru_cache(maxsize=VALUE_CACHE_SIZE)
 def parse_value(value: str) -> sp.Expr:
     """Parse the value as a number, symbol, or expression.
 
@@ -74,6 +142,9 @@ def parse_value(value: str) -> sp.Expr:
           Integer/Rational), and a Sympy Symbol (example: 2R1 -> 2 * R1)
         - Numbers with SI prefixes are converted accordingly (example: 1K -> 1000)
 
+    The results are memoized, since generated netlists repeat the same few values over and over (sympy expressions
+    are immutable, so sharing them is safe).
+
     Args:
         value (str): The unparsed value.
 
@@ -85,18 +156,16 @@ def parse_value(value: str) -> sp.Expr:
         return sp.Symbol(value)
 
     # Splits the value between the number part, and the rest (including SI prefix)
-    match = re.search(r"[\d\.\-+eE]+", value)
+    match = NUMBER_PATTERN.search(value)
     value_number_part = match.group(0)
     value_rest = value[match.end(0) :]
     if value_number_part == "-":
         value_number_part = "-1"
 
     # Convert SI prefix to number, if it is present
-    si_prefix_exp_table = dict(zip("pnμumkKMGT", (-12, -9, -6, -6, -3, 3, 3, 6, 9, 12)))
     si_multiplier = sp.Integer(1)
-    if value_rest and value_number_part != "-1" and value_rest[0] in si_prefix_exp_table:
-        si_exp = sp.Rational(si_prefix_exp_table[value_rest[0]])
-        si_multiplier = sp.Rational(10**si_exp)
+    if value_rest and value_number_part != "-1" and value_rest[0] in SI_MULTIPLIERS:
+        si_multiplier = SI_MULTIPLIERS[value_rest[0]]
         value_rest = value_rest[1:]
 
     if not value_rest:
@@ -104,31 +173,45 @@ def parse_value(value: str) -> sp.Expr:
     return sp.Rational(value_number_part) * si_multiplier * sp.Symbol(value_rest)
 
 
-def get_lines(file_name: str) -> list[str]:
-    """Reads the netlist file, and saves each relevant line in a list.
+def iter_lines(netlist: "str | os.PathLike | Iterable[str]") -> Iterator[tuple[int, str]]:
+    """Streams the relevant lines of a netlist, alongside their line numbers (starting at 1). Files are read one line
+    at a time, so they are never kept whole in memory.
 
     This function ignores the following lines:
     - Lines beginning with *
     - Empty lines
 
+    Args:
+        netlist (str | os.PathLike | Iterable[str]): The path for the netlist file, or its lines (any iterable of
+          strings, such as an open file).
+
+    Yields:
+        tuple[int, str]: The line number, and the line (without surrounding whitespace).
+    """
+    if isinstance(netlist, (str, os.PathLike)):
+        with open(netlist, "r", encoding="utf-8") as file:
+            yield from iter_lines(file)
+        return
+
+    for line_number, line in enumerate(netlist, 1):
+        line = line.strip()
+        if line and line[0] != "*":  # Removes comments and empty lines
+            yield line_number, line
+
+
+def get_lines(file_name: str) -> list[str]:
+    """Reads the netlist file, and saves each relevant line in a list (see :func:`iter_lines`).
+
     Args:
         file_name (str): Netlist file path.
 
     Returns:
         list[str]: List of relevant lines.
     """
-    with open(file_name, "r", encoding="utf-8") as f:
-        spice_file = f.readlines()
-        lines = []
-        for line in spice_file:
-            line = line.strip()
-            if not line or line[0] == "*":  # Removes comments and empty lines
-                continue
-            lines.append(line)
-        return lines
-
-
-def separate_line(line: str, num: int) -> tuple[str]:
+    return [line for _, line in iter_lines(file_name)]
+
+
+def separate_line(line: str, num: int) -> list[str]:
     """Separates the line in words, and check if they match a predetermined value. If they don't, show an error message
     and quit the program.
 
@@ -137,38 +220,142 @@ def separate_line(line: str, num: int) -> tuple[str]:
         num (int): The number of words the line should be separated in.
 
     Returns:
-        tuple[str]: The words for the line
+        list[str]: The words for the line
     """
-    words = re.split(r"\s+", line)
+    words = line.split()
     if len(words) != num:
         error_message(f"Line '{line}' was supposed to have {num} words, got {len(words)} instead.")
     return words
 
 
-def parse_components(lines: list[str], time_step: None | str) -> tuple[list[Component], bool]:
-    """Turn the lines into component objects.
+class NetlistParser:
+    """Streams the components in a netlist, parsing one line at a time, so big netlists never need to be whole in
+    memory (as lines or as components). Any error in a line raises a :class:`~rtds_circuit_analysis.utils.NetlistError`
+    with its line number.
+
+    .. code-block:: python
+
+        parser = NetlistParser("big_netlist.cir")
+        for component in parser:
+            ...
+        parser.time_step  # Only set once the .STEP line is read
+
+    Args:
+        netlist (str | os.PathLike | Iterable[str]): The path for the netlist file, or its lines (any iterable of
+          strings, such as an open file).
+        source (str | None, optional): Name for the netlist in the error messages. Defaults to the path for the file,
+          or "<netlist>" for the lines.
+
+    Attributes:
+        source (str): Name for the netlist in the error messages.
+        time_step (sp.Expr | None): The value in the ``.STEP`` line, once it is read. None if there is none.
+        subcircuits (dict[str, Subcircuit]): The subcircuit definitions read so far, by name. The instances of the
+          subcircuits (``X`` lines) are expanded after the last line is read (see
+          :func:`~rtds_circuit_analysis.subcircuits.expand_instance`).
+    """
+
+    def __init__(self, netlist: "str | os.PathLike | Iterable[str]", source: str | None = None):
+        self._netlist = netlist
+        if source is None:
+            source = os.fspath(netlist) if isinstance(netlist, (str, os.PathLike)) else "<netlist>"
+        self.source = source
+        self.time_step = None
+        self.subcircuits: dict[str, Subcircuit] = {}
+
+    def _error(self, reason: str, line_number: int, line: str):
+        raise NetlistError(reason, line_number, line, self.source)
+
+    def _words(self, line_number: int, line: str, num: int) -> list[str]:
+        words = line.split()
+        if len(words) != num:
+            self._error(f"Expected {num} words, got {len(words)} instead.", line_number, line)
+        return words
+
+    def _value(self, line_number: int, line: str, value: str) -> sp.Expr:
+        try:
+            return parse_value(value)
+        except (AttributeError, TypeError, ValueError, sp.SympifyError):
+            self._error(f"Invalid value '{value}'.", line_number, line)
+
+    def _component(self, line_number: int, line: str) -> Element:
+        name, node1, node2, value = self._words(line_number, line, 4)
+        name = name.upper()
+        if name[0] not in COMPONENT_TYPES:
+            self._error(
+                f"Unknown type '{name[0]}' for component {name}. Valid types are: {', '.join(COMPONENT_TYPES)}.",
+                line_number,
+                line,
+            )
+        return name, (node1.upper(), node2.upper()), self._value(line_number, line, value)
+
+    def _instance(self, line_number: int, line: str) -> Instance:
+        name, *nodes, subcircuit = line.upper().split()
+        if not nodes:
+            self._error("Expected the nodes and the subcircuit for the instance.", line_number, line)
+        return Instance(name, tuple(nodes), subcircuit, line_number, line, self.source)
+
+    def __iter__(self) -> Iterator[Component]:
+        # The instances are only expanded at the end, since their definitions may come after them
+        instances: list[Instance] = []
+        definition, definition_line = None, None
+        for line_number, line in iter_lines(self._netlist):
+            command = line.split(maxsplit=1)[0].upper()
+            if command == ".SUBCKT":
+                if definition is not None:
+                    self._error("Subcircuit definitions can't be nested (missing .ENDS?).", line_number, line)
+                _, name, *ports = line.upper().split()
+                if not ports:
+                    self._error(f"Subcircuit '{name}' has no ports.", line_number, line)
+                if len(set(ports)) != len(ports):
+                    self._error(f"Subcircuit '{name}' has repeated ports.", line_number, line)
+                if name in self.subcircuits:
+                    self._error(f"Subcircuit '{name}' is already defined.", line_number, line)
+                definition, definition_line = Subcircuit(name, tuple(ports)), (line_number, line)
+            elif command == ".ENDS":
+                if definition is None:
+                    self._error(".ENDS without a .SUBCKT line.", line_number, line)
+                if line.upper().split()[1:2] not in ([], [definition.name]):
+                    self._error(f".ENDS for another subcircuit (expected '{definition.name}').", line_number, line)
+                self.subcircuits[definition.name] = definition
+                definition = None
+            elif command == ".STEP":
+                if definition is not None:
+                    self._error(".STEP can't be inside a subcircuit definition.", line_number, line)
+                _, time_step = self._words(line_number, line, 2)
+                self.time_step = self._value(line_number, line, time_step)
+            elif command[0] == "X":
+                instance = self._instance(line_number, line)
+                (instances if definition is None else definition.instances).append(instance)
+            elif definition is not None:
+                definition.elements.append(self._component(line_number, line))
+            else:
+                name, nodes, value = self._component(line_number, line)
+                yield Component(name, nodes, value)
+
+        if definition is not None:
+            self._error(f"Subcircuit '{definition.name}' has no .ENDS line.", *definition_line)
+        for instance in instances:
+            for name, nodes, value in expand_instance(self.subcircuits, instance):
+                yield Component(name, nodes, value)
+
+def parse_components(
+    lines: "str | os.PathLike | Iterable[str]", time_step: None | str
+) -> tuple[list[Component], sp.Expr | None]:
+    """Turn the lines into component objects (see :class:`NetlistParser`).
 
     Args:
-        lines (list[str]): Lines from the .cir file.
+        lines (str | os.PathLike | Iterable[str]): Lines from the .cir file, or the path for the file itself.
+        time_step (None | str): The time step for the circuit, if the netlist has no .STEP line.
 
     Returns:
-        tuple[list[Component], bool]: List of Component objects, and possibly the time step for the circuit (if there is
-        a .STEP line in the netlist)
+        tuple[list[Component], sp.Expr | None]: List of Component objects, and possibly the time step for the circuit
+        (the one in the .STEP line in the netlist takes precedence)
     """
-    components = []
-    possible_time_step = None
-    for line in lines:
-        if len(line) >= 5 and line[:5].upper() == ".STEP":
-            _, possible_time_step = separate_line(line, 2)
-            continue
-        name, node1, node2, value = separate_line(line, 4)
-        name, node1, node2 = map(lambda x: x.upper(), (name, node1, node2))
-        component = Component(name, (node1, node2), parse_value(value))
-        components.append(component)
+    parser = NetlistParser(lines)
+    components = list(parser)
 
+    if parser.time_step is not None:
+        return components, parser.time_step
     if time_step:
-        time_step = parse_value(time_step)
-    if possible_time_step:
-        time_step = parse_value(possible_time_step)
-
+        return components, parse_value(time_step)
     return components, time_step
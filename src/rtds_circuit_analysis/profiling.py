@@ -0,0 +1,168 @@
+"""Functions related to measuring how long each stage of solving a circuit takes, and how big the expressions it finds
+are"""
+
+import cProfile
+import time
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import sympy as sp
+
+# The profiler for the code running right now. When there is none, the stages aren't measured at all
+_ACTIVE_PROFILER: ContextVar["Profiler | None"] = ContextVar("active_profiler", default=None)
+
+
+@dataclass
+class StageStats:
+    """Statistics for a single stage.
+
+    Attributes:
+        seconds (float): Total wall time spent in the stage, not counting the stages run inside it (so the times for
+          every stage add up to the total time).
+        calls (int): Number of times the stage was run.
+        operations (int | None): Total number of operations (see ``sympy.count_ops``) in the expressions found by the
+          stage, or None if the stage doesn't find expressions.
+    """
+
+    seconds: float = 0.0
+    calls: int = 0
+    operations: int | None = None
+
+
+class Profiler:
+    """Collects the statistics for each stage run while it is active (see :meth:`activate`).
+
+    Args:
+        cprofile_stages (Iterable[str], optional): Stages to also run under ``cProfile``. The results for each one of
+          them are written to ``<output_dir>/<stage>.prof`` (accumulated over every call), which can be read with
+          ``pstats`` or snakeviz. Defaults to no stages.
+        output_dir (str | Path, optional): Directory for the ``cProfile`` results. Defaults to the current directory.
+
+    Attributes:
+        stages (dict[str, StageStats]): The statistics for each stage, in the order they were first run.
+    """
+
+    def __init__(self, cprofile_stages: Iterable[str] = (), output_dir: str | Path = "."):
+        self.stages: dict[str, StageStats] = {}
+        self.cprofile_stages = set(cprofile_stages)
+        self.output_dir = Path(output_dir)
+        self._cprofiles: dict[str, cProfile.Profile] = {}
+        # Time spent in the stages run inside each stage that is still running
+        self._nested_seconds: list[float] = []
+        self._cprofile_running = False
+
+    @contextmanager
+    def activate(self) -> Iterator["Profiler"]:
+        """Measures every stage run inside the ``with`` block (in the current thread or task)."""
+        token = _ACTIVE_PROFILER.set(self)
+        try:
+            yield self
+        finally:
+            _ACTIVE_PROFILER.reset(token)
+
+    @contextmanager
+    def measure(self, name: str) -> Iterator[None]:
+        """Measures the code inside the ``with`` block as a stage (running it under ``cProfile``, if asked to). Only one
+        ``cProfile`` can run at a time, so a stage inside another one that is already under ``cProfile`` is only
+        included in the results of the outer one.
+
+        Args:
+            name (str): The name for the stage.
+        """
+        profile = None
+        if name in self.cprofile_stages and not self._cprofile_running:
+            profile = self._cprofiles.setdefault(name, cProfile.Profile())
+            self._cprofile_running = True
+            profile.enable()
+
+        self._nested_seconds.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = self._nested_seconds.pop()
+            if self._nested_seconds:
+                self._nested_seconds[-1] += elapsed
+
+            if profile is not None:
+                profile.disable()
+                self._cprofile_running = False
+                self.output_dir.mkdir(parents=True, exist_ok=True)
+                profile.dump_stats(self.output_dir / f"{name}.prof")
+
+            stats = self.stages.setdefault(name, StageStats())
+            stats.seconds += elapsed - nested
+            stats.calls += 1
+
+    def as_dict(self) -> dict[str, dict]:
+        """The statistics for each stage, as plain dictionaries (ready to be written as JSON).
+
+        Returns:
+            dict[str, dict]: Dictionary that relates each stage to its statistics.
+        """
+        return {name: vars(stats).copy() for name, stats in self.stages.items()}
+
+    def report(self) -> str:
+        """Writes the statistics as a table, with a row for each stage.
+
+        Returns:
+            str: The table.
+        """
+        width = max((len(name) for name in self.stages), default=5)
+        lines = [f"{'stage':<{width}} {'calls':>6} {'seconds':>10} {'operations':>11}"]
+        for name, stats in self.stages.items():
+            operations = "-" if stats.operations is None else stats.operations
+            lines.append(f"{name:<{width}} {stats.calls:>6} {stats.seconds:>10.4f} {operations:>11}")
+        total = sum(stats.seconds for stats in self.stages.values())
+        lines.append(f"{'total':<{width}} {'':>6} {total:>10.4f}")
+        return "\n".join(lines)
+
+
+def profiling(profiler: Profiler | None) -> AbstractContextManager:
+    """Activates the profiler inside the ``with`` block, if there is one.
+
+    Args:
+        profiler (Profiler | None): The profiler.
+
+    Returns:
+        AbstractContextManager: The context manager for the ``with`` block.
+    """
+    return profiler.activate() if profiler is not None else nullcontext()
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Measures the code inside the ``with`` block as a stage, for the active profiler. It does nothing if no profiler
+    is active.
+
+    Args:
+        name (str): The name for the stage.
+    """
+    profiler = _ACTIVE_PROFILER.get()
+    if profiler is None:
+        yield
+        return
+
+    with profiler.measure(name):
+        yield
+
+
+def record_expressions(name: str, expressions: Iterable):
+    """Adds the size of the expressions found by a stage to its statistics, for the active profiler. It does nothing if
+    no profiler is active (counting the operations can take a while for big expressions). It should be called outside
+    the stage, so the counting isn't part of its time.
+
+    Args:
+        name (str): The name for the stage.
+        expressions (Iterable): The expressions found (anything that isn't a sympy expression is ignored).
+    """
+    profiler = _ACTIVE_PROFILER.get()
+    if profiler is None:
+        return
+    operations = sum(sp.count_ops(expression) for expression in expressions if isinstance(expression, sp.Basic))
+    stats = profiler.stages.setdefault(name, StageStats())
+    stats.operations = (stats.operations or 0) + operations
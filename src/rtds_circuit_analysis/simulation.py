@@ -0,0 +1,312 @@
+"""Functions related to simulating the discrete state equations for a circuit over time, through NumPy"""
+
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator
+
+import numpy as np
+import sympy as sp
+from numpy.typing import ArrayLike
+from scipy.signal import lfilter
+
+from rtds_circuit_analysis.diference_equations import to_state_variables
+from rtds_circuit_analysis.numeric import linear_coefficients
+from rtds_circuit_analysis.parse_netlist import Component
+from rtds_circuit_analysis.state_space import find_inputs
+from rtds_circuit_analysis.utils import error_message
+
+# Number of steps simulated at once. The memory used doesn't depend on the number of steps, only on this
+CHUNK_SIZE = 65536
+# Above this condition number for the eigenvectors, the steps are run one by one instead of through the modal form
+MAX_CONDITION = 1e8
+
+
+@dataclass
+class DiscreteSystem:
+    """The discrete state equations for a circuit, with a numeric value for every component, in the form:
+
+    .. math::
+
+        x[n] = \\Phi x[n-1] + \\Gamma_{old} u[n-1] + \\Gamma_{new} u[n] + k
+
+        y[n] = C x[n] + D u[n] + f
+
+    Where :math:`x` are the state variables, :math:`u` are the inputs (the symbolic values of the sources) and
+    :math:`y` are the node voltages followed by the currents.
+
+    Attributes:
+        states (list[str]): Name of each state variable (ex.: ``"VC1"``).
+        inputs (list[str]): Name of each input.
+        node_voltages (list[str]): Name of each node, in the same order as the first rows of ``c``.
+        currents (list[str]): Name of each component with a current, in the same order as the last rows of ``c``.
+        phi (np.ndarray): The matrix for the previous states.
+        gamma_old (np.ndarray): The matrix for the previous inputs.
+        gamma_new (np.ndarray): The matrix for the current inputs.
+        k (np.ndarray): The constant part of each state equation.
+        c (np.ndarray): The matrix for the states in the outputs.
+        d (np.ndarray): The matrix for the inputs in the outputs.
+        f (np.ndarray): The constant part of each output.
+    """
+
+    states: list[str]
+    inputs: list[str]
+    node_voltages: list[str]
+    currents: list[str]
+    phi: np.ndarray
+    gamma_old: np.ndarray
+    gamma_new: np.ndarray
+    k: np.ndarray
+    c: np.ndarray
+    d: np.ndarray
+    f: np.ndarray
+
+
+@dataclass
+class SimulationResult:
+    """The values over time for a simulated circuit. Sample ``n`` is the value at ``t = n * Ts``.
+
+    Attributes:
+        states (dict[str, np.ndarray]): Dictionary that relates each state variable to its values.
+        node_voltages (dict[str, np.ndarray]): Dictionary that relates each node to its voltages.
+        currents (dict[str, np.ndarray]): Dictionary that relates each component to its currents (see
+          :attr:`~rtds_circuit_analysis.Circuit.currents`).
+    """
+
+    states: dict[str, np.ndarray] = field(default_factory=dict)
+    node_voltages: dict[str, np.ndarray] = field(default_factory=dict)
+    currents: dict[str, np.ndarray] = field(default_factory=dict)
+
+
+def find_discrete_system(
+    equations: dict[str, sp.Expr],
+    node_voltages: dict[str, sp.Expr],
+    currents: dict[str, sp.Expr],
+    components: list[Component],
+    parameters: dict[str, float],
+) -> DiscreteSystem:
+    """Finds the matrices for the discrete state equations (and the outputs), replacing every symbolic component value
+    by a number.
+
+    Args:
+        equations (dict[str, sp.Expr]): Dictionary that relates each energy storage component to its discrete state
+          equation, for a single method.
+        node_voltages (dict[str, sp.Expr]): Dictionary that relates each node to its voltage.
+        currents (dict[str, sp.Expr]): Dictionary that relates each component to its current.
+        components (list[Component]): List of components for the circuit, to find the inputs.
+        parameters (dict[str, float]): The value for every symbol that isn't a state variable or an input (including
+          ``Ts``, if the circuit has no time step).
+
+    Returns:
+        DiscreteSystem: The matrices for the circuit.
+    """
+    states = [sp.Symbol(variable) for variable in to_state_variables(equations)]
+    inputs = find_inputs(components)
+    previous = [sp.Symbol(f"{symbol}_{{n-1}}") for symbol in states + inputs]
+    new = [sp.Symbol(f"{symbol}_{{n}}") for symbol in inputs]
+    outputs = list(node_voltages.values()) + list(currents.values())
+
+    variables = set(previous + new + states + inputs)
+    expressions = [sp.sympify(expression) for expression in list(equations.values()) + outputs]
+    symbols = set().union(*(expression.free_symbols for expression in expressions)) - variables
+    names = {str(symbol) for symbol in symbols}
+    unknown = sorted(set(parameters) - names)
+    if unknown:
+        error_message(
+            f"The symbols {', '.join(unknown)} aren't parameters for the circuit. Valid parameters are: "
+            f"{', '.join(sorted(names)) or 'none'}."
+        )
+    missing = sorted(names - set(parameters))
+    if missing:
+        error_message(f"Missing values for the parameters: {', '.join(missing)}.")
+
+    values = {symbol: float(parameters[str(symbol)]) for symbol in symbols}
+    discrete_expressions = [expression.subs(values) for expression in expressions[: len(states)]]
+    output_expressions = [expression.subs(values) for expression in expressions[len(states) :]]
+    discrete_matrix, k = linear_coefficients(discrete_expressions, previous + new)
+    output_matrix, f = linear_coefficients(output_expressions, states + inputs)
+    n_states, n_inputs = len(states), len(inputs)
+
+    return DiscreteSystem(
+        states=[str(symbol) for symbol in states],
+        inputs=[str(symbol) for symbol in inputs],
+        node_voltages=list(node_voltages),
+        currents=list(currents),
+        phi=discrete_matrix[:, :n_states],
+        gamma_old=discrete_matrix[:, n_states : n_states + n_inputs],
+        gamma_new=discrete_matrix[:, n_states + n_inputs :],
+        k=k,
+        c=output_matrix[:, :n_states],
+        d=output_matrix[:, n_states:],
+        f=f,
+    )
+
+
+def modal_form(phi: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray] | None:
+    """Diagonalizes the state matrix, so each mode of the circuit can be simulated on its own (as a first order filter).
+
+    Args:
+        phi (np.ndarray): The matrix for the previous states.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray] | None: The eigenvalues, the eigenvectors and their inverse. None if
+        the matrix isn't (numerically) diagonalizable.
+    """
+    eigenvalues, vectors = np.linalg.eig(phi)
+    if np.linalg.cond(vectors) > MAX_CONDITION:
+        return None
+    return eigenvalues, vectors, np.linalg.inv(vectors)
+
+
+def propagate(
+    phi: np.ndarray,
+    modes: tuple[np.ndarray, np.ndarray, np.ndarray] | None,
+    state: np.ndarray,
+    drive: np.ndarray,
+) -> np.ndarray:
+    """Runs ``x[n] = phi x[n-1] + drive[n]`` for every step in the chunk.
+
+    Args:
+        phi (np.ndarray): The matrix for the previous states.
+        modes (tuple[np.ndarray, np.ndarray, np.ndarray] | None): The modal form for ``phi`` (see :func:`modal_form`).
+          If None, the steps are run one by one.
+        state (np.ndarray): The state before the first step.
+        drive (np.ndarray): The part of each step that doesn't depend on the states (one row for each step).
+
+    Returns:
+        np.ndarray: The state after each step (one row for each step).
+    """
+    if modes is None:
+        trajectory = np.empty_like(drive)
+        for step, step_drive in enumerate(drive):
+            state = phi @ state + step_drive
+            trajectory[step] = state
+        return trajectory
+
+    # In the modal form, each mode is z[n] = eigenvalue * z[n-1] + drive[n], which lfilter runs entirely in C
+    eigenvalues, vectors, inverse = modes
+    modal_drive = drive @ inverse.T
+    modal_state = inverse @ state
+    trajectory = np.empty(drive.shape, dtype=complex)
+    for mode, eigenvalue in enumerate(eigenvalues):
+        initial = [eigenvalue * modal_state[mode]]
+        trajectory[:, mode] = lfilter([1], [1, -eigenvalue], modal_drive[:, mode], zi=initial)[0]
+    return (trajectory @ vectors.T).real
+
+
+def simulate_chunks(
+    system: DiscreteSystem,
+    chunks: Iterable[np.ndarray],
+    initial: dict[str, float] | None = None,
+) -> Iterator[SimulationResult]:
+    """Simulates the circuit, one chunk of inputs at a time, so the memory used doesn't grow with the number of steps.
+    The first sample is the initial state, and the inputs before it are assumed to be the same as in the first sample.
+
+    Args:
+        system (DiscreteSystem): The discrete state equations for the circuit.
+        chunks (Iterable[np.ndarray]): The inputs for each chunk, with one row for each sample and one column for each
+          input (in the same order as ``system.inputs``). See :func:`input_chunks`.
+        initial (dict[str, float] | None, optional): Dictionary that relates state variables to their initial values.
+          The ones not given start at zero. Defaults to None.
+
+    Yields:
+        SimulationResult: The values for each sample in the chunk.
+    """
+    initial = initial or {}
+    unknown = sorted(set(initial) - set(system.states))
+    if unknown:
+        error_message(
+            f"The state variables {', '.join(unknown)} aren't in the circuit. Valid state variables are: "
+            f"{', '.join(system.states) or 'none'}."
+        )
+
+    state = np.array([float(initial.get(variable, 0)) for variable in system.states])
+    modes = modal_form(system.phi) if system.states else None
+    previous_input = None
+    for inputs in chunks:
+        if len(inputs) == 0:
+            continue
+
+        if previous_input is None:
+            before, after = inputs[:-1], inputs[1:]
+        else:
+            before, after = np.vstack([previous_input, inputs[:-1]]), inputs
+        drive = before @ system.gamma_old.T + after @ system.gamma_new.T + system.k
+        trajectory = propagate(system.phi, modes, state, drive)
+        if previous_input is None:
+            trajectory = np.vstack([state, trajectory])
+
+        state, previous_input = trajectory[-1], inputs[-1]
+        outputs = trajectory @ system.c.T + inputs @ system.d.T + system.f
+        n_nodes = len(system.node_voltages)
+        yield SimulationResult(
+            states=dict(zip(system.states, trajectory.T)),
+            node_voltages=dict(zip(system.node_voltages, outputs[:, :n_nodes].T)),
+            currents=dict(zip(system.currents, outputs[:, n_nodes:].T)),
+        )
+
+
+def input_chunks(
+    system: DiscreteSystem,
+    inputs: dict[str, ArrayLike],
+    steps: int | None = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[np.ndarray]:
+    """Splits the input sequences into chunks, in the format used by :func:`simulate_chunks`.
+
+    Args:
+        system (DiscreteSystem): The discrete state equations for the circuit.
+        inputs (dict[str, ArrayLike]): Dictionary that relates every input to its value for each sample (a sequence),
+          or to a constant value (a number).
+        steps (int | None, optional): Number of samples. If None, it is the length of the sequences. Defaults to None.
+        chunk_size (int, optional): Number of samples in each chunk. Defaults to CHUNK_SIZE.
+
+    Yields:
+        np.ndarray: The inputs for each chunk.
+    """
+    unknown = sorted(set(inputs) - set(system.inputs))
+    if unknown:
+        error_message(
+            f"The symbols {', '.join(unknown)} aren't inputs for the circuit. Valid inputs are: "
+            f"{', '.join(system.inputs) or 'none'}."
+        )
+    missing = [name for name in system.inputs if name not in inputs]
+    if missing:
+        error_message(f"Missing values for the inputs: {', '.join(missing)}.")
+    if chunk_size < 1:
+        error_message(f"The chunk size needs to be positive (got {chunk_size}).")
+
+    sequences = {name: np.asarray(inputs[name], dtype=float) for name in system.inputs}
+    lengths = {len(sequence) for sequence in sequences.values() if sequence.ndim > 0}
+    if steps is None:
+        if len(lengths) > 1:
+            error_message("The input sequences have different lengths. Give the number of steps through 'steps'.")
+        if not lengths:
+            error_message("Every input is constant, so the number of steps needs to be given through 'steps'.")
+        steps = lengths.pop()
+    if any(length < steps for length in lengths):
+        error_message(f"Every input sequence needs at least {steps} samples.")
+
+    for start in range(0, steps, chunk_size):
+        end = min(start + chunk_size, steps)
+        chunk = np.empty((end - start, len(system.inputs)))
+        for column, sequence in enumerate(sequences.values()):
+            chunk[:, column] = sequence if sequence.ndim == 0 else sequence[start:end]
+        yield chunk
+
+
+def merge_results(results: Iterable[SimulationResult]) -> SimulationResult:
+    """Joins the results for each chunk into a single result.
+
+    Args:
+        results (Iterable[SimulationResult]): The results for each chunk, in order.
+
+    Returns:
+        SimulationResult: The results for every sample.
+    """
+    results = list(results)
+    merged = SimulationResult()
+    for name in ("states", "node_voltages", "currents"):
+        keys = getattr(results[0], name) if results else {}
+        getattr(merged, name).update(
+            (key, np.concatenate([getattr(result, name)[key] for result in results])) for key in keys
+        )
+    return merged
@@ -1,17 +1,28 @@
 """Functions related finding all the system variables for the circuit"""
 
+from collections import defaultdict, deque
 from typing import Generator
 
 import networkx as nx
 import sympy as sp
 
 from rtds_circuit_analysis import equivalent_circuit
+from rtds_circuit_analysis.block_triangular import linsolve_triangular
+from rtds_circuit_analysis.mna import find_mna_solutions
+from rtds_circuit_analysis.numeric import clean_expression, clean_results, find_numeric_solutions
 from rtds_circuit_analysis.parse_netlist import Component
-from rtds_circuit_analysis.utils import flatten
+from rtds_circuit_analysis.profiling import record_expressions, stage
+from rtds_circuit_analysis.utils import error_message, flatten, parallel_map
 
+SOLVERS = ("kirchhoff", "mna")
+LOOP_STRATEGIES = ("minimum", "fundamental")
+# Circuits with more components than this find their loops through the fundamental strategy by default
+FUNDAMENTAL_LOOPS_THRESHOLD = 50
 
-def find_loops(components: list[Component]) -> list[list[Component]]:
-    """Finds the loops for the circuit.
+
+def find_minimum_loops(components: list[Component]) -> list[list[Component]]:
+    """Finds the loops for the circuit, through a minimum cycle basis (the set of independent loops with the fewest
+    components in total). The loops are as short as possible, but finding them scales poorly with the circuit size.
 
     Args:
         components (list[Component]): List of components for the circuit.
@@ -35,6 +46,88 @@ def find_loops(components: list[Component]) -> list[list[Component]]:
     return loops
 
 
+def find_fundamental_loops(components: list[Component]) -> list[list[Component]]:
+    """Finds the loops for the circuit, through a fundamental cycle basis. A spanning tree is built with a breadth first
+    search over the nodes, and every component left out of the tree closes exactly one loop with the tree path between
+    its nodes. Building the tree is linear on the number of components.
+
+    Args:
+        components (list[Component]): List of components for the circuit.
+
+    Returns:
+        list[list[Component]]: List of loops. Each loop is a list of components, in the order they appear in the loop.
+    """
+    adjacent_components = defaultdict(list)
+    for component in components:
+        node1, node2 = component.nodes
+        adjacent_components[node1].append((component, node2))
+        adjacent_components[node2].append((component, node1))
+
+    # Each node is related to the tree component that leads to its parent node, and to the parent node itself
+    parents = {}
+    depths = {}
+    tree_components = set()
+    for root in adjacent_components:
+        if root in depths:
+            continue
+        parents[root], depths[root] = None, 0
+        queue = deque([root])
+        while queue:
+            node = queue.popleft()
+            for component, adjacent_node in adjacent_components[node]:
+                if adjacent_node in depths:
+                    continue
+                parents[adjacent_node] = (component, node)
+                depths[adjacent_node] = depths[node] + 1
+                tree_components.add(component)
+                queue.append(adjacent_node)
+
+    loops = []
+    for component in components:
+        node1, node2 = component.nodes
+        if component in tree_components or node1 == node2:
+            continue
+
+        # Climbs the tree from both nodes until they meet. The loop goes through the component, up from its second node
+        # to the meeting point, and back down to its first node.
+        path_up, path_down = [], []
+        while node1 != node2:
+            if depths[node2] >= depths[node1]:
+                tree_component, node2 = parents[node2]
+                path_up.append(tree_component)
+            else:
+                tree_component, node1 = parents[node1]
+                path_down.append(tree_component)
+        loops.append([component] + path_up + path_down[::-1])
+
+    return loops
+
+
+def find_loops(components: list[Component], strategy: str | None = None) -> list[list[Component]]:
+    """Finds the loops for the circuit.
+
+    Args:
+        components (list[Component]): List of components for the circuit.
+        strategy (str | None, optional): How to find the set of independent loops, either ``"minimum"`` (see
+          :func:`find_minimum_loops`) or ``"fundamental"`` (see :func:`find_fundamental_loops`). If None, uses the
+          fundamental strategy for circuits with more than ``FUNDAMENTAL_LOOPS_THRESHOLD`` components, and the minimum
+          one otherwise. Defaults to None.
+
+    Returns:
+        list[list[Component]]: List of loops. Each loop is a list of components, in the order they appear in the loop.
+    """
+    if strategy is None:
+        strategy = "fundamental" if len(components) > FUNDAMENTAL_LOOPS_THRESHOLD else "minimum"
+
+    match strategy:
+        case "minimum":
+            return find_minimum_loops(components)
+        case "fundamental":
+            return find_fundamental_loops(components)
+        case _:
+            error_message(f"Unknown loop strategy '{strategy}'. Valid options are: {', '.join(LOOP_STRATEGIES)}.")
+
+
 def is_in_same_direction(component: Component, adjacent_component: Component) -> bool:
     """Checks if this component is in the same as an adjacent component.
 
@@ -44,7 +137,8 @@ def is_in_same_direction(component: Component, adjacent_component: Component) ->
     Returns:
         bool: True if is in the same direction.
     """
-    if adjacent_component.nodes[0] == component.nodes[0] or adjacent_component.nodes[1] == component.nodes[1]:
+    node_ids, adjacent_ids = component.node_ids, adjacent_component.node_ids
+    if adjacent_ids[0] == node_ids[0] or adjacent_ids[1] == node_ids[1]:
         return False
     return True
 
@@ -192,21 +286,38 @@ def find_unknowns(circuit: list[Component]) -> list[sp.Symbol]:
     return unknowns
 
 
-def associate_values(components: list[Component], solutions: list[sp.Expr]):
+def associate_values(
+    components: list[Component],
+    solutions: list[sp.Expr],
+    numeric: bool = False,
+    workers: int = 1,
+):
     """Associates the calculated current/voltage results with each of their respective components.
 
     Args:
         components (list[Component]): List of components in the circuit.
         solutions (list[sp.Expr]): Calculated current/voltage values.
+        numeric (bool, optional): If the values have float coefficients, in which case they are only cleaned up,
+          instead of simplified. Defaults to False.
+        workers (int, optional): Number of processes used to simplify the values (see
+          :func:`~rtds_circuit_analysis.utils.parallel_map`). Cleaning up the numeric values is cheap, so it is always
+          done in this process. Defaults to 1.
     """
+    with stage("simplify_results"):
+        if numeric:
+            solutions = [clean_expression(solution) for solution in solutions]
+        else:
+            solutions = parallel_map(sp.simplify, solutions, workers)
+    record_expressions("simplify_results", solutions)
+
     for component, solution in zip(components, solutions):
         match component.type:
             case "V" | "C":
-                component.current = sp.simplify(solution)
+                component.current = solution
             case "I" | "L":
-                component.voltage = sp.simplify(solution)
+                component.voltage = solution
             case "R":
-                component.current = sp.simplify(solution)
+                component.current = solution
                 component.voltage = component.value * component.current
 
 
@@ -264,17 +375,17 @@ def find_states(components: list[Component]) -> dict[str, sp.Expr]:
         components (list[Component]): List of components for the circuit
 
     Returns:
-        dict[str, sp.Expr]: Dictionary that relates each energy storing component to its state equation. It isn't
-        explicit in each value of this dict, but each expression is equal to the energy storing element's
-        voltage/current derivate (for capacitors/inductors, respectively).
+        dict[str, sp.Expr]: Dictionary that relates each energy storing component to its state equation (not
+        simplified). It isn't explicit in each value of this dict, but each expression is equal to the energy storing
+        element's voltage/current derivate (for capacitors/inductors, respectively).
     """
     states = {}
     for component in components:
         match component.type:
             case "C":
-                states[str(component.name)] = sp.simplify(component.current / component.value)
+                states[str(component.name)] = component.current / component.value
             case "L":
-                states[str(component.name)] = sp.simplify(component.voltage / component.value)
+                states[str(component.name)] = component.voltage / component.value
     return states
 
 
@@ -290,60 +401,243 @@ def filter_dict_by_key_first_char(dictionary: dict[str, any], to_remove: tuple[s
             del dictionary[key]
 
 
-def simplify_results(*dictionaries: list[dict[str, sp.Expr]]):
+def simplify_results(*dictionaries: list[dict[str, sp.Expr]], workers: int = 1):
     """Simplify the sympy expressions for every value in a dictionary.
 
     Args:
         *dictionaries (list[dict[str, sp.Expr]]): List of dictionaries to simplify each.
+        workers (int, optional): Number of processes used to simplify the values, all the dictionaries at once (see
+          :func:`~rtds_circuit_analysis.utils.parallel_map`). Defaults to 1.
     """
+    keys = [(dictionary, key) for dictionary in dictionaries for key in dictionary]
+    with stage("simplify_results"):
+        values = parallel_map(sp.simplify, [dictionary[key] for dictionary, key in keys], workers)
+    record_expressions("simplify_results", values)
+    for (dictionary, key), value in zip(keys, values):
+        dictionary[key] = value
 
-    for dictionary in dictionaries:
-        for key in dictionary:
-            dictionary[key] = sp.simplify(dictionary[key])
 
+def find_kirchhoff_solutions(circuit: list[Component], node_graph: nx.MultiDiGraph) -> list[sp.Expr]:
+    """Solves the circuit by writing the Kirchhoff Voltage Law for every loop, and the Kirchhoff Current Law for every
+    node, and solving for the current/voltage of every component at once.
 
-def solve_circuit(
-    circuit: list[Component],
-) -> tuple[list[Component], dict[str, sp.Expr], dict[str, sp.Expr], dict[str, sp.Expr], dict[str, sp.Expr]]:
-    """_summary_
+    Args:
+        circuit (list[Component]): List of components for the circuit.
+        node_graph (nx.MultiDiGraph): Graph representation for the circuit.
+
+    Returns:
+        list[sp.Expr]: The value for each unknown, in the same order as :func:`find_unknowns`.
+    """
+    # Set up the loop equations
+    with stage("find_loops"):
+        loops = find_loops(circuit)
+
+    with stage("linsolve"):
+        loop_equations = find_loop_equations(loops)
+
+        # Set up the node equations
+        incidence_matrix = find_incidence_matrix(node_graph)
+        current_equations = find_current_equations(circuit, incidence_matrix)
+        # The equation for one node in each connected part is the sum of the others, so it is left out. The system is
+        # then square, and none of its blocks are singular (see rtds_circuit_analysis.block_triangular)
+        nodes = list(node_graph.nodes)
+        references = {
+            "0" if "0" in part else min(part, key=nodes.index) for part in nx.weakly_connected_components(node_graph)
+        }
+        current_equations = [equation for node, equation in zip(nodes, current_equations) if node not in references]
+
+        # Solves the equations
+        unknowns = find_unknowns(circuit)
+        equations = loop_equations + current_equations
+        solutions = list(linsolve_triangular(equations, unknowns))[0]
+    record_expressions("linsolve", solutions)
+    return solutions
+
+
+def find_blocks(circuit: list[Component], node_graph: nx.MultiDiGraph) -> list[tuple[list[int], str]]:
+    """Splits the circuit in blocks that can be solved apart: its biconnected components (the parts that stay connected
+    when any single node is removed), which only share cut vertices with each other, alongside its disconnected parts.
+    No current can flow between two blocks through a single node, so the currents and voltages for the components in a
+    block only depend on each other. Only the node voltages depend on other blocks, through the cut vertices (which
+    :func:`find_node_voltages` already goes through).
 
     Args:
         circuit (list[Component]): List of components for the circuit.
+        node_graph (nx.MultiDiGraph): Graph representation for the circuit.
 
     Returns:
-        tuple[list[Component], dict[str, sp.Expr], dict[str, sp.Expr], dict[str, sp.Expr], dict[str, sp.Expr]]: The
-        system variables for the circuit, and the updated list of components (where all the attributes for current and
-        voltage are set up).
+        list[tuple[list[int], str]]: The index of each component in each block, and the reference node for the block
+        (the ground, or the node in the block closest to it). The blocks are in the order their first components appear
+        in the circuit.
+    """
+    graph = nx.Graph(node_graph.to_undirected(as_view=True))
+    graph.remove_edges_from(list(nx.selfloop_edges(graph)))
+    block_indices = {}
+    for i, edges in enumerate(nx.biconnected_component_edges(graph)):
+        for edge in edges:
+            block_indices[frozenset(edge)] = i
+
+    # How far each node is from the ground (or from the first node of a part not connected to it)
+    distances = {}
+    for nodes in nx.connected_components(graph):
+        start = "0" if "0" in nodes else next(node for node in graph if node in nodes)
+        distances.update(nx.single_source_shortest_path_length(graph, start))
+
+    blocks = defaultdict(list)
+    for i, component in enumerate(circuit):
+        # Components connected to the same node at both ends are blocks by themselves
+        blocks[block_indices.get(frozenset(component.nodes), ("self loop", i))].append(i)
+
+    references = []
+    for indices in blocks.values():
+        nodes = {node for i in indices for node in circuit[i].nodes}
+        references.append(min(nodes, key=distances.__getitem__))
+    return list(zip(blocks.values(), references))
+
+
+def solve_block(block: tuple[list[Component], str, str, bool]) -> list[sp.Expr]:
+    """Solves a block of the circuit by itself (see :func:`find_blocks`).
 
+    Args:
+        block (tuple[list[Component], str, str, bool]): The components in the block, its reference node, the solver,
+          and if it is solved numerically (see :func:`solve_circuit`).
+
+    Returns:
+        list[sp.Expr]: The value for each unknown in the block, in the same order as :func:`find_unknowns`.
     """
+    components, reference, solver, numeric = block
+    if not (numeric or solver == "mna"):
+        return find_kirchhoff_solutions(components, find_node_graph(components))
 
-    circuit = equivalent_circuit.condense_circuit(circuit)
-    # Set up the loop equations
-    loops = find_loops(circuit)
-    loop_equations = find_loop_equations(loops)
+    with stage("linsolve"):
+        if numeric:
+            solutions = find_numeric_solutions(components, reference)
+        else:
+            solutions = find_mna_solutions(components, reference)
+    record_expressions("linsolve", solutions)
+    return solutions
 
-    # Set up the node equations
-    node_graph = find_node_graph(circuit)
-    incidence_matrix = find_incidence_matrix(node_graph)
-    current_equations = find_current_equations(circuit, incidence_matrix)
 
-    # Solves the equations
-    unknowns = find_unknowns(circuit)
-    equations = loop_equations + current_equations
-    solutions = list(sp.linsolve(equations, *unknowns))[0]
-    associate_values(circuit, solutions)
+def solve_components(
+    circuit: list[Component],
+    solver: str = "kirchhoff",
+    numeric: bool = False,
+    workers: int = 1,
+) -> tuple[list[Component], nx.MultiDiGraph, dict[str, sp.Expr]]:
+    """Solves the circuit, setting up the current and voltage attributes for every component. This is the part of
+    :func:`solve_circuit` that every solution depends on.
+
+    Args:
+        circuit (list[Component]): List of components for the circuit. The list itself is modified, so pass a copy if
+          it needs to be kept.
+        solver (str, optional): How to find the equations for the circuit. See :func:`solve_circuit`. Defaults to
+          "kirchhoff".
+        numeric (bool, optional): Solves the circuit through the numeric engine. See :func:`solve_circuit`. Defaults
+          to False.
+        workers (int, optional): Number of processes used to solve the blocks of the circuit (see :func:`find_blocks`)
+          and to simplify the solutions. See :func:`solve_circuit`. Defaults to 1.
+
+    Returns:
+        tuple[list[Component], nx.MultiDiGraph, dict[str, sp.Expr]]: The updated list of components, the graph
+        representation for the circuit (with the equivalent components in place), and the state equations (not
+        simplified).
+    """
+    if solver not in SOLVERS:
+        error_message(f"Unknown solver '{solver}'. Valid options are: {', '.join(SOLVERS)}.")
+
+    with stage("condense_circuit"):
+        circuit = equivalent_circuit.condense_circuit(circuit)
+        node_graph = find_node_graph(circuit)
+
+    with stage("find_blocks"):
+        blocks = find_blocks(circuit, node_graph)
+    jobs = [([circuit[i] for i in indices], reference, solver, numeric) for indices, reference in blocks]
+    if len(jobs) == 1:
+        block_solutions = [solve_block(jobs[0])]
+    else:
+        # Each block is a smaller system by itself, so they are solved apart (in other processes, if there are workers)
+        with stage("solve_blocks"):
+            block_solutions = parallel_map(solve_block, jobs, workers)
+
+    solutions = [None] * len(circuit)
+    for (indices, _), values in zip(blocks, block_solutions):
+        for i, value in zip(indices, values):
+            solutions[i] = value
+    associate_values(circuit, solutions, numeric, workers)
 
     states = find_states(circuit)
 
     circuit = equivalent_circuit.expand_circuit(circuit)
 
-    component_voltages, currents = find_component_values(circuit)
-    filter_dict_by_key_first_char(component_voltages, ("V", "C"))
+    return circuit, node_graph, states
+
+
+def find_currents(circuit: list[Component]) -> dict[str, sp.Expr]:
+    """Finds the current for every component, except the trivial ones (current sources and inductors).
+
+    Args:
+        circuit (list[Component]): List of solved components for the circuit.
+
+    Returns:
+        dict[str, sp.Expr]: Dictionary that relates each component name to its current (not simplified).
+    """
+    _, currents = find_component_values(circuit)
     filter_dict_by_key_first_char(currents, ("I", "L"))
+    return currents
+
+
+def find_component_voltages(circuit: list[Component]) -> dict[str, sp.Expr]:
+    """Finds the voltage for every component, except the trivial ones (voltage sources and capacitors).
+
+    Args:
+        circuit (list[Component]): List of solved components for the circuit.
+
+    Returns:
+        dict[str, sp.Expr]: Dictionary that relates each component name to its voltage (not simplified).
+    """
+    component_voltages, _ = find_component_values(circuit)
+    filter_dict_by_key_first_char(component_voltages, ("V", "C"))
+    return component_voltages
+
+
+def solve_circuit(
+    circuit: list[Component],
+    solver: str = "kirchhoff",
+    numeric: bool = False,
+    workers: int = 1,
+) -> tuple[list[Component], dict[str, sp.Expr], dict[str, sp.Expr], dict[str, sp.Expr], dict[str, sp.Expr]]:
+    """Finds every system variable for the circuit.
+
+    Args:
+        circuit (list[Component]): List of components for the circuit.
+        solver (str, optional): How to find the equations for the circuit. ``"kirchhoff"`` writes the KVL for every
+          loop and the KCL for every node, with the current/voltage for every component as the unknowns. ``"mna"`` uses
+          the Modified Nodal Analysis, where the only unknowns are the node voltages and the currents through voltage
+          sources and capacitors, which is much faster for big circuits. Defaults to "kirchhoff".
+        numeric (bool, optional): Solves the MNA system with floats, through a sparse LU factorization, instead of
+          exact symbolic algebra. Every resistor, capacitor and inductor needs a numeric value, and the results have
+          float coefficients. Defaults to False.
+        workers (int, optional): Number of processes used to simplify the expressions, which are independent from each
+          other. 1 doesn't create any process, and 0 uses every core in the machine. The results are the same for any
+          number of processes. Defaults to 1.
+
+    Returns:
+        tuple[list[Component], dict[str, sp.Expr], dict[str, sp.Expr], dict[str, sp.Expr], dict[str, sp.Expr]]: The
+        system variables for the circuit, and the updated list of components (where all the attributes for current and
+        voltage are set up).
+
+    """
+    circuit, node_graph, states = solve_components(circuit, solver, numeric, workers)
+
+    currents = find_currents(circuit)
+    component_voltages = find_component_voltages(circuit)
 
     node_breadth_sequence = nx.bfs_edges(node_graph.to_undirected(), "0")
     node_voltages = find_node_voltages(circuit, node_breadth_sequence)
 
-    simplify_results(currents, component_voltages, node_voltages, states)
+    if numeric:
+        clean_results(currents, component_voltages, node_voltages, states)
+    else:
+        simplify_results(currents, component_voltages, node_voltages, states, workers=workers)
 
     return circuit, currents, component_voltages, node_voltages, states
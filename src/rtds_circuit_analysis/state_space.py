@@ -0,0 +1,201 @@
+"""Functions related to writing the circuit equations in their state-space (matrix) form"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import sympy as sp
+
+from rtds_circuit_analysis.diference_equations import to_state_variables
+from rtds_circuit_analysis.numeric import linear_coefficients, to_expressions
+from rtds_circuit_analysis.parse_netlist import Component
+from rtds_circuit_analysis.utils import error_message
+
+
+@dataclass
+class StateSpace:
+    """The state-space form for the circuit:
+
+    .. math::
+
+        \\dot{x} = A x + B u + e
+
+        y = C x + D u + f
+
+    Where :math:`x` are the state variables (the voltage for capacitors and the current for inductors), :math:`u` are
+    the inputs (the symbolic values of the sources), :math:`y` are the outputs (the node voltages), and :math:`e` and
+    :math:`f` are the constant parts of the equations (from sources with numeric values).
+
+    The matrices are NumPy arrays for circuits solved numerically, and sympy matrices otherwise (where the values of the
+    resistors, capacitors and inductors may show up as symbols).
+
+    Attributes:
+        states (list[str]): Name of each state variable (ex.: ``"VC1"``), in the same order as the rows of ``a``.
+        inputs (list[str]): Name of each input, in the same order as the columns of ``b``.
+        outputs (list[str]): Name of each output node, in the same order as the rows of ``c``.
+        a (np.ndarray | sympy.Matrix): The state matrix.
+        b (np.ndarray | sympy.Matrix): The input matrix.
+        c (np.ndarray | sympy.Matrix): The output matrix.
+        d (np.ndarray | sympy.Matrix): The feedthrough matrix.
+        state_constants (np.ndarray | sympy.Matrix): The constant part of each state equation (:math:`e`).
+        output_constants (np.ndarray | sympy.Matrix): The constant part of each output (:math:`f`).
+    """
+
+    states: list[str]
+    inputs: list[str]
+    outputs: list[str]
+    a: np.ndarray | sp.Matrix
+    b: np.ndarray | sp.Matrix
+    c: np.ndarray | sp.Matrix
+    d: np.ndarray | sp.Matrix
+    state_constants: np.ndarray | sp.Matrix
+    output_constants: np.ndarray | sp.Matrix
+
+    @property
+    def parameters(self) -> list[sp.Symbol]:
+        """list[sympy.Symbol]: The symbolic component values that show up in the matrices, sorted by name. Always empty
+        for circuits solved numerically."""
+        matrices = (self.a, self.b, self.c, self.d, self.state_constants, self.output_constants)
+        if not all(isinstance(matrix, sp.MatrixBase) for matrix in matrices):
+            return []
+        return sorted(set().union(*(matrix.free_symbols for matrix in matrices)), key=str)
+
+
+def find_inputs(components: list[Component]) -> list[sp.Symbol]:
+    """Finds the inputs for the circuit, which are the symbols in the values of the voltage and current sources.
+
+    Args:
+        components (list[Component]): List of components for the circuit.
+
+    Returns:
+        list[sp.Symbol]: The inputs, sorted by name.
+    """
+    inputs = set()
+    for component in components:
+        if component.type in ("V", "I"):
+            inputs.update(sp.sympify(component.value).free_symbols)
+    return sorted(inputs, key=str)
+
+
+def symbolic_coefficients(expressions: list[sp.Expr], symbols: list[sp.Symbol]) -> tuple[sp.Matrix, sp.Matrix]:
+    """Finds the coefficient for each symbol in each linear expression, keeping them as sympy expressions.
+
+    Args:
+        expressions (list[sp.Expr]): The linear expressions.
+        symbols (list[sp.Symbol]): The symbols to find the coefficients for.
+
+    Returns:
+        tuple[sp.Matrix, sp.Matrix]: A matrix with the coefficients (one row for each expression, one column for each
+        symbol), and a column vector with the constant part of each expression.
+    """
+    if not expressions or not symbols:
+        return sp.zeros(len(expressions), len(symbols)), sp.Matrix(len(expressions), 1, expressions)
+    matrix, constants = sp.linear_eq_to_matrix(expressions, symbols)
+    # linear_eq_to_matrix writes the expressions as "matrix * symbols = constants"
+    return matrix, -constants
+
+
+def find_state_space(
+    states: dict[str, sp.Expr],
+    outputs: dict[str, sp.Expr],
+    inputs: list[sp.Symbol],
+    numeric: bool = False,
+) -> StateSpace:
+    """Finds the state-space form for the circuit, by reading the coefficients for the state variables and the inputs
+    in each of its solved (linear) equations.
+
+    Args:
+        states (dict[str, sp.Expr]): Dictionary that relates each energy storage component to its continuous state
+          equation.
+        outputs (dict[str, sp.Expr]): Dictionary that relates each output (node) to its expression.
+        inputs (list[sp.Symbol]): The inputs for the circuit. See :func:`find_inputs`.
+        numeric (bool, optional): If the circuit was solved numerically, in which case the matrices are NumPy arrays.
+          Otherwise, they are sympy matrices. Defaults to False.
+
+    Returns:
+        StateSpace: The state-space form for the circuit.
+    """
+    state_variables = [sp.Symbol(variable) for variable in to_state_variables(states)]
+    coefficients = linear_coefficients if numeric else symbolic_coefficients
+
+    state_matrix, state_constants = coefficients(list(states.values()), state_variables + inputs)
+    output_matrix, output_constants = coefficients(list(outputs.values()), state_variables + inputs)
+    n_states = len(state_variables)
+
+    return StateSpace(
+        states=[str(variable) for variable in state_variables],
+        inputs=[str(symbol) for symbol in inputs],
+        outputs=list(outputs),
+        a=state_matrix[:, :n_states],
+        b=state_matrix[:, n_states:],
+        c=output_matrix[:, :n_states],
+        d=output_matrix[:, n_states:],
+        state_constants=state_constants,
+        output_constants=output_constants,
+    )
+
+
+def discrete_matrices(
+    state_space: StateSpace, method: str, time_step: float
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Finds the matrices for the discrete state equations, in the form
+    ``x[n] = phi x[n-1] + gamma_old u[n-1] + gamma_new u[n] + k``.
+
+    Args:
+        state_space (StateSpace): The state-space form for the circuit.
+        method (str): The discrete method, either "forward", "backward" or "trapezoidal".
+        time_step (float): The time step for the circuit.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: The matrices ``phi``, ``gamma_old``, ``gamma_new`` and
+        the vector ``k``.
+    """
+    a, b, e = state_space.a, state_space.b, state_space.state_constants
+    identity = np.eye(len(a))
+    no_input = np.zeros_like(b)
+
+    if method == "forward":
+        return identity + time_step * a, time_step * b, no_input, time_step * e
+
+    # The backward and trapezoidal methods are implicit, so they need the system (I - c*Ts*A) x[n] = ... solved
+    weight = 1 if method == "backward" else 1 / 2
+    explicit_part = identity if method == "backward" else identity + weight * time_step * a
+    try:
+        solved = np.linalg.solve(
+            identity - weight * time_step * a,
+            np.column_stack([explicit_part, weight * time_step * b, time_step * e]),
+        )
+    except np.linalg.LinAlgError:
+        error_message(f"The {method} method has no solution for a time step of {time_step}.")
+
+    n_states, n_inputs = len(a), b.shape[1]
+    phi = solved[:, :n_states]
+    gamma = solved[:, n_states : n_states + n_inputs]
+    k = solved[:, -1]
+    if method == "backward":
+        return phi, no_input, gamma, k
+    return phi, gamma, gamma, k
+
+
+def discretize_state_space(state_space: StateSpace, method: str, time_step: float) -> dict[str, sp.Expr]:
+    """Transform the state equations in state-space form into their (explicit) difference form, for a single method.
+    The output is the same as the one from :func:`~rtds_circuit_analysis.diference_equations.discretize`, but with
+    float coefficients.
+
+    Args:
+        state_space (StateSpace): The state-space form for the circuit.
+        method (str): The discrete method, either "forward", "backward" or "trapezoidal".
+        time_step (float): The time step for the circuit.
+
+    Returns:
+        dict[str, sp.Expr]: State equations in difference form, for the chosen method.
+    """
+    phi, gamma_old, gamma_new, k = discrete_matrices(state_space, method, time_step)
+
+    symbols = [sp.Symbol(variable + "_{n-1}") for variable in state_space.states]
+    symbols += [sp.Symbol(variable + "_{n-1}") for variable in state_space.inputs]
+    symbols += [sp.Symbol(variable + "_{n}") for variable in state_space.inputs]
+    symbols.append(sp.Integer(1))
+    expressions = to_expressions(np.column_stack([phi, gamma_old, gamma_new, k]), symbols)
+
+    # The component name is the state variable without its first letter (V or I)
+    return {variable[1:]: expression for variable, expression in zip(state_space.states, expressions)}
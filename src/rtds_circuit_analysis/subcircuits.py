@@ -0,0 +1,179 @@
+"""Functions related to subcircuits (``.SUBCKT`` definitions, and the ``X`` lines that use them). Each definition is
+turned into a model only once, however many instances use it: definitions with only resistors are reduced to the
+equivalent resistors between their ports (so their internal nodes never reach the equations for the circuit), and any
+other definition keeps all of its components, copied into the circuit for each instance"""
+
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+import networkx as nx
+import sympy as sp
+
+from rtds_circuit_analysis.utils import NetlistError
+
+# Number of distinct resistor-only definitions kept by reduce_resistors
+REDUCTION_CACHE_SIZE = 256
+
+# A component in a subcircuit: its name, its nodes and its value
+Element = tuple[str, tuple[str, str], sp.Expr]
+
+
+@dataclass(frozen=True)
+class Instance:
+    """An instance of a subcircuit (an ``X`` line in the netlist).
+
+    Attributes:
+        name (str): The name of the instance (ex.: "X1").
+        nodes (tuple[str, ...]): The nodes connected to each port of the subcircuit, in order.
+        subcircuit (str): The name of the subcircuit.
+        line_number (int): The number for the line the instance is in.
+        line (str): The line itself.
+        source (str): The netlist the line is in.
+    """
+
+    name: str
+    nodes: tuple[str, ...]
+    subcircuit: str
+    line_number: int
+    line: str
+    source: str
+
+    def error(self, reason: str):
+        """Raises a :class:`~rtds_circuit_analysis.utils.NetlistError` for the line of the instance.
+
+        Args:
+            reason (str): Info about the error.
+        """
+        raise NetlistError(reason, self.line_number, self.line, self.source)
+
+
+@dataclass
+class Subcircuit:
+    """A subcircuit definition (the lines between ``.SUBCKT`` and ``.ENDS``), with the node names inside it.
+
+    Attributes:
+        name (str): The name of the subcircuit.
+        ports (tuple[str, ...]): The nodes connected to the rest of the circuit, in the order the instances list them.
+        elements (list[Element]): The components, as (name, nodes, value) tuples.
+        instances (list[Instance]): The instances of other subcircuits inside this one.
+        model (list[Element] | None): The components that replace each instance, once found (see
+          :func:`subcircuit_model`).
+    """
+
+    name: str
+    ports: tuple[str, ...]
+    elements: list[Element] = field(default_factory=list)
+    instances: list[Instance] = field(default_factory=list)
+    model: list[Element] | None = field(default=None, repr=False)
+
+
+@lru_cache(maxsize=REDUCTION_CACHE_SIZE)
+def reduce_resistors(ports: tuple[str, ...], resistors: tuple[Element, ...]) -> tuple[Element, ...] | None:
+    """Reduces a network of resistors to the equivalent resistors between its ports, eliminating the internal nodes
+    from its conductance matrix (Kron reduction). The reduced matrix is the conductance matrix for a resistor between
+    each pair of ports, so the reduction is exact. The ground (node 0) is always a port, since it is the same node as
+    the ground outside the subcircuit.
+
+    The results are cached, so the same definition is only reduced once, even in different netlists.
+
+    Args:
+        ports (tuple[str, ...]): The ports.
+        resistors (tuple[Element, ...]): The resistors.
+
+    Returns:
+        tuple[Element, ...] | None: The equivalent resistors, named after the ports they are connected to (ex.:
+        "R_A_B"). None if part of the network isn't connected to any port (so there is nothing to reduce it to).
+    """
+    graph = nx.Graph()
+    graph.add_nodes_from(ports)
+    graph.add_edges_from(nodes for _, nodes, _ in resistors)
+    terminals = list(ports) + (["0"] if "0" in graph and "0" not in ports else [])
+    if any(not set(terminals) & group for group in nx.connected_components(graph)):
+        return None
+
+    order = terminals + [node for node in graph if node not in terminals]
+    index = {node: i for i, node in enumerate(order)}
+    conductances = sp.zeros(len(order))
+    for _, (node1, node2), value in resistors:
+        first, second = index[node1], index[node2]
+        if first == second:
+            continue
+        conductances[first, first] += 1 / value
+        conductances[second, second] += 1 / value
+        conductances[first, second] -= 1 / value
+        conductances[second, first] -= 1 / value
+
+    size = len(terminals)
+    reduced = conductances[:size, :size]
+    if len(order) > size:
+        internal = conductances[size:, size:]
+        reduced -= conductances[:size, size:] * internal.LUsolve(conductances[size:, :size])
+
+    equivalents = []
+    for first in range(size):
+        for second in range(first + 1, size):
+            conductance = sp.cancel(-reduced[first, second])
+            if conductance != 0:
+                nodes = (terminals[first], terminals[second])
+                equivalents.append((f"R_{nodes[0]}_{nodes[1]}", nodes, sp.factor(1 / conductance)))
+    return tuple(equivalents)
+
+
+def subcircuit_model(subcircuits: dict[str, Subcircuit], name: str, parents: tuple[str, ...] = ()) -> list[Element]:
+    """Finds the components that replace each instance of a subcircuit, with the node names inside it: the equivalent
+    resistors between the ports if there are only resistors (see :func:`reduce_resistors`), or every component
+    otherwise (with the instances of other subcircuits expanded). The model is found once for each definition.
+
+    Args:
+        subcircuits (dict[str, Subcircuit]): Every subcircuit definition, by name.
+        name (str): The name of the subcircuit.
+        parents (tuple[str, ...], optional): The subcircuits this one is inside of, to find recursive definitions.
+          Defaults to ().
+
+    Returns:
+        list[Element]: The components.
+    """
+    subcircuit = subcircuits[name]
+    if subcircuit.model is None:
+        elements = list(subcircuit.elements)
+        for instance in subcircuit.instances:
+            elements += expand_instance(subcircuits, instance, parents + (name,))
+        if elements and all(element_name[0] == "R" for element_name, _, _ in elements):
+            reduced = reduce_resistors(subcircuit.ports, tuple(elements))
+            if reduced is not None:
+                elements = list(reduced)
+        subcircuit.model = elements
+    return subcircuit.model
+
+
+def expand_instance(
+    subcircuits: dict[str, Subcircuit], instance: Instance, parents: tuple[str, ...] = ()
+) -> list[Element]:
+    """Finds the components for an instance of a subcircuit, with the names in the circuit: each port becomes the node
+    connected to it, and the names for the components and for the internal nodes get the name of the instance (ex.: R1
+    in X1 becomes R1_X1, and node A in X1 becomes X1_A). The ground is the same node inside and outside subcircuits.
+
+    Args:
+        subcircuits (dict[str, Subcircuit]): Every subcircuit definition, by name.
+        instance (Instance): The instance.
+        parents (tuple[str, ...], optional): The subcircuits the instance is inside of. Defaults to ().
+
+    Returns:
+        list[Element]: The components.
+    """
+    if instance.subcircuit not in subcircuits:
+        instance.error(f"Unknown subcircuit '{instance.subcircuit}'.")
+    if instance.subcircuit in parents:
+        instance.error(f"Subcircuit '{instance.subcircuit}' is used inside its own definition.")
+    subcircuit = subcircuits[instance.subcircuit]
+    if len(instance.nodes) != len(subcircuit.ports):
+        ports = len(subcircuit.ports)
+        instance.error(f"Subcircuit '{subcircuit.name}' has {ports} ports, got {len(instance.nodes)} nodes instead.")
+
+    nodes = dict(zip(subcircuit.ports, instance.nodes))
+    nodes.setdefault("0", "0")
+    elements = []
+    for name, element_nodes, value in subcircuit_model(subcircuits, subcircuit.name, parents):
+        node1, node2 = (nodes.get(node, f"{instance.name}_{node}") for node in element_nodes)
+        elements.append((f"{name}_{instance.name}", (node1, node2), value))
+    return elements
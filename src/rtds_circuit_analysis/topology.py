@@ -0,0 +1,221 @@
+"""Functions related to sharing the solutions between circuits with the same topology (the same types of components,
+connected the same way), whatever the names and values of their components and nodes. The circuit is solved only once,
+with a symbol as the value of each component (the template), and every other circuit substitutes its values in the
+solutions for the template"""
+
+import hashlib
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import networkx as nx
+import sympy as sp
+from networkx.algorithms.isomorphism import DiGraphMatcher
+
+from rtds_circuit_analysis.cache import CACHE_FORMAT, ResultCache
+from rtds_circuit_analysis.parse_netlist import Component
+from rtds_circuit_analysis.solve_circuit import find_node_graph
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from rtds_circuit_analysis import Circuit
+
+# Number of iterations for the Weisfeiler-Lehman hash. Graphs with the same hash are still checked for isomorphism
+HASH_ITERATIONS = 4
+# The templates solved in this process, for each topology key, alongside their structure graphs
+TEMPLATES: dict[str, list[tuple[nx.DiGraph, "Template"]]] = {}
+
+
+@dataclass
+class Template:
+    """A circuit solved with a symbol as the value of each component, and how the components and nodes of a circuit
+    with the same topology correspond to the ones in it.
+
+    Attributes:
+        circuit (Circuit): The template.
+        symbols (dict[str, sp.Symbol]): Dictionary that relates each component in the template to the symbol for its
+          value.
+        components (dict[str, str]): Dictionary that relates each component in the circuit to the same component in the
+          template.
+        nodes (dict[str, str]): Dictionary that relates each node in the circuit to the same node in the template.
+    """
+
+    circuit: "Circuit"
+    symbols: dict[str, sp.Symbol]
+    components: dict[str, str]
+    nodes: dict[str, str]
+
+    def substitutions(self, components: list[Component]) -> dict[sp.Symbol, sp.Expr]:
+        """Finds what replaces each symbol in the solutions for the template: the values of the components, and the
+        state variables (and inputs, in their discrete forms) named after the components in the circuit.
+
+        Args:
+            components (list[Component]): The components for the circuit.
+
+        Returns:
+            dict[sp.Symbol, sp.Expr]: Dictionary that relates each symbol in the template to its replacement.
+        """
+        substitutions = {}
+        for component in components:
+            name = self.components[component.name]
+            symbol = self.symbols[name]
+            substitutions[symbol] = component.value
+            replacements = {}
+            match component.type:
+                case "V" | "I":
+                    replacements = {symbol.name: component.value}
+                case "L":
+                    replacements = {f"I{name}": sp.Symbol(f"I{component.name}")}
+                case "C":
+                    replacements = {f"V{name}": sp.Symbol(f"V{component.name}")}
+            for variable, value in replacements.items():
+                substitutions[sp.Symbol(variable)] = value
+                # The same symbol in the discrete state equations, where every symbol starting with V or I has a suffix
+                for suffix in ("_{n-1}", "_{n}"):
+                    inputs = [symbol for symbol in value.free_symbols if str(symbol)[0] in ("V", "I")]
+                    discrete = {symbol: sp.Symbol(f"{symbol}{suffix}") for symbol in inputs}
+                    substitutions[sp.Symbol(f"{variable}{suffix}")] = value.xreplace(discrete)
+        return substitutions
+
+    def rename(self, solution: str, results: dict[str, sp.Expr]) -> dict[str, sp.Expr]:
+        """Renames the keys of a solution for the template, after the components (or nodes) in the circuit.
+
+        Args:
+            solution (str): The name of the solution (ex.: "node_voltages").
+            results (dict[str, sp.Expr]): The solution for the template.
+
+        Returns:
+            dict[str, sp.Expr]: The same solution, with the names in the circuit.
+        """
+        names = self.nodes if solution == "node_voltages" else self.components
+        inverse = {template_name: name for name, template_name in names.items()}
+        return {inverse[key]: value for key, value in results.items()}
+
+
+def identity_template(circuit: "Circuit", symbols: dict[str, sp.Symbol]) -> Template:
+    """Creates the template for the circuits with the same components and nodes as the template itself.
+
+    Args:
+        circuit (Circuit): The template.
+        symbols (dict[str, sp.Symbol]): Dictionary that relates each component to the symbol for its value.
+
+    Returns:
+        Template: The template.
+    """
+    nodes = {node for component in circuit.components for node in component.nodes}
+    return Template(circuit, symbols, {name: name for name in symbols}, {node: node for node in nodes})
+
+
+def structure_graph(components: list[Component]) -> nx.DiGraph:
+    """Finds the structure of the circuit, without any name or value: a graph with a vertex for each node and for each
+    component (labeled with its type, and the ground node labeled apart), and the edges following the direction of the
+    current in the node graph (see :func:`~rtds_circuit_analysis.solve_circuit.find_node_graph`).
+
+    Args:
+        components (list[Component]): List of components for the circuit.
+
+    Returns:
+        nx.DiGraph: The graph, whose vertices are ("node", name) and ("component", name) tuples.
+    """
+    graph = nx.DiGraph()
+    for current_from, current_to, key in find_node_graph(components).edges(keys=True):
+        vertex = ("component", components[key].name)
+        graph.add_node(vertex, label=components[key].type)
+        for node in (current_from, current_to):
+            graph.add_node(("node", node), label="ground" if node == "0" else "node")
+        graph.add_edge(("node", current_from), vertex)
+        graph.add_edge(vertex, ("node", current_to))
+    return graph
+
+
+def topology_key(graph: nx.DiGraph, *options) -> str:
+    """Finds the key for a topology, which is the same for every circuit with the same structure graph (but circuits
+    with different structure graphs may share a key, so the graphs are still compared by :func:`match_topology`).
+
+    Args:
+        graph (nx.DiGraph): The structure graph for the circuit (see :func:`structure_graph`).
+        *options: Any other option that changes the results (the time step, the solver, etc).
+
+    Returns:
+        str: The key, as a hexadecimal SHA-256 hash.
+    """
+    # The hash for the undirected graph, which is the same for every version of networkx
+    undirected = graph.to_undirected(as_view=True)
+    graph_hash = nx.weisfeiler_lehman_graph_hash(undirected, node_attr="label", iterations=HASH_ITERATIONS)
+    normalized = [f"topology {CACHE_FORMAT}", graph_hash, *map(repr, options)]
+    return hashlib.sha256("\n".join(normalized).encode()).hexdigest()
+
+
+def match_topology(graph: nx.DiGraph, template_graph: nx.DiGraph) -> tuple[dict[str, str], dict[str, str]] | None:
+    """Finds how the components and nodes of a circuit correspond to the ones in a template.
+
+    Args:
+        graph (nx.DiGraph): The structure graph for the circuit.
+        template_graph (nx.DiGraph): The structure graph for the template.
+
+    Returns:
+        tuple[dict[str, str], dict[str, str]] | None: Dictionaries that relate each component, and each node, in the
+        circuit to the ones in the template. None if the circuits have different topologies.
+    """
+    matcher = DiGraphMatcher(graph, template_graph, node_match=lambda first, second: first["label"] == second["label"])
+    if not matcher.is_isomorphic():
+        return None
+    components, nodes = {}, {}
+    for (kind, name), (_, template_name) in matcher.mapping.items():
+        (components if kind == "component" else nodes)[name] = template_name
+    return components, nodes
+
+
+def find_shared_template(key: str, graph: nx.DiGraph) -> Template | None:
+    """Finds a template solved in this process for the same topology.
+
+    Args:
+        key (str): The key for the topology (see :func:`topology_key`).
+        graph (nx.DiGraph): The structure graph for the circuit.
+
+    Returns:
+        Template | None: The template, with the names for the circuit. None if there is no template for the topology.
+    """
+    for template_graph, template in TEMPLATES.get(key, []):
+        match = match_topology(graph, template_graph)
+        if match is not None:
+            return Template(template.circuit, template.symbols, *match)
+    return None
+
+
+def share_template(key: str, graph: nx.DiGraph, template: Template):
+    """Adds a template to the ones shared by every circuit in this process.
+
+    Args:
+        key (str): The key for the topology (see :func:`topology_key`).
+        graph (nx.DiGraph): The structure graph for the template.
+        template (Template): The template.
+    """
+    TEMPLATES.setdefault(key, []).append((graph, template))
+
+
+def stored_topologies(directory: "str | Path", key: str) -> list[tuple[nx.DiGraph, list[Component]]]:
+    """Loads the structure graphs and the components for the templates stored on disk for a topology. The solutions
+    for each template are stored apart, like the ones for any other circuit.
+
+    Args:
+        directory (str | Path): The directory for the cache.
+        key (str): The key for the topology (see :func:`topology_key`).
+
+    Returns:
+        list[tuple[nx.DiGraph, list[Component]]]: The structure graph and the components for each template.
+    """
+    return list(ResultCache(directory, f"topology-{key}").load().values())
+
+
+def store_topology(directory: "str | Path", key: str, graph: nx.DiGraph, template: "Circuit"):
+    """Stores the structure graph and the components for a template on disk, so other processes can find it.
+
+    Args:
+        directory (str | Path): The directory for the cache.
+        key (str): The key for the topology (see :func:`topology_key`).
+        graph (nx.DiGraph): The structure graph for the template.
+        template (Circuit): The template.
+    """
+    name = " ".join(component.name for component in template.components)
+    ResultCache(directory, f"topology-{key}").store(name, (graph, template.components))
@@ -1,6 +1,8 @@
 """Module for functions used in multiple parts of the script."""
 
-import sys
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable
 
 
 def flatten(matrix: list[list]) -> list:
@@ -15,11 +17,80 @@ def flatten(matrix: list[list]) -> list:
     return [x for xs in matrix for x in xs]
 
 
+class CircuitError(SystemExit):
+    """Error in the circuit, or in the options given to solve it. It is a ``SystemExit``, so a script that doesn't
+    handle it still quits with the error message (and exit code 1), while programs that solve many circuits can catch
+    it and move on.
+
+    Attributes:
+        message (str): Info about the error, without any formatting.
+    """
+
+    def __init__(self, message: str):
+        super().__init__(f"\033[1mError\033[22m: {message}")
+        self.message = message
+
+
+class NetlistError(CircuitError):
+    """Error in a line of the netlist, such as a wrong number of words or an invalid value.
+
+    Attributes:
+        message (str): Info about the error, with the line it is in, without any formatting.
+        reason (str): Info about the error alone.
+        line_number (int): The number for the line (starting at 1).
+        line (str): The line itself.
+        source (str): The netlist the line is in (usually the path for the file).
+    """
+
+    def __init__(self, reason: str, line_number: int, line: str, source: str = "<netlist>"):
+        super().__init__(f"{source}, line {line_number}: {reason}\n    {line}")
+        self.reason = reason
+        self.line_number = line_number
+        self.line = line
+        self.source = source
+
+
 def error_message(error_msg: str):
-    """Quits the program, displaying an error message first
+    """Stops solving the circuit, raising a :class:`CircuitError` with an error message.
 
     Args:
-        error_msg (str): Info to display before leaving
+        error_msg (str): Info about the error
     """
-    print(f"\033[1mError\033[22m: {error_msg}")
-    sys.exit(1)
+    raise CircuitError(error_msg)
+
+
+def worker_count(workers: int) -> int:
+    """Finds how many processes to use for the independent jobs.
+
+    Args:
+        workers (int): The number of processes asked for. 0 uses every core in the machine.
+
+    Returns:
+        int: The number of processes.
+    """
+    if workers < 0:
+        error_message(f"The number of workers can't be negative (got {workers}).")
+    return workers or os.cpu_count() or 1
+
+
+def parallel_map(function: Callable, items: Iterable, workers: int = 1) -> list:
+    """Applies a function to each item, spreading the calls over a pool of processes. The results are always in the same
+    order as the items, no matter which process finishes first.
+
+    Args:
+        function (Callable): The function to apply. It needs to be defined at the top level of a module (so it can be
+          sent to other processes), and so do the items.
+        items (Iterable): The items to apply the function to.
+        workers (int, optional): The number of processes to use. 1 doesn't create any process, and 0 uses every core in
+          the machine. Defaults to 1.
+
+    Returns:
+        list: The result for each item.
+    """
+    items = list(items)
+    workers = min(worker_count(workers), len(items))
+    if workers <= 1:
+        return [function(item) for item in items]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(function, items))
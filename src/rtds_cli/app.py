@@ -1,18 +1,47 @@
+import sys
+
 from rtds_circuit_analysis import Circuit
-from rtds_cli.create_parser import create_parser
+from rtds_circuit_analysis.profiling import profiling, stage
+from rtds_circuit_analysis.utils import CircuitError
+from rtds_cli.batch import batch_app
+from rtds_cli.create_parser import create_parser, get_cache_dir, get_profiler
 from rtds_cli.errors import check_for_errors
 from rtds_cli.print_data import print_data
 
+# Arguments that change how the circuit is solved, instead of what is printed
+SOLVE_OPTIONS = ("filepath", "time_step", "workers", "cache_dir", "no_cache", "timings", "profile", "profile_dir")
 
-def app():
+
+def solve_and_print():
     parser = create_parser()
     args = parser.parse_args()
 
     check_for_errors(args, parser.prog)
 
     time_step = args.time_step if args.time_step else None
-    circuit = Circuit(args.filepath, time_step)
+    profiler = get_profiler(args)
+    with profiling(profiler):
+        circuit = Circuit(
+            args.filepath, time_step, workers=args.workers, cache_dir=get_cache_dir(args), profiler=profiler
+        )
+
+        args_dict = vars(args)
+        for option in SOLVE_OPTIONS:
+            del args_dict[option]
+        with stage("print_output"):
+            print_data(circuit, args_dict)
+
+    if profiler is not None:
+        print(profiler.report(), file=sys.stderr)
+
+
+def app():
+    # A file named "batch" can still be solved as "./batch"
+    if sys.argv[1:2] == ["batch"]:
+        sys.exit(batch_app(sys.argv[2:]))
 
-    args_dict = vars(args)
-    del args_dict["filepath"], args_dict["time_step"]
-    print_data(circuit, args_dict)
+    try:
+        solve_and_print()
+    except CircuitError as error:
+        print(error.code)
+        sys.exit(1)
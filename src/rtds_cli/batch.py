@@ -0,0 +1,177 @@
+"""Functions related to solving many netlists at once, with one JSON line for each of them"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Iterable
+
+from rtds_circuit_analysis import Circuit
+from rtds_circuit_analysis.utils import CircuitError, worker_count
+from rtds_cli.create_parser import get_cache_dir
+
+# The solutions written for each circuit
+RESULTS = ("currents", "component_voltages", "node_voltages", "states", "forward", "backward", "trapezoidal")
+# Terminal formatting (bold, colors, etc), which is removed from the error messages
+ANSI_ESCAPE = re.compile(r"\033\[[0-9;]*m")
+
+
+def create_batch_parser() -> argparse.ArgumentParser:
+    """Creates the parser for the batch subcommand.
+
+    Returns:
+        The parser.
+    """
+    parser = argparse.ArgumentParser(
+        prog="rtds-circuit-analysis batch",
+        description="Solves many netlists in parallel, printing one JSON object per line for each of them, as soon as "
+        "it is solved. Each line has the file path, the status (\"ok\" or \"error\"), the time it took to solve, and "
+        "either every solution (as strings) or the error message.",
+        usage="%(prog)s NETLISTS [NETLISTS ...] [options]",
+    )
+    parser.add_argument(
+        "netlists",
+        nargs="+",
+        metavar="NETLISTS",
+        help="Paths for the netlists. They can be glob patterns (quote them, so ** works), or directories, in which "
+        "case every .cir file inside them is solved.",
+    )
+    parser.add_argument(
+        "-T",
+        "--time-step",
+        metavar="TIMESTEP",
+        help="Sets the time step for the discrete methods, for every netlist. The netlists' .STEP take precedence.",
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Number of processes used to solve the netlists. Defaults to every core in the machine.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        metavar="DIR",
+        help="Directory for the cache of solved circuits. Defaults to $XDG_CACHE_HOME/rtds-circuit-analysis (or "
+        "~/.cache/rtds-circuit-analysis).",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always solves the circuits, without reading or writing the cache of solved circuits.",
+    )
+    parser.add_argument(
+        "--share-topology",
+        action="store_true",
+        help="Solves each topology (the same types of components, connected the same way) only once, with symbols as "
+        "the values, and finds the solutions for every netlist with that topology by substituting its values. Much "
+        "faster for many variations of the same circuit.",
+    )
+    return parser
+
+
+def find_netlists(paths: list[str]) -> list[str]:
+    """Finds every netlist to solve. Paths that don't match any file are kept, so they are reported as errors.
+
+    Args:
+        paths (list[str]): File paths, glob patterns or directories.
+
+    Returns:
+        list[str]: The path for each netlist, without repetitions.
+    """
+    netlists = []
+    for path in paths:
+        if os.path.isdir(path):
+            matches = sorted(str(netlist) for netlist in Path(path).rglob("*.cir"))
+        else:
+            matches = sorted(glob.glob(path, recursive=True)) or [path]
+        netlists.extend(matches)
+    return list(dict.fromkeys(netlists))
+
+
+def solve_netlist(filepath: str, time_step: str | None, cache_dir: str | None, share_topology: bool = False) -> dict:
+    """Solves a single netlist, turning any error into a result instead of stopping the batch.
+
+    Args:
+        filepath (str): Path for the netlist.
+        time_step (str | None): The time step for the circuit.
+        cache_dir (str | None): Directory for the cache of solved circuits, or None to disable it.
+        share_topology (bool, optional): Finds the solutions from the template for the topology of the circuit,
+          shared by every netlist with the same topology. Defaults to False.
+
+    Returns:
+        dict: The result for the netlist, ready to be written as JSON.
+    """
+    start = time.perf_counter()
+    result = {"file": filepath}
+    try:
+        if not os.path.isfile(filepath):
+            raise CircuitError(f'File "{filepath}" not found!')
+        circuit = Circuit(filepath, time_step, cache_dir=cache_dir, share_topology=share_topology)
+        solutions = {}
+        for name in RESULTS:
+            values = getattr(circuit, name)
+            solutions[name] = None if values is None else {key: str(value) for key, value in values.items()}
+        result.update(status="ok", **solutions)
+    except CircuitError as error:
+        result.update(status="error", error=ANSI_ESCAPE.sub("", error.message))
+    # Anything unexpected in a single netlist shouldn't stop the others
+    except Exception as error:  # pylint: disable=broad-exception-caught
+        result.update(status="error", error=f"{type(error).__name__}: {error}")
+    result["seconds"] = round(time.perf_counter() - start, 6)
+    return result
+
+
+def write_results(results: Iterable[dict]) -> int:
+    """Prints each result as a JSON line, as soon as it is available.
+
+    Args:
+        results (Iterable[dict]): The result for each netlist.
+
+    Returns:
+        int: The exit code, which is 1 if any netlist couldn't be solved.
+    """
+    failed = False
+    for result in results:
+        failed |= result["status"] != "ok"
+        print(json.dumps(result), flush=True)
+    return int(failed)
+
+
+def batch_app(argv: list[str]) -> int:
+    """Runs the batch subcommand, printing the result for each netlist as soon as it is solved (so the order of the
+    lines depends on which netlist finishes first).
+
+    Args:
+        argv (list[str]): The command line arguments, after "batch".
+
+    Returns:
+        int: The exit code, which is 1 if any netlist couldn't be solved.
+    """
+    args = create_batch_parser().parse_args(argv)
+    netlists = find_netlists(args.netlists)
+    cache_dir = get_cache_dir(args)
+
+    try:
+        workers = min(worker_count(args.workers), len(netlists))
+    except CircuitError as error:
+        print(error.code)
+        return 1
+
+    if workers <= 1:
+        return write_results(
+            solve_netlist(netlist, args.time_step, cache_dir, args.share_topology) for netlist in netlists
+        )
+
+    # The processes are kept for the whole batch, so sympy is only imported once in each of them
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(solve_netlist, netlist, args.time_step, cache_dir, args.share_topology)
+            for netlist in netlists
+        ]
+        return write_results(future.result() for future in as_completed(futures))
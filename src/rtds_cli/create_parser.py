@@ -1,6 +1,10 @@
 """Module related to the creation of the parses"""
 
 import argparse
+from pathlib import Path
+
+from rtds_circuit_analysis.cache import default_cache_dir
+from rtds_circuit_analysis.profiling import Profiler
 
 
 def create_parser():
@@ -11,6 +15,7 @@ def create_parser():
     """
     parser = argparse.ArgumentParser(
         description="Finds the equations that describe a circuit written as a netlist",
+        epilog='To solve many netlists at once, with JSON output, run "%(prog)s batch -h".',
         usage="%(prog)s [filepath] [options]",
     )
     parser.add_argument(
@@ -91,4 +96,91 @@ def create_parser():
         "for the timestep. Will take precedence over the netlist's .STEP, if set.",
     )
 
+    add_performance_arguments(parser)
+
     return parser
+
+
+def add_performance_arguments(parser: argparse.ArgumentParser):
+    """Adds the arguments related to how the circuit is solved (processes, cache and profiling), which are the same for
+    every command.
+
+    Args:
+        parser (argparse.ArgumentParser): The parser to add the arguments to.
+    """
+    group = parser.add_argument_group("Performance")
+
+    group.add_argument(
+        "-j",
+        "--workers",
+        nargs="?",
+        type=int,
+        const=0,
+        default=1,
+        metavar="N",
+        help="Number of processes used to simplify the expressions and to find the discrete methods, which are "
+        "independent from each other. If N is not specified, uses every core in the machine. Defaults to 1.",
+    )
+
+    group.add_argument(
+        "--cache-dir",
+        metavar="DIR",
+        help="Directory for the cache of solved circuits, so solving the same circuit again is almost instantaneous. "
+        "Defaults to $XDG_CACHE_HOME/rtds-circuit-analysis (or ~/.cache/rtds-circuit-analysis).",
+    )
+
+    group.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always solves the circuit, without reading or writing the cache of solved circuits.",
+    )
+
+    group.add_argument(
+        "--timings",
+        action="store_true",
+        help="Prints (to stderr) the time, number of calls and size of the expressions for each stage of solving the "
+        "circuit.",
+    )
+
+    group.add_argument(
+        "--profile",
+        action="append",
+        metavar="STAGE",
+        help="Runs the stage under cProfile, and writes the results to STAGE.prof (in the directory set by "
+        "--profile-dir). Can be used more than once. The stages are the ones shown by --timings.",
+    )
+
+    group.add_argument(
+        "--profile-dir",
+        default=".",
+        metavar="DIR",
+        help="Directory for the results of --profile. Defaults to the current directory.",
+    )
+
+
+def get_profiler(args: argparse.Namespace) -> Profiler | None:
+    """Creates the profiler for the circuit, from the command line arguments.
+
+    Args:
+        args (argparse.Namespace): The arguments given in the cli.
+
+    Returns:
+        Profiler | None: The profiler, or None if nothing should be measured.
+    """
+    if not (args.timings or args.profile):
+        return None
+    return Profiler(args.profile or (), args.profile_dir)
+
+
+def get_cache_dir(args: argparse.Namespace) -> Path | str | None:
+    """Finds the directory for the cache of solved circuits, from the command line arguments.
+
+    Args:
+        args (argparse.Namespace): The arguments given in the cli.
+
+    Returns:
+        Path | str | None: The directory, or None if the cache is disabled.
+    """
+    if args.no_cache:
+        return None
+    return args.cache_dir or default_cache_dir()
@@ -1,20 +1,57 @@
+import sys
+
 import rtds_cli.errors as rtds_cli
 from rtds_circuit_analysis import Circuit
+from rtds_circuit_analysis.profiling import profiling, stage
+from rtds_circuit_analysis.utils import CircuitError
+from rtds_cli.create_parser import get_cache_dir, get_profiler
 from rtds_vitis.create_parser import create_parser
 from rtds_vitis.errors import check_for_errors
+from rtds_vitis.fixed_point import print_fixed_point_check
+from rtds_vitis.matrix_code import print_matrix_code
+from rtds_vitis.parameters import parameter_values
+from rtds_vitis.testbench import write_testbench
 from rtds_vitis.vitis_code import print_vitis_code
 
 
-def app():
+def generate_code():
     parser = create_parser()
     args = parser.parse_args()
 
     # Check for the same errors as the rtds-circuit-analysis command
     rtds_cli.check_for_errors(args, parser.prog)
 
-    circuit = Circuit(args.filepath, args.time_step)
+    profiler = get_profiler(args)
+    with profiling(profiler):
+        circuit = Circuit(
+            args.filepath, args.time_step, workers=args.workers, cache_dir=get_cache_dir(args), profiler=profiler
+        )
+
+        # Check for erros exclusive for this program
+        check_for_errors(args, parser.prog, circuit)
+        parameters = parameter_values(args)
+
+        if args.check is not None:
+            with stage("fixed_point_check"):
+                print_fixed_point_check(circuit, args, parameters)
+        elif args.matrix:
+            with stage("print_vitis_code"):
+                print_matrix_code(circuit, args, parameters)
+        else:
+            with stage("print_vitis_code"):
+                print_vitis_code(circuit, args, parameters)
 
-    # Check for erros exclusive for this program
-    check_for_errors(args, parser.prog, circuit)
+        if args.testbench:
+            with stage("testbench"):
+                write_testbench(circuit, args, parameters)
 
-    print_vitis_code(circuit, args)
+    if profiler is not None:
+        print(profiler.report(), file=sys.stderr)
+
+
+def app():
+    try:
+        generate_code()
+    except CircuitError as error:
+        print(error.code)
+        sys.exit(1)
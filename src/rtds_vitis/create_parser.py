@@ -1,5 +1,7 @@
 import argparse
 
+from rtds_cli.create_parser import add_performance_arguments
+
 
 def create_parser():
     """Creates the parser for printing the vitis code.
@@ -14,7 +16,8 @@ def create_parser():
             'If you want to output it to a file, it is recommended to use the ">" output redirect operator. '
             "See the docs for more details: https://rtds-circuit-analysis.readthedocs.io/en/stable/vitis.html"
         ),
-        usage="%(prog)s [netlist.cir] [-T [TIMESTEP]] [-F [FIXED_BITS]] [-P [POINT_BITS]] (-f | -b | -t)",
+        usage="%(prog)s [netlist.cir] [-T [TIMESTEP]] [-F [FIXED_BITS]] [-P [POINT_BITS]] (-f | -b | -t) "
+        "[--params FILE] [-D NAME=VALUE] [--check STEPS] [--testbench DIR] [-j [N]]",
     )
     parser.add_argument(
         "filepath",
@@ -75,6 +78,93 @@ def create_parser():
         help="Uses the trapezoidal method for the discrete state equations.",
     )
 
+    parser.add_argument(
+        "--matrix",
+        action="store_true",
+        help="Writes the code in matrix form: the discrete state equations become constant coefficient arrays, found"
+        " when the code is generated, and a pipelined matrix-vector product updates the states. The latency and"
+        " resources grow predictably with the number of states (recommended above 10 states). Every component needs a"
+        " numeric value (see -D).",
+    )
+
+    parser.add_argument(
+        "--cse",
+        action="store_true",
+        help="Calculates the subexpressions shared by the state equations only once, in data_t temporaries, which saves"
+        " multipliers and dividers in the FPGA (their count before and after is printed to stderr). The temporaries are"
+        " truncated to data_t, so check the fixed point type again (--check).",
+    )
+
+    parameters = parser.add_argument_group(
+        "Parameters",
+        description="Numeric values for the literal component values (the ones marked as CHANGEME in the code). They"
+        " are substituted when the code is generated, and every part of the equations that only depends on them is"
+        " folded into a single constant",
+    )
+
+    parameters.add_argument(
+        "--params",
+        metavar="FILE",
+        help="File with one NAME=VALUE on each line (lines starting with * or # are comments).",
+    )
+
+    parameters.add_argument(
+        "-D",
+        "--define",
+        action="append",
+        metavar="NAME=VALUE",
+        help="Value for a literal component value, written like the values in the netlist (ex.: R1=1k). Overrides the"
+        " value in the parameter file. Can be given many times.",
+    )
+
+    check = parser.add_argument_group(
+        "Fixed Point Check",
+        description="Runs the generated code with a bit-accurate model of ap_fixed, instead of printing it, and reports"
+        " the values that wrap around and the error compared to a float simulation",
+    )
+
+    check.add_argument(
+        "--check",
+        type=int,
+        metavar="STEPS",
+        help="Number of calls to the top function (steps) to simulate.",
+    )
+
+    check.add_argument(
+        "--input",
+        action="append",
+        metavar="NAME=VALUE",
+        help="Value for an input, in every step. VALUE is either a number (a constant input), or a file with one value"
+        " per line (one for each step). Used by --check and --testbench. Can be given many times.",
+    )
+
+    testbench = parser.add_argument_group(
+        "Testbench",
+        description="Also writes a C simulation testbench for the top function, with golden vectors found by simulating"
+        " the same discrete state equations with floats (the inputs are given with --input)",
+    )
+
+    testbench.add_argument(
+        "--testbench",
+        metavar="DIR",
+        help="Directory for the testbench (NAME_tb.cpp) and the golden vectors (NAME_golden.csv).",
+    )
+
+    testbench.add_argument(
+        "--steps",
+        type=int,
+        help="Number of calls to the top function in the testbench. Defaults to the length of the input files.",
+    )
+
+    testbench.add_argument(
+        "--tolerance",
+        type=float,
+        help="Biggest absolute error for each state, in each step. Defaults to twice the error found by the fixed point"
+        " model (see --check).",
+    )
+
+    add_performance_arguments(parser)
+
     # parser.add_argument(
     #     "-i",
     #     "--currents",
@@ -0,0 +1,624 @@
+"""Bit-accurate model of the code written by rtds-vitis, so the word lengths for the fixed point type can be checked in
+seconds, instead of through the C simulation in Vitis HLS.
+
+The model follows the ``ap_fixed`` semantics for the generated code:
+
+- Every ``data_t`` value (states, inputs and parameters) is an ``ap_fixed<F, P, AP_TRN, AP_WRAP>``, so converting a
+  value to it truncates the bits after the point (rounding towards minus infinity), and wraps around on overflow.
+- The results of ``+``, ``-`` and ``*`` have full precision (their type grows to fit every bit), so they are exact.
+- The result of ``/`` keeps the same number of bits after the point as the dividend, truncating towards zero.
+- Integer literals are C++ integers, and float literals are converted to the type of the other operand.
+
+Values are stored as integers scaled by the number of bits after the point, and every operation is done on them
+through NumPy (on many simulations at once, if the inputs have more than one column).
+"""
+
+import math
+import os
+import re
+import sys
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from rtds_circuit_analysis.parse_netlist import parse_value
+from rtds_circuit_analysis.simulation import find_discrete_system, simulate_chunks
+from rtds_circuit_analysis.utils import error_message
+from rtds_vitis.matrix_code import find_matrices, get_method
+from rtds_vitis.parameters import split_definition
+from rtds_vitis.vitis_code import format_equations, get_equations, get_inputs_and_states
+
+if TYPE_CHECKING:
+    from argparse import Namespace
+
+    from rtds_circuit_analysis import Circuit
+
+TOKEN = re.compile(r"\s*(?:(\d+\.\d*(?:[eE][-+]?\d+)?|\d+[eE][-+]?\d+)|(\d+)|([A-Za-z_]\w*)|(\*\*|[-+*/()]))")
+STATEMENT = re.compile(r"^(?:(?:static\s+)?(?:const\s+)?data_t\s+)?(\w+)\s*=\s*(.+);$")
+# Biggest number of bits for the scaled integers that still fits in an int64 (with room for a sign and a carry)
+INT64_BITS = 62
+
+
+@dataclass(frozen=True)
+class FixedType:
+    """An ``ap_fixed<width, integer>`` type (signed). C++ integers are the same as ``ap_fixed<width, width>``.
+
+    Attributes:
+        width (int): Total number of bits.
+        integer (int): Number of bits before the point, including the sign bit.
+    """
+
+    width: int
+    integer: int
+
+    @property
+    def fraction(self) -> int:
+        """int: Number of bits after the point."""
+        return self.width - self.integer
+
+    def __str__(self):
+        return f"ap_fixed<{self.width}, {self.integer}>"
+
+
+@dataclass
+class Value:
+    """A value in the compiled code.
+
+    Attributes:
+        code (str): Python code for the scaled integer (a name, or a literal).
+        type (FixedType | None): The type for the value. None for float literals, which only get a type once they are
+          used alongside another value.
+        bits (int): Upper bound for the number of bits in the scaled integer (including the sign).
+        literal (float | None): The value for float literals.
+    """
+
+    code: str
+    type: FixedType | None
+    bits: int
+    literal: float | None = None
+
+
+@dataclass
+class FixedPointReport:
+    """The results of running the generated code with the fixed point model.
+
+    Attributes:
+        data_type (FixedType): The type for ``data_t``.
+        states (dict[str, np.ndarray]): Dictionary that relates each state variable to its fixed point values, after
+          each call to the top function.
+        reference (dict[str, np.ndarray]): The same values, found with floats and the exact parameter values.
+        inputs (list[str]): The inputs.
+        wraps (dict[str, int]): Dictionary that relates each state variable, temporary (see ``--cse``) and input to the
+          number of times it overflowed (and wrapped around) when converted to ``data_t``.
+        warnings (list[str]): Constants and coefficients that lose too much precision in ``data_t``.
+    """
+
+    data_type: FixedType
+    states: dict[str, np.ndarray]
+    reference: dict[str, np.ndarray]
+    inputs: list[str]
+    wraps: dict[str, int]
+    warnings: list[str] = field(default_factory=list)
+
+    @property
+    def errors(self) -> dict[str, float]:
+        """dict[str, float]: The biggest absolute error for each state variable, compared to the reference."""
+        return {name: float(np.max(np.abs(values - self.reference[name]))) for name, values in self.states.items()}
+
+    def summary(self) -> str:
+        """Writes the results as a table, with a row for each state variable and input (and for each temporary that
+        wrapped around).
+
+        Returns:
+            str: The table.
+        """
+        width = max(len("variable"), *(len(name) for name in self.wraps))
+        lines = [f"*** Fixed point check ({self.data_type}, resolution {2.0**-self.data_type.fraction:.3g}) ***"]
+        lines.append(f"{'variable':<{width}} {'wraps':>8} {'max error':>12} {'max |value|':>12}")
+        for name, wraps in self.wraps.items():
+            if not wraps and name not in self.states and name not in self.inputs:
+                continue
+            if name in self.states:
+                error = f"{self.errors[name]:12.4g}"
+                peak = f"{float(np.max(np.abs(self.reference[name]))):12.4g}"
+            else:
+                error = peak = f"{'-':>12}"
+            lines.append(f"{name:<{width}} {wraps:>8} {error} {peak}")
+        lines += [f"Warning: {warning}" for warning in self.warnings]
+        return "\n".join(lines)
+
+
+def to_fixed(values: ArrayLike, data_type: FixedType) -> tuple[np.ndarray, int]:
+    """Converts floats to ``data_t``, as scaled integers (truncating, and wrapping around on overflow).
+
+    Args:
+        values (ArrayLike): The values.
+        data_type (FixedType): The type.
+
+    Returns:
+        tuple[np.ndarray, int]: The scaled integers (as Python integers, in an array of objects), and the number of
+        values that wrapped around.
+    """
+    scaled = np.floor(np.asarray(values, dtype=float) * 2.0**data_type.fraction)
+    integers = np.array(np.frompyfunc(int, 1, 1)(scaled), dtype=object)
+    wrapped = wrap(integers, data_type.width)
+    return wrapped, int(np.count_nonzero(wrapped != integers))
+
+
+def wrap(values, width: int):
+    """Wraps the scaled integers around, so they fit in a signed number with the given width (like AP_WRAP).
+
+    Args:
+        values: The scaled integers (a Python integer, or a NumPy array).
+        width (int): Number of bits.
+
+    Returns:
+        The wrapped integers.
+    """
+    half = 1 << (width - 1)
+    return ((values + half) & ((1 << width) - 1)) - half
+
+
+def divide(dividend, divisor):
+    """Divides integers like C++ does, truncating towards zero. Dividing by zero raises ``ZeroDivisionError`` (or
+    ``FloatingPointError`` for int64 arrays, inside ``np.errstate(divide="raise")``).
+
+    Args:
+        dividend: The dividend (a Python integer, or a NumPy array).
+        divisor: The divisor (a Python integer, or a NumPy array).
+
+    Returns:
+        The quotient.
+    """
+    quotient = dividend // divisor
+    return quotient + ((quotient < 0) & (quotient * divisor != dividend))
+
+
+class CodeCompiler:
+    """Compiles the statements from the generated code into a single Python function, that runs them on scaled
+    integers.
+
+    Args:
+        data_type (FixedType): The type for ``data_t``.
+        variables (set[str]): Names of the ``data_t`` values the statements can read before assigning them.
+    """
+
+    def __init__(self, data_type: FixedType, variables: set[str]):
+        self.data_type = data_type
+        self.variables = set(variables)
+        self.lines: list[str] = []
+        self.bits = data_type.width
+        self.warnings: list[str] = []
+        self._temporaries = 0
+        self._tokens: list[tuple[str, str]] = []
+
+    def compile(self, statements: list[str]) -> Callable:
+        """Compiles the statements.
+
+        Args:
+            statements (list[str]): The statements (``name = expression;``), in the order they run.
+
+        Returns:
+            Callable: A function that receives a dictionary with the scaled integer for each variable (which it
+            updates with the assigned values), the division function, and the function that stores a value in
+            ``data_t`` (see :func:`run_code`).
+        """
+        for statement in statements:
+            match = STATEMENT.match(statement.strip())
+            if match is None:
+                error_message(f"The statement '{statement.strip()}' can't be simulated.")
+            name, expression = match.groups()
+            value = self.expression(expression)
+            if value.literal is not None:
+                value = self.literal(value, self.data_type)
+            shift = value.type.fraction - self.data_type.fraction
+            self.bits = max(self.bits, value.bits - min(shift, 0))
+            self.lines.append(f'variables["{name}"] = store("{name}", {value.code}, {shift})')
+            self.variables.add(name)
+
+        source = "def update(variables, divide, store):\n" + "\n".join(f"    {line}" for line in self.lines)
+        namespace = {}
+        exec(source, namespace)
+        return namespace["update"]
+
+    def expression(self, expression: str) -> Value:
+        position = 0
+        self._tokens = []
+        while position < len(expression.rstrip()):
+            match = TOKEN.match(expression, position)
+            if match is None:
+                error_message(f"The expression '{expression}' can't be simulated.")
+            kinds = ("float", "int", "name", "operator")
+            self._tokens += [(kind, token) for kind, token in zip(kinds, match.groups()) if token is not None]
+            position = match.end()
+        value = self._sum()
+        if self._tokens:
+            error_message(f"The expression '{expression}' can't be simulated.")
+        return value
+
+    def _peek(self) -> str | None:
+        return self._tokens[0][1] if self._tokens else None
+
+    def _take(self) -> tuple[str, str]:
+        if not self._tokens:
+            error_message("The expression ended before it was expected to.")
+        return self._tokens.pop(0)
+
+    def _sum(self) -> Value:
+        value = self._product()
+        while self._peek() in ("+", "-"):
+            _, operator = self._take()
+            value = self.add(value, self._product(), operator)
+        return value
+
+    def _product(self) -> Value:
+        value = self._unary()
+        while self._peek() in ("*", "/"):
+            _, operator = self._take()
+            other = self._unary()
+            value = self.multiply(value, other) if operator == "*" else self.divide(value, other)
+        return value
+
+    def _unary(self) -> Value:
+        if self._peek() == "-":
+            self._take()
+            value = self._unary()
+            if value.literal is not None:
+                return Value(f"-{value.code}", None, 0, -value.literal)
+            return self.temporary(f"-{value.code}", FixedType(value.type.width + 1, value.type.integer + 1), value.bits)
+        return self._power()
+
+    def _power(self) -> Value:
+        value = self._atom()
+        if self._peek() != "**":
+            return value
+        self._take()
+        kind, exponent = self._take()
+        if kind != "int" or int(exponent) < 1:
+            error_message(f"Only positive integer powers can be simulated (got '{exponent}').")
+        result = value
+        for _ in range(int(exponent) - 1):
+            result = self.multiply(result, value)
+        return result
+
+    def _atom(self) -> Value:
+        kind, token = self._take()
+        if kind == "float":
+            return Value(token, None, 0, float(token))
+        if kind == "int":
+            width = 32 if int(token) < 2**31 else 64
+            return Value(token, FixedType(width, width), int(token).bit_length() + 1)
+        if kind == "name":
+            if token not in self.variables:
+                error_message(f"The value of '{token}' isn't known, so the code can't be simulated.")
+            return Value(f'variables["{token}"]', self.data_type, self.data_type.width)
+        if token == "(":
+            value = self._sum()
+            if self._take()[1] != ")":
+                error_message("Unbalanced parentheses in the generated code.")
+            return value
+        error_message(f"Unexpected '{token}' in the generated code.")
+
+    def temporary(self, code: str, fixed_type: FixedType, bits: int) -> Value:
+        """Stores the result of an operation in a new temporary variable.
+
+        Args:
+            code (str): Python code for the operation.
+            fixed_type (FixedType): The type for the result.
+            bits (int): Upper bound for the number of bits in the result.
+
+        Returns:
+            Value: The temporary variable.
+        """
+        name = f"t{self._temporaries}"
+        self._temporaries += 1
+        self.lines.append(f"{name} = {code}")
+        self.bits = max(self.bits, bits)
+        return Value(name, fixed_type, bits)
+
+    def literal(self, value: Value, fixed_type: FixedType) -> Value:
+        """Converts a float literal to a type, like the constructor for ``ap_fixed`` does.
+
+        Args:
+            value (Value): The float literal.
+            fixed_type (FixedType): The type.
+
+        Returns:
+            Value: The converted literal.
+        """
+        scaled = wrap(math.floor(value.literal * 2.0**fixed_type.fraction), fixed_type.width)
+        warning = f"The constant {value.literal:g} becomes 0 in {fixed_type}."
+        if scaled == 0 and value.literal != 0 and warning not in self.warnings:
+            self.warnings.append(warning)
+        return Value(str(scaled), fixed_type, max(scaled.bit_length() + 1, 1))
+
+    def _typed(self, value: Value, other: Value) -> Value:
+        if value.literal is None:
+            return value
+        return self.literal(value, other.type if other.literal is None else self.data_type)
+
+    def _aligned(self, value: Value, shift: int) -> str:
+        return f"({value.code} << {shift})" if shift else value.code
+
+    def add(self, left: Value, right: Value, operator: str) -> Value:
+        left, right = self._typed(left, right), self._typed(right, left)
+        fraction = max(left.type.fraction, right.type.fraction)
+        integer = max(left.type.integer, right.type.integer) + 1
+        left_shift, right_shift = fraction - left.type.fraction, fraction - right.type.fraction
+        code = f"{self._aligned(left, left_shift)} {operator} {self._aligned(right, right_shift)}"
+        bits = max(left.bits + left_shift, right.bits + right_shift) + 1
+        return self.temporary(code, FixedType(integer + fraction, integer), bits)
+
+    def multiply(self, left: Value, right: Value) -> Value:
+        left, right = self._typed(left, right), self._typed(right, left)
+        fixed_type = FixedType(left.type.width + right.type.width, left.type.integer + right.type.integer)
+        return self.temporary(f"{left.code} * {right.code}", fixed_type, left.bits + right.bits)
+
+    def divide(self, left: Value, right: Value) -> Value:
+        left, right = self._typed(left, right), self._typed(right, left)
+        # The dividend is shifted so the quotient keeps its number of bits after the point
+        fraction = right.type.fraction
+        fixed_type = FixedType(left.type.width + fraction + 1, left.type.integer + fraction + 1)
+        code = f"divide({self._aligned(left, fraction)}, {right.code})"
+        return self.temporary(code, fixed_type, left.bits + fraction)
+
+
+def update_statements(
+    circuit: "Circuit", args: "Namespace", parameters: dict[str, float]
+) -> tuple[list[str], dict[str, float]]:
+    """Finds the statements that update the states, exactly as they are written in the generated code. For the matrix
+    form (``--matrix``), each state is written as the sum of the products in its row, with a name for each coefficient.
+
+    Args:
+        circuit (Circuit): The circuit.
+        args (Namespace): The arguments for rtds-vitis.
+        parameters (dict[str, float]): The values for the literal component values.
+
+    Returns:
+        tuple[list[str], dict[str, float]]: The statements, in order, and the values for the coefficients in the
+        constant arrays (empty for the scalar code).
+    """
+    if not args.matrix:
+        inputs, states = get_inputs_and_states(circuit.state_space())
+        code = format_equations(get_equations(circuit, args, parameters), states, inputs, args.cse)
+        return [line for line in code.split("\n") if line.strip()], {}
+
+    system = find_matrices(circuit, args, parameters)
+    columns = (
+        ("PHI", system.phi, [f"{state}_old" for state in system.states]),
+        ("GAMMA_OLD", system.gamma_old, [f"{name}_old" for name in system.inputs]),
+        ("GAMMA_NEW", system.gamma_new, system.inputs),
+    )
+    statements, coefficients = [], {}
+    for row, state in enumerate(system.states):
+        terms = [f"K_{row}"]
+        coefficients[f"K_{row}"] = system.k[row]
+        for array, matrix, variables in columns:
+            for column, variable in enumerate(variables):
+                coefficients[f"{array}_{row}_{column}"] = matrix[row, column]
+                terms.append(f"{array}_{row}_{column}*{variable}")
+        statements.append(f"{state}_new = {' + '.join(terms)};")
+    return statements, coefficients
+
+
+def run_code(
+    update: Callable,
+    data_type: FixedType,
+    states: list[str],
+    inputs: dict[str, np.ndarray],
+    parameters: dict[str, object],
+    steps: int,
+) -> tuple[dict[str, np.ndarray], dict[str, int]]:
+    """Runs the compiled code once for each step, the same way the top function does when ``sinc`` toggles.
+
+    Args:
+        update (Callable): The compiled code (see :meth:`CodeCompiler.compile`).
+        data_type (FixedType): The type for ``data_t``.
+        states (list[str]): The state variables.
+        inputs (dict[str, np.ndarray]): Dictionary that relates each input to its scaled integer at each step.
+        parameters (dict[str, object]): Dictionary that relates each parameter to its scaled integer.
+        steps (int): Number of steps.
+
+    Returns:
+        tuple[dict[str, np.ndarray], dict[str, int]]: The scaled integer for each state after each step, and the
+        number of times each state (and temporary) wrapped around.
+    """
+    wraps = dict.fromkeys(states, 0)
+
+    def store(name: str, value, shift: int):
+        truncated = value >> shift if shift >= 0 else value << -shift
+        wrapped = wrap(truncated, data_type.width)
+        key = name.removesuffix("_new")
+        changed = wrapped != truncated
+        wraps[key] = wraps.get(key, 0) + (changed if isinstance(changed, bool) else int(np.count_nonzero(changed)))
+        return wrapped
+
+    # Every static variable in the top function starts at zero
+    zero = next(iter(inputs.values()))[0] * 0 if inputs else 0
+    variables = dict(parameters)
+    variables.update({f"{state}_new": zero for state in states})
+    variables.update({f"{name}_old": zero for name in inputs})
+    trajectory = {state: [] for state in states}
+    try:
+        with np.errstate(divide="raise"):
+            for step in range(steps):
+                for state in states:
+                    variables[f"{state}_old"] = variables[f"{state}_new"]
+                for name, values in inputs.items():
+                    variables[name] = values[step]
+                update(variables, divide, store)
+                for name in inputs:
+                    variables[f"{name}_old"] = variables[name]
+                for state in states:
+                    trajectory[state].append(variables[f"{state}_new"])
+    except (ZeroDivisionError, FloatingPointError):
+        error_message(f"The fixed point code divides by zero in step {step} (a parameter may be too small for data_t).")
+    return {state: np.array(values) for state, values in trajectory.items()}, wraps
+
+
+def float_reference(
+    circuit: "Circuit",
+    method: str,
+    inputs: dict[str, np.ndarray],
+    parameters: dict[str, float],
+    steps: int,
+    runs: int,
+) -> dict[str, np.ndarray]:
+    """Simulates the same discrete state equations with floats, and the exact parameter values. Like the top function,
+    every value (including the previous inputs) starts at zero.
+
+    Args:
+        circuit (Circuit): The circuit.
+        method (str): The discrete method.
+        inputs (dict[str, np.ndarray]): Dictionary that relates each input to its values (one row for each step, and a
+          column for each simulation).
+        parameters (dict[str, float]): The value for each parameter.
+        steps (int): Number of steps.
+        runs (int): Number of simulations.
+
+    Returns:
+        dict[str, np.ndarray]: The values for each state variable after each step (one row for each step, and a column
+        for each simulation).
+    """
+    system = find_discrete_system(getattr(circuit, method), {}, {}, circuit.components, parameters)
+    matrix = np.stack([inputs[name] for name in system.inputs], axis=-1) if system.inputs else None
+    results = {state: np.empty((steps, runs)) for state in system.states}
+    for run in range(runs):
+        # A zero input is added before the first one, for the previous inputs (the first sample is then dropped)
+        chunk = np.zeros((steps + 1, len(system.inputs)))
+        if matrix is not None:
+            chunk[1:] = matrix[:, run]
+        for result in simulate_chunks(system, [chunk]):
+            for state, values in result.states.items():
+                results[state][:, run] = values[1:]
+    return results
+
+
+def simulate_fixed_point(
+    circuit: "Circuit",
+    args: "Namespace",
+    inputs: dict[str, ArrayLike],
+    parameters: dict[str, float] | None = None,
+    steps: int | None = None,
+) -> FixedPointReport:
+    """Runs the code generated by rtds-vitis with the fixed point model, and compares it with a float simulation.
+
+    Args:
+        circuit (Circuit): The circuit.
+        args (Namespace): The arguments for rtds-vitis (the fixed point type, and the method).
+        inputs (dict[str, ArrayLike]): Dictionary that relates each input to its value in each call to the top
+          function (a sequence, or a matrix with a column for each simulation), or to a constant value (a number).
+        parameters (dict[str, float] | None, optional): The values for the literal component values (the "CHANGEME"s
+          in the code). Defaults to None.
+        steps (int | None, optional): Number of calls to the top function. If None, it is the length of the input
+          sequences. Defaults to None.
+
+    Returns:
+        FixedPointReport: The results.
+    """
+    data_type = FixedType(int(args.fixed), int(args.point))
+    if data_type.integer < 1 or data_type.fraction < 0:
+        error_message(f"Invalid fixed point type {data_type}.")
+    parameters = parameters or {}
+    input_names, states = get_inputs_and_states(circuit.state_space())
+
+    unknown = sorted(set(inputs) - set(input_names))
+    if unknown:
+        error_message(f"The symbols {', '.join(unknown)} aren't inputs. Valid inputs are: {', '.join(input_names)}.")
+    missing = [name for name in input_names if name not in inputs]
+    if missing:
+        error_message(f"Missing values for the inputs: {', '.join(missing)}.")
+
+    arrays = {name: np.asarray(inputs[name], dtype=float) for name in input_names}
+    lengths = {len(array) for array in arrays.values() if array.ndim > 0}
+    if steps is None:
+        if len(lengths) != 1:
+            error_message("The number of steps can't be found from the inputs. Give it through 'steps'.")
+        steps = lengths.pop()
+    if any(length < steps for length in lengths):
+        error_message(f"Every input sequence needs at least {steps} samples.")
+    runs = max((array.shape[1] for array in arrays.values() if array.ndim == 2), default=0)
+    shape = (steps, runs) if runs else (steps,)
+    for name, array in arrays.items():
+        if array.ndim > 0:
+            array = array[:steps, None] if array.ndim == 1 and runs else array[:steps]
+        arrays[name] = np.broadcast_to(array, shape)
+
+    wraps, fixed_inputs = {}, {}
+    for name, array in arrays.items():
+        fixed_inputs[name], wraps[name] = to_fixed(array, data_type)
+
+    # The parameters are folded into the statements (or into the coefficients), so only the constants are left
+    warnings = []
+    fixed_parameters = {}
+    statements, coefficients = update_statements(circuit, args, parameters)
+    for name, value in coefficients.items():
+        fixed_parameters[name] = int(to_fixed(value, data_type)[0])
+        if value != 0 and fixed_parameters[name] == 0:
+            warnings.append(f"The coefficient {name} = {value:g} becomes 0 in {data_type}.")
+
+    variables = set(fixed_parameters) | set(input_names)
+    variables |= {f"{name}_old" for name in input_names + states} | {f"{state}_new" for state in states}
+    compiler = CodeCompiler(data_type, variables)
+    update = compiler.compile(statements)
+    warnings += compiler.warnings
+    if runs and compiler.bits <= INT64_BITS:
+        fixed_inputs = {name: values.astype(np.int64) for name, values in fixed_inputs.items()}
+
+    trajectory, state_wraps = run_code(update, data_type, states, fixed_inputs, fixed_parameters, steps)
+    matrices = {name: array.reshape(steps, -1) for name, array in arrays.items()}
+    reference = float_reference(circuit, get_method(args), matrices, parameters, steps, max(runs, 1))
+
+    scale = 2.0**-data_type.fraction
+    return FixedPointReport(
+        data_type=data_type,
+        states={state: values.astype(float).reshape(shape) * scale for state, values in trajectory.items()},
+        reference={state: values.reshape(shape) for state, values in reference.items()},
+        inputs=input_names,
+        wraps=state_wraps | wraps,
+        warnings=warnings,
+    )
+
+
+def print_fixed_point_check(circuit: "Circuit", args: "Namespace", parameters: dict[str, float]):
+    """Prints the results of the fixed point model for the generated code (see :func:`simulate_fixed_point`), with
+    the inputs and parameters from the command line.
+
+    Args:
+        circuit (Circuit): The circuit.
+        args (Namespace): The arguments for rtds-vitis.
+        parameters (dict[str, float]): The values for the literal component values.
+    """
+    report = simulate_fixed_point(circuit, args, input_values(args), parameters, args.check)
+    print(report.summary())
+    if any(report.wraps.values()):
+        print(
+            "\n\033[33mWARNING: Some values wrapped around. Use more bits before the point (-P).\033[0m",
+            file=sys.stderr,
+        )
+
+
+def input_values(args: "Namespace") -> dict[str, float | np.ndarray]:
+    """Reads the ``--input NAME=VALUE`` definitions from the command line, where each value is either a number, or a
+    file with one value per line (one for each step).
+
+    Args:
+        args (Namespace): The arguments for rtds-vitis.
+
+    Returns:
+        dict[str, float | np.ndarray]: Dictionary that relates each input to its value, or to its values at each step.
+    """
+    inputs = {}
+    for definition in args.input or []:
+        name, value = split_definition(definition, "--input")
+        # Files come first, since some paths also parse as a number (ex.: "tmp0a.txt" is 0 * mp0a.txt)
+        try:
+            if os.path.isfile(value):
+                inputs[name] = np.loadtxt(value, ndmin=1)
+            else:
+                inputs[name] = float(parse_value(value))
+        except (OSError, TypeError, ValueError, AttributeError):
+            error_message(f"The input '{value}' is neither a number nor a readable file.")
+    return inputs
@@ -0,0 +1,198 @@
+"""Writes the Vitis HLS code in matrix form: the discrete state equations become constant coefficient arrays, and a
+matrix-vector product updates every state. The latency grows with the number of states in a predictable way, instead
+of depending on how big the expressions for each state are."""
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from rtds_circuit_analysis.simulation import DiscreteSystem, find_discrete_system
+from rtds_circuit_analysis.utils import error_message
+from rtds_vitis.vitis_code import define_function, get_cpp_headers, get_inputs_and_states, indent1
+
+if TYPE_CHECKING:
+    from argparse import Namespace
+
+    from rtds_circuit_analysis import Circuit
+
+
+def get_method(args: "Namespace") -> str:
+    """Finds the discrete method chosen in the command line.
+
+    Args:
+        args (Namespace): The arguments for rtds-vitis.
+
+    Returns:
+        str: The method.
+    """
+    if args.forward:
+        return "forward"
+    if args.backward:
+        return "backward"
+    return "trapezoidal"
+
+
+def find_matrices(circuit: "Circuit", args: "Namespace", parameters: dict[str, float]) -> DiscreteSystem:
+    """Finds the matrices for the discrete state equations, with the states and inputs sorted by name (the same order
+    as in the arguments for the top function).
+
+    Args:
+        circuit (Circuit): The circuit.
+        args (Namespace): The arguments for rtds-vitis.
+        parameters (dict[str, float]): The values for the literal component values.
+
+    Returns:
+        DiscreteSystem: The matrices.
+    """
+    equations = getattr(circuit, get_method(args))
+    symbols = set().union(*(expression.free_symbols for expression in equations.values()))
+    literals = sorted(str(symbol) for symbol in symbols if "_{n" not in str(symbol) and str(symbol) not in parameters)
+    if literals:
+        error_message(
+            f"The matrix form needs a numeric value for every component, but {', '.join(literals)} have literal values."
+            " Give them with '-D NAME=VALUE'."
+        )
+
+    system = find_discrete_system(equations, {}, {}, circuit.components, parameters)
+    inputs, states = get_inputs_and_states(circuit.state_space())
+    order = [system.states.index(state) for state in states]
+    system.states = states
+    system.phi = system.phi[np.ix_(order, order)]
+    system.gamma_old, system.gamma_new, system.k = system.gamma_old[order], system.gamma_new[order], system.k[order]
+    return system
+
+
+def format_array(name: str, values: np.ndarray) -> str:
+    """Declares a constant ``data_t`` array, initialized with the values.
+
+    Args:
+        name (str): The name for the array.
+        values (np.ndarray): The values (a vector or a matrix).
+
+    Returns:
+        str: The declaration.
+    """
+    if values.ndim == 1:
+        return f"const data_t {name}[{len(values)}] = {{{', '.join(f'{value:.17g}' for value in values)}}};\n"
+    rows = ",\n".join(indent1("{" + ", ".join(f"{value:.17g}" for value in row) + "}") for row in values)
+    return f"const data_t {name}[{values.shape[0]}][{values.shape[1]}] = {{\n{rows}\n}};\n"
+
+
+def accumulator_type(fixed: str, point: str, terms: int) -> str:
+    """Declares the type for the sums of products, wide enough that they never lose bits (like the intermediate
+    results in the scalar code).
+
+    Args:
+        fixed (str): Number of bits for ``data_t``.
+        point (str): Number of bits before the point for ``data_t``, including the sign.
+        terms (int): Number of products in each sum.
+
+    Returns:
+        str: The typedef.
+    """
+    guard = terms.bit_length()
+    return f"typedef ap_fixed<{2 * int(fixed) + guard}, {2 * int(point) + guard}> acc_t;\n"
+
+
+def matrix_update(system: DiscreteSystem) -> str:
+    """Writes the loop that updates every state through the matrix-vector product, with the HLS pragmas that pipeline
+    it (one state per clock cycle) and unroll each sum.
+
+    Args:
+        system (DiscreteSystem): The matrices.
+
+    Returns:
+        str: The code for the loop.
+    """
+    products = ["PHI[i][j] * x[j]"]
+    inputs = []
+    if system.gamma_old.any():
+        inputs.append("GAMMA_OLD[i][j] * u_old[j]")
+    if system.gamma_new.any():
+        inputs.append("GAMMA_NEW[i][j] * u[j]")
+
+    loop = "acc_t sum = K[i];\n" if system.k.any() else "acc_t sum = 0;\n"
+    loop += "states_loop: for(int j = 0; j < N_STATES; j++){\n"
+    loop += indent1("#pragma HLS UNROLL\n" + "".join(f"sum += {product};\n" for product in products))
+    loop += "}\n"
+    if inputs:
+        loop += "inputs_loop: for(int j = 0; j < N_INPUTS; j++){\n"
+        loop += indent1("#pragma HLS UNROLL\n" + "".join(f"sum += {product};\n" for product in inputs))
+        loop += "}\n"
+    loop += "x_new[i] = sum;\n"
+
+    code = "\ndata_t x_new[N_STATES];\n"
+    code += "#pragma HLS ARRAY_PARTITION variable=x_new complete\n"
+    code += "update_loop: for(int i = 0; i < N_STATES; i++){\n"
+    code += indent1("#pragma HLS PIPELINE II=1\n" + loop)
+    code += "}\n"
+    code += "\ncopy_loop: for(int i = 0; i < N_STATES; i++){\n"
+    code += indent1("#pragma HLS UNROLL\nx[i] = x_new[i];\n")
+    code += "}\n"
+    if system.gamma_old.any():
+        code += "\ninputs_old_loop: for(int j = 0; j < N_INPUTS; j++){\n"
+        code += indent1("#pragma HLS UNROLL\nu_old[j] = u[j];\n")
+        code += "}\n"
+    return code
+
+
+def matrix_function(system: DiscreteSystem, args: "Namespace") -> str:
+    """Writes the top function, in matrix form.
+
+    Args:
+        system (DiscreteSystem): The matrices.
+        args (Namespace): The arguments for rtds-vitis.
+
+    Returns:
+        str: The top function.
+    """
+    code = "\nstatic uint1_t aux_sinc;\n"
+    code += "\nstatic data_t x[N_STATES] = {0};\n"
+    code += "#pragma HLS ARRAY_PARTITION variable=x complete\n"
+    if system.inputs:
+        code += f"data_t u[N_INPUTS] = {{{', '.join(system.inputs)}}};\n"
+        code += "#pragma HLS ARRAY_PARTITION variable=u complete\n"
+    if system.gamma_old.any():
+        code += "static data_t u_old[N_INPUTS] = {0};\n"
+        code += "#pragma HLS ARRAY_PARTITION variable=u_old complete\n"
+    code += "#pragma HLS ARRAY_PARTITION variable=PHI complete dim=2\n"
+    for name, matrix in (("GAMMA_OLD", system.gamma_old), ("GAMMA_NEW", system.gamma_new)):
+        if matrix.any():
+            code += f"#pragma HLS ARRAY_PARTITION variable={name} complete dim=2\n"
+
+    code += "\nif(aux_sinc == sinc){\n}\n"
+    code += "else{\n"
+    code += indent1("\naux_sinc = sinc;\n" + matrix_update(system))
+    code += "\n}\n\n"
+    code += "".join(f"*{state} = x[{i}];\n" for i, state in enumerate(system.states))
+
+    function = define_function(args.filepath, system.inputs, system.states)
+    return f"{function}{indent1(code)}\n}}"
+
+
+def print_matrix_code(circuit: "Circuit", args: "Namespace", parameters: dict[str, float]):
+    """Prints the cpp vitis code in matrix form, for implementing the circuit in an FPGA.
+
+    Args:
+        circuit (Circuit): The circuit's class
+        args (Namespace): The arguments for the rtds-vitis command line code
+        parameters (dict[str, float]): The values for the literal component values.
+    """
+    system = find_matrices(circuit, args, parameters)
+    input_matrices = sum(bool(matrix.any()) for matrix in (system.gamma_old, system.gamma_new))
+    terms = len(system.states) + input_matrices * len(system.inputs) + 1
+
+    code = get_cpp_headers(args.fixed, args.point)
+    code += accumulator_type(args.fixed, args.point, terms)
+    code += f"\n#define N_STATES {len(system.states)}\n"
+    if system.inputs:
+        code += f"#define N_INPUTS {len(system.inputs)}\n"
+    code += "\n" + format_array("PHI", system.phi)
+    if system.gamma_old.any():
+        code += format_array("GAMMA_OLD", system.gamma_old)
+    if system.gamma_new.any():
+        code += format_array("GAMMA_NEW", system.gamma_new)
+    if system.k.any():
+        code += format_array("K", system.k)
+    code += matrix_function(system, args)
+    print(code)
@@ -0,0 +1,109 @@
+"""Functions related to the numeric values given for the literal component values (the "CHANGEME"s in the code), either
+in a parameter file or with ``-D NAME=VALUE``, and to folding them into the discrete state equations when the code is
+generated."""
+
+from typing import TYPE_CHECKING
+
+import sympy as sp
+
+from rtds_circuit_analysis.parse_netlist import parse_value
+from rtds_circuit_analysis.utils import error_message
+
+if TYPE_CHECKING:
+    from argparse import Namespace
+
+
+def split_definition(definition: str, flag: str) -> tuple[str, str]:
+    """Splits a ``NAME=VALUE`` definition from the command line.
+
+    Args:
+        definition (str): The definition.
+        flag (str): The flag it was given with, for the error message.
+
+    Returns:
+        tuple[str, str]: The name and the value.
+    """
+    name, separator, value = definition.partition("=")
+    if not separator or not name or not value:
+        error_message(f"Invalid value '{definition}' for {flag}. It should be written as NAME=VALUE.")
+    return name.strip(), value.strip()
+
+
+def read_parameter_file(filepath: str) -> list[str]:
+    """Reads the definitions in a parameter file, one ``NAME=VALUE`` on each line. Empty lines, and lines starting with
+    "*" or "#" (comments), are ignored.
+
+    Args:
+        filepath (str): The path for the file.
+
+    Returns:
+        list[str]: The definitions, in order.
+    """
+    try:
+        with open(filepath) as file:
+            lines = [line.strip() for line in file]
+    except OSError:
+        error_message(f"The parameter file '{filepath}' can't be read.")
+    return [line for line in lines if line and not line.startswith(("*", "#"))]
+
+
+def parameter_values(args: "Namespace") -> dict[str, float]:
+    """Reads the values for the literal component values from the command line: first the ones in the parameter file
+    (``--params``), then the ``-D NAME=VALUE`` definitions, which override them. The values are written the same way as
+    the component values in the netlist (ex.: ``R1=1k``).
+
+    Args:
+        args (Namespace): The arguments for rtds-vitis.
+
+    Returns:
+        dict[str, float]: Dictionary that relates each parameter to its value.
+    """
+    definitions = []
+    if args.params:
+        definitions += [(definition, args.params) for definition in read_parameter_file(args.params)]
+    definitions += [(definition, "-D") for definition in args.define or []]
+
+    values = {}
+    for definition, flag in definitions:
+        name, value = split_definition(definition, flag)
+        number = parse_value(value)
+        if not number.is_number:
+            error_message(f"The value for the parameter {name} needs to be a number (got '{value}').")
+        values[name] = float(number)
+    return values
+
+
+def fold_parameters(expressions: dict[str, sp.Expr], parameters: dict[str, float]) -> dict[str, sp.Expr]:
+    """Substitutes the values for the parameters in the discrete state equations, and writes each one of them as a
+    constant plus a coefficient for each variable. Every coefficient only depends on the parameters, so it becomes a
+    single number (or, if some parameters have no value, a single fraction of them), instead of the arithmetic the FPGA
+    would do in every step. The values are converted to exact fractions first, so the coefficients are exact.
+
+    Args:
+        expressions (dict[str, sp.Expr]): Dictionary that relates each component to its discrete state equation.
+        parameters (dict[str, float]): The values for the parameters.
+
+    Returns:
+        dict[str, sp.Expr]: The same dictionary, with the folded equations.
+    """
+    symbols = set().union(*(expression.free_symbols for expression in expressions.values()))
+    variables = sorted((symbol for symbol in symbols if "_{n" in symbol.name), key=str)
+    literals = sorted(symbol.name for symbol in symbols if "_{n" not in symbol.name)
+    unknown = sorted(set(parameters) - set(literals))
+    if unknown:
+        error_message(
+            f"The symbols {', '.join(unknown)} aren't literal component values. Valid parameters are: "
+            f"{', '.join(literals) or 'none'}."
+        )
+
+    values = {
+        symbol: sp.nsimplify(parameters[symbol.name], rational=True) for symbol in symbols if symbol.name in parameters
+    }
+    zeros = dict.fromkeys(variables, 0)
+    folded = {}
+    for component, expression in expressions.items():
+        expression = expression.subs(values)
+        terms = [sp.cancel(expression.subs(zeros))]
+        terms += [sp.cancel(expression.diff(variable)) * variable for variable in variables]
+        folded[component] = sp.Add(*terms)
+    return folded
@@ -0,0 +1,150 @@
+"""Writes a C simulation testbench for the code generated by rtds-vitis, with golden vectors found by simulating the
+same discrete state equations in Python (with floats), so checking a new circuit in Vitis HLS needs no manual work."""
+
+import sys
+from os.path import basename, splitext
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from rtds_circuit_analysis.utils import error_message
+from rtds_vitis.fixed_point import input_values, simulate_fixed_point
+from rtds_vitis.vitis_code import define_function, get_cpp_headers, get_inputs_and_states, indent1
+
+if TYPE_CHECKING:
+    from argparse import Namespace
+
+    from rtds_circuit_analysis import Circuit
+
+# Number of mismatches printed by the testbench, before it only counts them
+MAX_PRINTED_MISMATCHES = 10
+
+
+def testbench_step(name: str, golden: str, inputs: list[str], states: list[str]) -> str:
+    """Writes the code for a single step of the testbench: reads a line of the golden vectors, toggles ``sinc`` and
+    calls the top function, then compares each state with its expected value.
+
+    Args:
+        name (str): The name for the top function.
+        golden (str): The name for the file with the golden vectors.
+        inputs (list[str]): The inputs, in the same order as in the file.
+        states (list[str]): The state variables, in the same order as in the file.
+
+    Returns:
+        str: The code for the step (the body of the loop).
+    """
+    expected = [f"{state}_expected" for state in states]
+    columns = inputs + expected
+    code = f"double {', '.join(columns)};\n"
+    code += f'if(fscanf(golden, "{",".join(["%lf"] * len(columns))}", {", ".join(f"&{c}" for c in columns)}) != '
+    code += f"{len(columns)}){{\n"
+    code += indent1(f'printf("Invalid line %d in {golden}\\n", step + 2);\nfclose(golden);\nreturn 1;\n')
+    code += "}\n"
+
+    code += f"\ndata_t {', '.join(states)};\n"
+    code += "sinc = !sinc;\n"
+    arguments = [f"data_t({i})" for i in inputs] + [f"&{state}" for state in states]
+    code += f"{name}(sinc, {', '.join(arguments)});\n"
+
+    for state in states:
+        code += f"\nif(fabs({state}.to_double() - {state}_expected) > TOLERANCE){{\n"
+        message = f'printf("Step %d: {state} = %g, expected %g\\n", step, {state}.to_double(), {state}_expected);\n'
+        code += indent1(f"if(mismatches < {MAX_PRINTED_MISMATCHES}){{\n{indent1(message)}}}\nmismatches++;\n")
+        code += "}\n"
+    return code
+
+
+def testbench_code(args: "Namespace", inputs: list[str], states: list[str], steps: int, tolerance: float) -> str:
+    """Writes the C simulation testbench for the top function.
+
+    Args:
+        args (Namespace): The arguments for rtds-vitis.
+        inputs (list[str]): The inputs, sorted by name.
+        states (list[str]): The state variables, sorted by name.
+        steps (int): Number of calls to the top function.
+        tolerance (float): Biggest absolute difference between a state and its expected value.
+
+    Returns:
+        str: The code for the testbench.
+    """
+    name = splitext(basename(args.filepath))[0]
+    golden = f"{name}_golden.csv"
+
+    code = "#include <cmath>\n#include <cstdio>\n"
+    code += get_cpp_headers(args.fixed, args.point)
+    code += define_function(args.filepath, inputs, states).removesuffix("{\n") + ";\n"
+    code += f"\n#define N_STEPS {steps}\n"
+    code += f"#define TOLERANCE {tolerance:.6g}\n"
+
+    body = f'\nFILE *golden = fopen("{golden}", "r");\n'
+    body += "if(golden == NULL){\n"
+    body += indent1(f'printf("Can\'t open {golden}\\n");\nreturn 1;\n')
+    body += "}\n"
+    body += '// Skips the header\nfscanf(golden, "%*[^\\n]\\n");\n'
+    body += "\nuint1_t sinc = 0;\nint mismatches = 0;\n"
+    body += "for(int step = 0; step < N_STEPS; step++){\n"
+    body += indent1(testbench_step(name, golden, inputs, states))
+    body += "}\n"
+    body += "fclose(golden);\n"
+    body += "\nif(mismatches){\n"
+    body += indent1('printf("FAILED: %d mismatches in %d steps\\n", mismatches, N_STEPS);\nreturn 1;\n')
+    body += "}\n"
+    body += 'printf("PASSED: %d steps\\n", N_STEPS);\nreturn 0;\n'
+
+    return f"{code}\nint main(){{{indent1(body)}}}\n"
+
+
+def write_testbench(circuit: "Circuit", args: "Namespace", parameters: dict[str, float]) -> tuple[Path, Path]:
+    """Writes the testbench (``<name>_tb.cpp``) and the golden vectors (``<name>_golden.csv``, with a column for each
+    input and state variable, and a line for each step) to the directory given with ``--testbench``.
+
+    The golden vectors are found with floats, and the tolerance (if not given with ``--tolerance``) is twice the
+    biggest error found by the fixed point model for the same inputs (see
+    :func:`~rtds_vitis.fixed_point.simulate_fixed_point`), and at least a few times the resolution of ``data_t``.
+
+    Args:
+        circuit (Circuit): The circuit.
+        args (Namespace): The arguments for rtds-vitis.
+        parameters (dict[str, float]): The values for the literal component values.
+
+    Returns:
+        tuple[Path, Path]: The paths for the testbench, and for the golden vectors.
+    """
+    inputs = input_values(args)
+    if any(np.ndim(value) > 1 for value in inputs.values()):
+        error_message("The files for the testbench inputs need a single value on each line.")
+    lengths = [len(value) for value in inputs.values() if np.ndim(value) == 1]
+    steps = args.steps or min(lengths, default=None)
+    if steps is None:
+        error_message("The number of steps for the testbench can't be found from the inputs. Give it with '--steps'.")
+
+    report = simulate_fixed_point(circuit, args, inputs, parameters, steps)
+    resolution = 2.0**-report.data_type.fraction
+    tolerance = args.tolerance or max(2 * max(report.errors.values()), 4 * resolution)
+    input_names, states = get_inputs_and_states(circuit.state_space())
+
+    columns = []
+    for input_name in input_names:
+        values = np.asarray(inputs[input_name], dtype=float)
+        columns.append(np.broadcast_to(values[:steps] if values.ndim else values, steps))
+    columns += [report.reference[state] for state in states]
+    name = splitext(basename(args.filepath))[0]
+    directory = Path(args.testbench)
+    testbench, golden = directory / f"{name}_tb.cpp", directory / f"{name}_golden.csv"
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        header = ",".join(input_names + states)
+        np.savetxt(golden, np.column_stack(columns), fmt="%.17g", delimiter=",", header=header, comments="")
+        testbench.write_text(testbench_code(args, input_names, states, steps, tolerance))
+    except OSError as error:
+        error_message(f"The testbench can't be written to '{directory}' ({error.strerror}).")
+
+    print(f"Testbench written to {testbench}, with the golden vectors in {golden}.", file=sys.stderr)
+    if any(report.wraps.values()):
+        print(
+            "\n\033[33mWARNING: Some values wrap around in the fixed point type, so the testbench will fail. Use more "
+            "bits before the point (-P).\033[0m",
+            file=sys.stderr,
+        )
+    return testbench, golden
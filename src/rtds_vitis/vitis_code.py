@@ -5,10 +5,13 @@ from typing import TYPE_CHECKING
 
 import sympy as sp
 
+from rtds_vitis.parameters import fold_parameters
+
 if TYPE_CHECKING:
     from argparse import Namespace
 
     from rtds_circuit_analysis import Circuit
+    from rtds_circuit_analysis.state_space import StateSpace
 
 
 def indent1(string: str) -> str:
@@ -23,12 +26,16 @@ def indent1(string: str) -> str:
     return indent(string, 4 * " ")
 
 
-def get_equations(circuit: "Circuit", args: "Namespace") -> dict[str, sp.Eq]:
+def get_equations(
+    circuit: "Circuit", args: "Namespace", parameters: dict[str, float] | None = None
+) -> dict[str, sp.Eq]:
     """Get the equations for the circuit, accordingly to the chosen method
 
     Args:
         circuit (Circuit): The circuit object.
         args (Namespace): The command line arguments
+        parameters (dict[str, float] | None, optional): Values for the literal component values, which are folded into
+          the equations (see :func:`~rtds_vitis.parameters.fold_parameters`). Defaults to None.
 
     Returns:
         dict[str, sp.Eq]: The dict that relates each component to its sympy equation.
@@ -41,6 +48,10 @@ def get_equations(circuit: "Circuit", args: "Namespace") -> dict[str, sp.Eq]:
     else:
         expressions = circuit.trapezoidal
 
+    # Substitutes the values known when the code is generated, so only the constants are left
+    if parameters:
+        expressions = fold_parameters(expressions, parameters)
+
     # Generate the equations
     equations = expressions.copy()
     for component, expression in expressions.items():
@@ -60,27 +71,22 @@ def get_equations(circuit: "Circuit", args: "Namespace") -> dict[str, sp.Eq]:
     return equations
 
 
-def get_parameters(equations: dict[str, sp.Eq]) -> list[str]:
+def get_parameters(state_space: "StateSpace") -> list[str]:
     """The parameter for the circuit, that is, the values for the resistors, capacitors and inductors that are literal,
     instead of numeric.
 
     Args:
-        equations (dict[str, sp.Eq]): Dict that relates each component to its equation.
+        state_space (StateSpace): The state-space form for the circuit.
 
     Returns:
         list[str]: List of parameters, where the values for resistors comes first, then inductors, and finally
-        capacitors.
+        capacitors (and any other name last).
     """
-    # Get list of parameters from the equations (resistor, capacitor and inductors literal values)
-    parameters = set()
-    for equation in equations.values():
-        symbols = equation.free_symbols
-        parameters.update(str(symbol) for symbol in symbols if str(symbol)[0] in ("R", "C", "L"))
-    parameters = list(parameters)
+    parameters = [str(parameter) for parameter in state_space.parameters]
 
     # Sorts the list, r first, then l, then c
     priority_rlc = {"R": 0, "L": 1, "C": 2}
-    parameters.sort(key=lambda symbol: (priority_rlc[symbol[0]], symbol))
+    parameters.sort(key=lambda symbol: (priority_rlc.get(symbol[0], len(priority_rlc)), symbol))
 
     return parameters
 
@@ -123,39 +129,16 @@ def get_cpp_parameters(parameters: list[str]) -> str:
     return output
 
 
-def get_inputs_and_states(equations: dict[str, sp.Eq]) -> tuple[list[str], list[str]]:
+def get_inputs_and_states(state_space: "StateSpace") -> tuple[list[str], list[str]]:
     """Gets the state variables, and the inputs, that will be used in the fpga simulation.
 
     Args:
-        equations (dict[str, sp.Eq]): The state equations for the circuit.
+        state_space (StateSpace): The state-space form for the circuit.
 
     Returns:
-        tuple[list[str], list[str]]: The state variable, and the inputs.
+        tuple[list[str], list[str]]: The inputs, and the state variables, both sorted by name.
     """
-    # Get states
-    states = [f"V{component}" if component[0] == "C" else f"I{component}" for component in equations]
-    states = sorted(states)
-
-    # Get inputs
-    inputs = set()
-    for equation in equations.values():
-        symbols = {str(symbol) for symbol in equation.free_symbols}
-        # Remove parameters and states
-        symbols = {symbol for symbol in symbols if (symbol[0] in ("V", "I")) and (symbol[:2] not in ("VC", "IL"))}
-        inputs.update(symbols)
-
-    # Remove _{n} and _{n-1} from the input names. This will also deduplicate those variables in case the method chosen
-    # is the trapezoidal one (there would be one variable for _{n-1}, and another for _{n}).
-    inputs_no_subscripts = set()
-    for i in inputs:
-        if i[-4:] == "_{n}":
-            i = i[:-4]
-        else:
-            i = i[:-6]
-        inputs_no_subscripts.add(i)
-
-    inputs = sorted(list(inputs_no_subscripts))
-    return inputs, states
+    return sorted(state_space.inputs), sorted(state_space.states)
 
 
 def define_function(filepath: str, inputs: list[str], states: list[str]) -> str:
@@ -179,7 +162,8 @@ def define_function(filepath: str, inputs: list[str], states: list[str]) -> str:
     # Write the inputs as parameters for the function
     parsed_states = ", ".join(f"data_t *{s}" for s in states)
 
-    return f"\nvoid {name}(uint1_t sinc, {parsed_inputs}, {parsed_states})" + "{\n"
+    parameters = ", ".join(part for part in ("uint1_t sinc", parsed_inputs, parsed_states) if part)
+    return f"\nvoid {name}({parameters})" + "{\n"
 
 
 def define_states(states: list[str]) -> str:
@@ -270,13 +254,15 @@ def python_cpp_table(variables: list[str], is_input=False) -> dict[sp.Symbol, sp
     return table
 
 
-def format_equations(equations: list[sp.Eq], states: list[str], inputs: list[str]) -> str:
+def format_equations(equations: list[sp.Eq], states: list[str], inputs: list[str], cse: bool = False) -> str:
     """Format the sympy equations to the cpp file format.
 
     Args:
         equations (list[sp.Eq]): Equations to format.
         states (list[str]): States for the circuit.
         inputs (list[str]): Inputs for the circuit.
+        cse (bool, optional): If the subexpressions shared by the equations are calculated only once, in ``data_t``
+          temporaries declared before the equations. Defaults to False.
 
     Returns:
         str: Formatted equations.
@@ -284,16 +270,44 @@ def format_equations(equations: list[sp.Eq], states: list[str], inputs: list[str
     states_table = python_cpp_table(states)
     inputs_table = python_cpp_table(inputs, is_input=True)
     subs_table = states_table | inputs_table
+    equations = [equation.subs(subs_table) for equation in equations.values()]
 
     code = "\n"
-    for equation in equations.values():
-        equation = equation.subs(subs_table)
+    if cse:
+        temporaries, right_hand_sides = sp.cse([equation.rhs for equation in equations], sp.numbered_symbols("cse"))
+        reciprocals = {}
+        for temporary, expression in temporaries:
+            expression = expression.xreplace(reciprocals)
+            # A reciprocal in data_t would be truncated to an integer (1/x keeps the bits after the point of the 1), so
+            # the temporary stores the divisor instead, and the division stays in the expressions that use it
+            if expression.is_Pow and expression.exp == -1:
+                expression = expression.base
+                reciprocals[temporary] = 1 / temporary
+            code += f"data_t {temporary} = {expression};\n"
+        equations = [sp.Eq(eq.lhs, rhs.xreplace(reciprocals)) for eq, rhs in zip(equations, right_hand_sides)]
+
+    for equation in equations:
         code += f"{equation.lhs} = {equation.rhs};\n"
 
     return code
 
 
-def rt_simulation(equations: list[sp.Eq], states: list[str], inputs: list[str], is_backward: bool) -> str:
+def count_operations(code: str) -> tuple[int, int]:
+    """Counts the multiplications and divisions in the code, which are the operations that cost DSP slices and latency
+    in the FPGA.
+
+    Args:
+        code (str): The code.
+
+    Returns:
+        tuple[int, int]: The number of multiplications, and the number of divisions.
+    """
+    return code.count("*") - 2 * code.count("**"), code.count("/")
+
+
+def rt_simulation(
+    equations: list[sp.Eq], states: list[str], inputs: list[str], is_backward: bool, cse: bool = False
+) -> str:
     """Writes the code that is mostly responsible to simulate the circuit.
 
     Args:
@@ -301,6 +315,8 @@ def rt_simulation(equations: list[sp.Eq], states: list[str], inputs: list[str],
         states (list[str]): States for the circuit.
         inputs (list[str]): Inputs for the circuit.
         is_backward (bool): If the method chosen to convert the state equations to discrete form is the backward one.
+        cse (bool, optional): If the shared subexpressions are calculated only once. See :func:`format_equations`.
+          Defaults to False.
 
     Returns:
         str: The code that simulates the circuit.
@@ -309,7 +325,7 @@ def rt_simulation(equations: list[sp.Eq], states: list[str], inputs: list[str],
 
     code += pass_states_new_old(states)
 
-    code += format_equations(equations, states, inputs)
+    code += format_equations(equations, states, inputs, cse)
 
     if not is_backward:
         code += pass_inputs_new_old(inputs)
@@ -349,18 +365,19 @@ def pass_states_new_out(states: list[str]) -> str:
     return code
 
 
-def main_function(equations: dict[str, sp.Eq], args: "Namespace") -> str:
+def main_function(equations: dict[str, sp.Eq], state_space: "StateSpace", args: "Namespace") -> str:
     """Writes the main function to be used by Vitis HLS
 
     Args:
         equations (dict[str, sp.Eq]): The equations to add to the function
+        state_space (StateSpace): The state-space form for the circuit
         args (Namespace): The arguments given for rtds-vitis
 
     Returns:
         str: The main function
     """
 
-    inputs, states = get_inputs_and_states(equations)
+    inputs, states = get_inputs_and_states(state_space)
 
     # Starts the main function
     def_fun = define_function(args.filepath, inputs, states)
@@ -377,7 +394,7 @@ def main_function(equations: dict[str, sp.Eq], args: "Namespace") -> str:
         code += define_inputs(inputs)
 
     # Writes the code that will actually perform the RT simulation
-    rt_code = rt_simulation(equations, states, inputs, args.backward)
+    rt_code = rt_simulation(equations, states, inputs, args.backward, args.cse)
     code += if_else(rt_code)
 
     # Pass the states as outputs for the FPGA
@@ -392,33 +409,46 @@ def main_function(equations: dict[str, sp.Eq], args: "Namespace") -> str:
     return code
 
 
-def print_vitis_code(circuit: "Circuit", args: "Namespace"):
+def print_vitis_code(circuit: "Circuit", args: "Namespace", parameters: dict[str, float] | None = None):
     """Prints the cpp vitis code, for implementing the circuit in an FPGA.
 
     Args:
         circuit (Circuit): The circuit's class
         args (Namespace): The arguments for the rtds-vitis command line code
+        parameters (dict[str, float] | None, optional): Values for the literal component values, folded into the code
+          when it is generated. The ones without a value become "CHANGEME"s. Defaults to None.
     """
 
     # C headers
     code = get_cpp_headers(args.fixed, args.point)
 
     # Find the equations that generate the circuit, and its parameters
-    equations = get_equations(circuit, args)
-    parameters = get_parameters(equations)
+    equations = get_equations(circuit, args, parameters)
+    state_space = circuit.state_space()
+    literals = [parameter for parameter in get_parameters(state_space) if parameter not in (parameters or {})]
 
-    # Generate CHANGEME data_t entries when some component values are literals
-    if parameters:
-        code += get_cpp_parameters(parameters)
+    # Generate CHANGEME data_t entries when some component values are literals, and have no value
+    if literals:
+        code += get_cpp_parameters(literals)
 
     # Write the main function
-    code += main_function(equations, args)
+    code += main_function(equations, state_space, args)
+
+    if args.cse:
+        inputs, states = get_inputs_and_states(state_space)
+        before = count_operations(format_equations(equations, states, inputs))
+        after = count_operations(format_equations(equations, states, inputs, cse=True))
+        print(
+            f"CSE: {before[0]} multiplications and {before[1]} divisions before, {after[0]} and {after[1]} after",
+            file=sys.stderr,
+        )
 
     # Prints resulting code
     print(code)
-    if parameters:
+    if literals:
         print(
             "\n\033[33mWARNING: Components with literal values found. You'll need to replace all the "
-            "'CHANGEME's in the cpp code with their respective numeric values\033[0m",
+            "'CHANGEME's in the cpp code with their respective numeric values (or give them with '-D NAME=VALUE', so "
+            "they are folded into the equations)\033[0m",
             file=sys.stderr,
         )
@@ -0,0 +1,56 @@
+import io
+import json
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from rtds_circuit_analysis import Circuit
+from rtds_circuit_analysis.utils import CircuitError
+from rtds_cli.batch import batch_app, find_netlists, solve_netlist
+
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        (self.directory / "good.cir").write_text("V1 1 0 Vin\nR1 1 2 R1\nC1 2 0 C1\n")
+        (self.directory / "no_ground.cir").write_text("V1 1 2 10\nR1 1 2 5\n")
+
+    def test_error_is_exception(self):
+        with self.assertRaises(CircuitError) as context:
+            Circuit(str(self.directory / "no_ground.cir"))
+        self.assertIn("ground", context.exception.message)
+
+    def test_find_netlists(self):
+        netlists = find_netlists([str(self.directory), str(self.directory / "*.cir"), "missing.cir"])
+        expected = [str(self.directory / "good.cir"), str(self.directory / "no_ground.cir"), "missing.cir"]
+        self.assertEqual(netlists, expected)
+
+    def test_solve_netlist(self):
+        result = solve_netlist(str(self.directory / "good.cir"), "1e-6", None)
+        self.assertEqual(result["status"], "ok")
+        self.assertEqual(set(result["states"]), {"C1"})
+
+        result = solve_netlist(str(self.directory / "no_ground.cir"), None, None)
+        self.assertEqual(result["status"], "error")
+        self.assertNotIn("\033", result["error"])
+
+    def test_json_lines(self):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            exit_code = batch_app([str(self.directory), "missing.cir", "-j", "1", "--no-cache"])
+
+        results = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual([result["status"] for result in results], ["ok", "error", "error"])
+        self.assertEqual(exit_code, 1)
+
+    def test_share_topology(self):
+        (self.directory / "other.cir").write_text("Vs a 0 Vs\nRa a b 10\nCa b 0 1u\n")
+        result = solve_netlist(str(self.directory / "other.cir"), "1e-6", None, share_topology=True)
+        expected = solve_netlist(str(self.directory / "other.cir"), "1e-6", None)
+        self.assertEqual(result["status"], "ok")
+        self.assertEqual(set(result["states"]), {"CA"})
+        self.assertEqual(result["node_voltages"].keys(), expected["node_voltages"].keys())
@@ -0,0 +1,36 @@
+import unittest
+
+import sympy
+
+from rtds_circuit_analysis.block_triangular import linsolve_triangular, match_unknowns, triangular_blocks
+
+x, y, z, w, a, b = sympy.symbols("x y z w a b")
+
+
+class TestBlockTriangular(unittest.TestCase):
+
+    # z is found first, then x and y together (they are coupled), then w
+    equations = [x + y - a * z, x - y - b, z - 3, w - x * a + y]
+    unknowns = [x, y, z, w]
+
+    def test_blocks(self):
+        matching = match_unknowns(self.equations, self.unknowns)
+        self.assertEqual(matching[2], 2)
+        self.assertEqual(matching[3], 3)
+        self.assertEqual(triangular_blocks(self.equations, self.unknowns, matching), [[2], [0, 1], [3]])
+
+    def test_same_as_linsolve(self):
+        # With a redundant equation, which is left out of the blocks
+        equations = self.equations + [2 * x - 2 * y - 2 * b]
+        for system in (self.equations, equations):
+            (solution,) = linsolve_triangular(system, self.unknowns)
+            (expected,) = sympy.linsolve(system, self.unknowns)
+            for value, expected_value in zip(solution, expected):
+                self.assertEqual(sympy.simplify(value - expected_value), 0)
+
+    def test_no_unique_solution(self):
+        # Structurally singular, inconsistent and parametric systems give the same results as sympy.linsolve
+        for equations in ([x + y - a, 2 * x + 2 * y - b], [x - 1, y - 2, x + y - 4], [x + y - a, z - 1, 0 * w]):
+            unknowns = [x, y, z, w][: len(equations) if equations[-1] != 0 else 4]
+            with self.subTest(equations=equations):
+                self.assertEqual(linsolve_triangular(equations, unknowns), sympy.linsolve(equations, unknowns))
@@ -0,0 +1,55 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from rtds_circuit_analysis import Circuit
+from rtds_circuit_analysis.cache import ResultCache, evict
+
+NETLIST = """
+V1 1 0 Vin
+R1 1 2 R1
+L1 2 0 L1
+.STEP 1u
+"""
+
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_hit_skips_solving(self):
+        solved = Circuit(NETLIST, cache_dir=self.directory.name)
+        expected = (solved.currents, solved.states, solved.backward)
+
+        cached = Circuit(NETLIST, cache_dir=self.directory.name)
+        self.assertEqual((cached.currents, cached.states, cached.backward), expected)
+        self.assertNotIn("_solution", vars(cached))
+
+    def test_same_key_for_equivalent_netlists(self):
+        Circuit(NETLIST, cache_dir=self.directory.name).states
+        rewritten = "v1   1 0 Vin\nr1 1 2 R1\nl1 2 0 L1\n.step 1e-6"
+        self.assertNotIn("_solution", vars(Circuit(rewritten, cache_dir=self.directory.name)))
+
+    def test_different_time_step(self):
+        Circuit(NETLIST, cache_dir=self.directory.name).forward
+        circuit = Circuit(NETLIST.replace("1u", "2u"), cache_dir=self.directory.name)
+        self.assertNotIn("forward", vars(circuit))
+
+    def test_corrupted_entry(self):
+        Circuit(NETLIST, cache_dir=self.directory.name).states
+        for path in Path(self.directory.name).glob("*.pickle"):
+            path.write_bytes(b"not a pickle")
+        self.assertNotIn("states", vars(Circuit(NETLIST, cache_dir=self.directory.name)))
+
+    def test_least_recently_used_evicted(self):
+        directory = Path(self.directory.name)
+        for i, key in enumerate(("old", "recent", "new")):
+            ResultCache(directory, key).store("value", bytes(1000))
+            os.utime(directory / f"{key}.pickle", (i, i))
+        ResultCache(directory, "old").load()
+
+        evict(directory, 2500)
+        self.assertEqual(sorted(path.stem for path in directory.glob("*.pickle")), ["new", "old"])
@@ -0,0 +1,192 @@
+import unittest
+
+import numpy as np
+import sympy
+
+from rtds_circuit_analysis import Circuit
+from rtds_circuit_analysis.solve_circuit import find_blocks, find_node_graph
+
+
+class TestLazySolutions(unittest.TestCase):
+
+    def setUp(self):
+        self.circuit = Circuit("tests/test_files/series_rlc.cir")
+
+    def computed(self):
+        return {name for name in vars(self.circuit) if not name.startswith("__")}
+
+    def test_nothing_solved_on_creation(self):
+        self.assertNotIn("_solution", self.computed())
+
+    def test_node_voltages_only(self):
+        self.circuit.node_voltages
+        computed = self.computed()
+        self.assertIn("node_voltages", computed)
+        for name in ("currents", "component_voltages", "states", "forward", "backward", "trapezoidal"):
+            self.assertNotIn(name, computed)
+
+    def test_single_discrete_method(self):
+        self.circuit.backward
+        computed = self.computed()
+        self.assertIn("states", computed)
+        self.assertNotIn("forward", computed)
+        self.assertNotIn("trapezoidal", computed)
+
+    def test_stateless_circuit(self):
+        circuit = Circuit("tests/test_files/voltage_divider.cir")
+        self.assertEqual(circuit.states, {})
+        self.assertIsNone(circuit.forward)
+
+
+class TestStateSpace(unittest.TestCase):
+
+    def test_symbolic_matrices(self):
+        state_space = Circuit("tests/test_files/series_rlc.cir").state_space()
+        R, L, C = sympy.symbols("R L C")
+        self.assertEqual(state_space.states, ["IL1", "VC1"])
+        self.assertEqual(state_space.inputs, ["V"])
+        self.assertEqual(state_space.a, sympy.Matrix([[-R / L, -1 / L], [1 / C, 0]]))
+        self.assertEqual(state_space.b, sympy.Matrix([[1 / L], [0]]))
+        self.assertEqual(state_space.parameters, [C, L, R])
+
+    def test_outputs(self):
+        circuit = Circuit("tests/test_files/series_rlc.cir")
+        state_space = circuit.state_space()
+        states = sympy.Matrix(sympy.symbols(state_space.states))
+        inputs = sympy.Matrix(sympy.symbols(state_space.inputs))
+        outputs = state_space.c * states + state_space.d * inputs + state_space.output_constants
+        for node, output in zip(state_space.outputs, outputs):
+            self.assertEqual(sympy.simplify(output - circuit.node_voltages[node]), 0)
+
+    def test_stateless_circuit(self):
+        state_space = Circuit("tests/test_files/voltage_divider.cir").state_space()
+        self.assertEqual(state_space.states, [])
+        self.assertEqual(state_space.a.shape, (0, 0))
+        self.assertEqual(state_space.d.shape, (2, 1))
+
+
+class TestWorkers(unittest.TestCase):
+
+    RESULTS = ("currents", "component_voltages", "node_voltages", "states", "forward", "backward", "trapezoidal")
+
+    def test_same_results(self):
+        serial = Circuit("tests/test_files/parallel_rlc.cir")
+        parallel = Circuit("tests/test_files/parallel_rlc.cir", workers=2)
+        for result in self.RESULTS:
+            # Same expressions, in the same order
+            self.assertEqual(list(getattr(parallel, result).items()), list(getattr(serial, result).items()), result)
+
+    def test_discrete_methods_found_together(self):
+        circuit = Circuit("tests/test_files/series_rlc.cir", workers=2)
+        circuit.backward
+        self.assertIn("forward", vars(circuit))
+        self.assertIn("trapezoidal", vars(circuit))
+
+    def test_negative_workers(self):
+        with self.assertRaises(SystemExit):
+            Circuit("tests/test_files/series_rlc.cir", workers=-1)
+
+
+class TestEvaluate(unittest.TestCase):
+
+    def setUp(self):
+        self.circuit = Circuit("tests/test_files/series_rlc.cir")
+
+    def symbols(self, solution):
+        values = getattr(self.circuit, solution).values()
+        return sorted({str(symbol) for value in values for symbol in value.free_symbols})
+
+    def test_same_as_subs(self):
+        values = {name: np.linspace(1, 2, 5) + i for i, name in enumerate(self.symbols("currents"))}
+        results = self.circuit.evaluate("currents", **values)
+        for key, expression in self.circuit.currents.items():
+            for i in range(5):
+                point = {symbol: values[str(symbol)][i] for symbol in expression.free_symbols}
+                self.assertAlmostEqual(results[key][i], float(expression.subs(point)))
+
+    def test_broadcast_and_cache(self):
+        # The discrete methods have symbols like "VC1_{n-1}"
+        first, *others = self.symbols("trapezoidal")
+        values = {first: np.ones((3, 1))} | {name: np.ones(4) for name in others}
+        results = self.circuit.evaluate("trapezoidal", **values)
+        self.assertEqual({value.shape for value in results.values()}, {(3, 4)})
+        self.assertEqual(list(self.circuit._compiled), ["trapezoidal"])
+
+    def test_wrong_symbols(self):
+        with self.assertRaises(SystemExit):
+            self.circuit.evaluate(R1=1)
+        with self.assertRaises(SystemExit):
+            self.circuit.evaluate("nothing")
+
+
+class TestWithValues(unittest.TestCase):
+
+    netlist = "V1 1 0 V\nR1 1 2 10\nL1 2 3 1m\nC1 3 0 1u\nR2 3 4 5\nL2 4 0 2m"
+    edited = "V1 1 0 V\nR1 1 2 20\nL1 2 3 1m\nC1 3 0 2.2u\nR2 3 4 5\nL2 4 0 2m"
+
+    def test_same_as_solving_again(self):
+        circuit = Circuit(self.netlist, "1e-6").with_values(R1="20", C1=2.2e-6)
+        reference = Circuit(self.edited, "1e-6")
+        for solution in ("currents", "node_voltages", "states", "backward", "trapezoidal"):
+            expected = getattr(reference, solution)
+            for key, expression in getattr(circuit, solution).items():
+                self.assertEqual(sympy.simplify(expression - expected[key]), 0)
+        self.assertNotIn("_solution", vars(circuit))
+
+    def test_numeric(self):
+        circuit = Circuit(self.netlist, "1e-6", numeric=True)
+        edited = circuit.with_values(R1=20, C1="2.2u")
+        reference = Circuit(self.edited, "1e-6", numeric=True)
+        self.assertTrue(edited.numeric)
+        np.testing.assert_allclose(edited.state_space().a, reference.state_space().a)
+        symbols = sorted(edited.trapezoidal["C1"].free_symbols, key=str)
+        for key, expression in edited.trapezoidal.items():
+            values = [float(expression.coeff(symbol)) for symbol in symbols]
+            np.testing.assert_allclose(values, [float(reference.trapezoidal[key].coeff(symbol)) for symbol in symbols])
+
+    def test_template_shared(self):
+        circuit = Circuit("tests/test_files/series_rlc.cir", "1e-6")
+        # Distinct symbols already make a template
+        self.assertIs(circuit._template.circuit, circuit)
+        edited = circuit.with_values(R1=3).with_values(L1="1m")
+        self.assertIs(edited._template.circuit, circuit)
+        self.assertEqual(edited.states["C1"], circuit.states["C1"])
+        IL1, V, VC1 = sympy.symbols("IL1 V VC1")
+        self.assertEqual(sympy.simplify(edited.states["L1"] - 1000 * (V - 3 * IL1 - VC1)), 0)
+
+    def test_wrong_component(self):
+        with self.assertRaises(SystemExit):
+            Circuit(self.netlist).with_values(R9=1)
+
+    def test_source(self):
+        circuit = Circuit(self.netlist, "1e-6").with_values(V1="Vin*sin(w*t)")
+        reference = Circuit(self.netlist.replace("1 0 V", "1 0 Vin*sin(w*t)"), "1e-6")
+        for key, expression in circuit.backward.items():
+            self.assertEqual(sympy.simplify(expression - reference.backward[key]), 0)
+
+
+class TestBlocks(unittest.TestCase):
+
+    # Two loops joined only at node 2, and a resistor hanging from node 3
+    netlist = "V1 1 0 V\nR1 1 2 10\nC1 2 0 1u\nR2 2 3 5\nL1 3 4 1m\nR3 4 2 2\nR4 3 5 1"
+
+    def test_find_blocks(self):
+        components = Circuit(self.netlist).components
+        blocks = find_blocks(components, find_node_graph(components))
+        self.assertEqual(blocks, [([0, 1, 2], "0"), ([3, 4, 5], "2"), ([6], "3")])
+
+    def test_same_as_whole_system(self):
+        IL1, V, VC1 = sympy.symbols("IL1 V VC1")
+        for solver in ("kirchhoff", "mna"):
+            circuit = Circuit(self.netlist, solver=solver)
+            self.assertEqual(circuit.currents["R4"], 0)
+            self.assertEqual(circuit.currents["R2"], IL1)
+            self.assertEqual(circuit.node_voltages["5"], circuit.node_voltages["3"])
+            self.assertEqual(sympy.simplify(circuit.node_voltages["3"] - (VC1 - 5 * IL1)), 0)
+            self.assertEqual(sympy.simplify(circuit.states["C1"] - 100000 * (V - VC1)), 0)
+
+    def test_workers(self):
+        serial = Circuit(self.netlist, solver="mna")
+        parallel = Circuit(self.netlist, solver="mna", workers=2)
+        self.assertEqual(parallel.states, serial.states)
+        self.assertEqual(parallel.node_voltages, serial.node_voltages)
@@ -0,0 +1,37 @@
+import unittest
+
+import sympy as sp
+
+from rtds_circuit_analysis import Circuit
+from rtds_circuit_analysis.diference_equations import (
+    DISCRETE_METHODS,
+    convert_explicit,
+    convert_matrix,
+    to_state_variables,
+)
+
+FILES = ("parallel_rlc", "series_inductor_parallel_capacitor")
+
+
+class TestMatrixForm(unittest.TestCase):
+
+    def assert_same_as_solve(self, file_name, time_step):
+        states = to_state_variables(Circuit(f"tests/test_files/{file_name}.cir", numeric=False).states)
+        to_solve_for = [sp.Symbol(variable + "_{n}") for variable in states]
+        for method, discrete_method in DISCRETE_METHODS.items():
+            with self.subTest(file=file_name, method=method, time_step=time_step):
+                expected = convert_explicit(discrete_method, states, to_solve_for, time_step)
+                # Same expressions, in the same order
+                self.assertEqual(list(convert_matrix(method, states, time_step).items()), list(expected.items()))
+
+    def test_symbolic_time_step(self):
+        for file_name in FILES:
+            self.assert_same_as_solve(file_name, None)
+
+    def test_numeric_time_step(self):
+        for file_name in FILES:
+            self.assert_same_as_solve(file_name, sp.Rational(1, 1000000))
+
+    def test_inexact_values(self):
+        states = {"VC1": -sp.Float(0.5) * sp.Symbol("VC1") + sp.Symbol("Vin")}
+        self.assertIsNone(convert_matrix("backward", states, None))
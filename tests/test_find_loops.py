@@ -0,0 +1,63 @@
+import unittest
+
+import sympy as sp
+
+from rtds_circuit_analysis import equivalent_circuit
+from rtds_circuit_analysis.parse_netlist import get_lines, parse_components
+from rtds_circuit_analysis.solve_circuit import (
+    find_current_equations,
+    find_incidence_matrix,
+    find_loop_equations,
+    find_loops,
+    find_node_graph,
+    find_unknowns,
+)
+
+
+def grid_netlist(rows: int, columns: int) -> list[str]:
+    lines = ["V1 N0_0 0 V1"]
+    for row in range(rows):
+        for column in range(columns):
+            if column + 1 < columns:
+                lines.append(f"RH{row}_{column} N{row}_{column} N{row}_{column + 1} RH{row}_{column}")
+            if row + 1 < rows:
+                lines.append(f"RV{row}_{column} N{row}_{column} N{row + 1}_{column} RV{row}_{column}")
+    lines.append(f"RG N{rows - 1}_{columns - 1} 0 RG")
+    return lines
+
+
+class TestFundamentalLoops(unittest.TestCase):
+
+    def assert_closed_loops(self, loops):
+        for loop in loops:
+            # Every component shares a node with the next one, and the last one closes the loop with the first one
+            for component, next_component in zip(loop, loop[1:] + loop[:1]):
+                self.assertTrue(set(component.nodes) & set(next_component.nodes), msg=f"Open loop: {loop}")
+
+    def test_number_of_loops(self):
+        components, _ = parse_components(grid_netlist(4, 5), None)
+        nodes = {node for component in components for node in component.nodes}
+        loops = find_loops(components, "fundamental")
+        self.assertEqual(len(loops), len(components) - len(nodes) + 1)
+        self.assert_closed_loops(loops)
+
+    def test_parallel_components(self):
+        components, _ = parse_components(["V1 1 0 V1", "R1 1 0 R1", "R2 0 1 R2", "R3 1 2 R3", "R4 2 0 R4"], None)
+        loops = find_loops(components, "fundamental")
+        self.assertEqual(len(loops), 3)
+        self.assert_closed_loops(loops)
+
+    def test_same_solutions_as_minimum_loops(self):
+        for file_name in ("state_equations_3", "series_inductor_parallel_capacitor_more_inverted_4"):
+            components, _ = parse_components(get_lines(f"tests/test_files/{file_name}.cir"), None)
+            circuit = equivalent_circuit.condense_circuit(components)
+            current_equations = find_current_equations(circuit, find_incidence_matrix(find_node_graph(circuit)))
+            unknowns = find_unknowns(circuit)
+
+            solutions = []
+            for strategy in ("minimum", "fundamental"):
+                loop_equations = find_loop_equations(find_loops(circuit, strategy))
+                solutions.append(list(sp.linsolve(loop_equations + current_equations, *unknowns))[0])
+
+            for minimum, fundamental in zip(*solutions):
+                self.assertEqual(sp.simplify(minimum - fundamental), 0)
@@ -0,0 +1,96 @@
+import argparse
+import unittest
+
+import numpy as np
+
+from rtds_circuit_analysis import Circuit
+from rtds_circuit_analysis.utils import CircuitError
+from rtds_vitis.fixed_point import CodeCompiler, FixedType, divide, simulate_fixed_point, to_fixed, wrap
+
+
+def vitis_args(fixed: int, point: int, method: str = "trapezoidal", cse: bool = False, matrix: bool = False):
+    methods = {name: name == method for name in ("forward", "backward", "trapezoidal")}
+    return argparse.Namespace(filepath="rlc.cir", fixed=str(fixed), point=str(point), cse=cse, matrix=matrix, **methods)
+
+
+class TestArithmetic(unittest.TestCase):
+
+    def test_divide_truncates_towards_zero(self):
+        for dividend, divisor in ((7, 2), (-7, 2), (7, -2), (-7, -2), (-1, 2), (6, 3)):
+            self.assertEqual(divide(dividend, divisor), int(dividend / divisor))
+        np.testing.assert_array_equal(divide(np.array([-7, 7]), 2), [-3, 3])
+
+    def test_wrap(self):
+        self.assertEqual(wrap(127, 8), 127)
+        self.assertEqual(wrap(128, 8), -128)
+        self.assertEqual(wrap(-129, 8), 127)
+
+    def test_to_fixed(self):
+        values, wraps = to_fixed([1.5, -0.001, 200], FixedType(16, 8))
+        self.assertEqual(list(values), [384, -1, wrap(200 * 256, 16)])
+        self.assertEqual(wraps, 1)
+
+    def test_compiled_statement(self):
+        data_type = FixedType(16, 8)
+        compiler = CodeCompiler(data_type, {"a", "b"})
+        update = compiler.compile(["x_new = 3*a/7 + 0.5*b;"])
+        variables = {"a": 384, "b": -320}
+        update(variables, divide, lambda name, value, shift: wrap(value >> shift, data_type.width))
+        # 3*1.5/7 is truncated to 164/256, and 0.5*(-1.25) is exact
+        self.assertEqual(variables["x_new"], 164 - 160)
+
+
+class TestFixedPointModel(unittest.TestCase):
+
+    def setUp(self):
+        self.circuit = Circuit("V1 1 0 V\nR1 1 2 10\nL1 2 3 1m\nC1 3 0 1u", "1e-6")
+        self.inputs = {"V": np.ones(2000)}
+
+    def test_close_to_reference(self):
+        for method in ("forward", "backward", "trapezoidal"):
+            with self.subTest(method=method):
+                report = simulate_fixed_point(self.circuit, vitis_args(48, 16, method), self.inputs)
+                self.assertLess(max(report.errors.values()), 1e-3)
+                self.assertFalse(any(report.wraps.values()))
+
+    def test_more_bits_less_error(self):
+        coarse = simulate_fixed_point(self.circuit, vitis_args(24, 8), self.inputs)
+        fine = simulate_fixed_point(self.circuit, vitis_args(40, 8), self.inputs)
+        self.assertLess(fine.errors["VC1"], coarse.errors["VC1"])
+
+    def test_wraps(self):
+        report = simulate_fixed_point(self.circuit, vitis_args(16, 4), {"V": np.full(2000, 10)})
+        self.assertEqual(report.wraps["V"], 2000)
+        self.assertGreater(report.wraps["VC1"], 0)
+        self.assertIn("VC1", report.summary())
+
+    def test_parameters(self):
+        circuit = Circuit("tests/test_files/series_rlc.cir", "1e-6")
+        parameters = {"R": 10, "L": 1e-3, "C": 1e-6}
+        report = simulate_fixed_point(circuit, vitis_args(32, 16, "backward"), self.inputs, parameters)
+        # C = 1u would be 0 in data_t, but it is folded into the coefficients when the code is generated, like the
+        # numeric values in the netlist
+        numeric = simulate_fixed_point(self.circuit, vitis_args(32, 16, "backward"), self.inputs)
+        np.testing.assert_array_equal(report.states["VC1"], numeric.states["VC1"])
+        with self.assertRaises(CircuitError):
+            simulate_fixed_point(circuit, vitis_args(32, 16, "backward"), self.inputs, {"R": 10})
+
+    def test_matrix_form(self):
+        report = simulate_fixed_point(self.circuit, vitis_args(48, 16, matrix=True), self.inputs)
+        self.assertLess(max(report.errors.values()), 1e-3)
+        scalar = simulate_fixed_point(self.circuit, vitis_args(32, 16), self.inputs)
+        matrix = simulate_fixed_point(self.circuit, vitis_args(32, 16, matrix=True), self.inputs)
+        # The coefficients are truncated in the constant arrays, unlike the exact fractions in the scalar code
+        self.assertFalse(np.array_equal(scalar.states["VC1"], matrix.states["VC1"]))
+
+    def test_many_simulations(self):
+        inputs = np.random.default_rng(0).uniform(-1, 1, (500, 3))
+        batch = simulate_fixed_point(self.circuit, vitis_args(32, 16), {"V": inputs})
+        single = simulate_fixed_point(self.circuit, vitis_args(32, 16), {"V": inputs[:, 1]})
+        self.assertEqual(batch.states["IL1"].shape, (500, 3))
+        np.testing.assert_array_equal(batch.states["IL1"][:, 1], single.states["IL1"])
+        np.testing.assert_allclose(batch.reference["VC1"][:, 1], single.reference["VC1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
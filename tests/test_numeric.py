@@ -0,0 +1,66 @@
+import unittest
+
+import numpy as np
+import sympy as sp
+
+from rtds_circuit_analysis import Circuit
+
+NETLIST = """
+V1 1 0 10
+R1 1 2 1k
+L1 2 3 10m
+C1 3 0 1u
+C2 3 4 2u
+R2 4 0 500
+I1 4 0 Iin
+"""
+
+RESULTS = ("currents", "component_voltages", "node_voltages", "states", "forward", "backward", "trapezoidal")
+
+
+class TestNumericEngine(unittest.TestCase):
+
+    def assert_same_values(self, numeric, exact, values):
+        self.assertEqual(numeric.keys(), exact.keys())
+        for key in numeric:
+            numeric_value = complex(sp.sympify(numeric[key]).subs(values))
+            exact_value = complex(sp.sympify(exact[key]).subs(values))
+            self.assertAlmostEqual(numeric_value, exact_value, delta=1e-9 * max(1, abs(exact_value)), msg=key)
+
+    def test_auto_detection(self):
+        self.assertTrue(Circuit("tests/test_files/multiple_voltage_sources.cir").numeric)
+        self.assertFalse(Circuit("tests/test_files/series_rlc.cir").numeric)
+        self.assertFalse(Circuit(NETLIST).numeric)
+
+    def test_symbolic_passive_component(self):
+        with self.assertRaises(SystemExit):
+            Circuit("tests/test_files/series_rlc.cir", numeric=True)
+
+    def test_same_results_as_symbolic(self):
+        numeric = Circuit(NETLIST, "1e-6", numeric=True)
+        exact = Circuit(NETLIST, "1e-6", numeric=False)
+        values = {symbol: 0.1 * i for i, symbol in enumerate(sp.symbols("IL1 VC1 VC2 Iin"), 1)}
+        values.update({sp.Symbol(f"{name}_{{n-1}}"): value for name, value in zip(("IL1", "VC1", "VC2"), (1, -2, 3))})
+        values.update({sp.Symbol("Iin_{n-1}"): 0.5, sp.Symbol("Iin_{n}"): -0.25})
+
+        for result in RESULTS:
+            self.assert_same_values(getattr(numeric, result), getattr(exact, result), values)
+
+    def test_float_results(self):
+        circuit = Circuit("tests/test_files/multiple_voltage_sources.cir")
+        for value in circuit.currents.values():
+            self.assertIsInstance(value, sp.Float)
+
+    def test_state_space(self):
+        state_space = Circuit(NETLIST, numeric=True).state_space()
+        self.assertEqual(state_space.states, ["IL1", "VC1", "VC2"])
+        self.assertEqual(state_space.inputs, ["Iin"])
+        np.testing.assert_allclose(state_space.a, [[-1e5, -1e2, 0], [1e6, -2e3, 2e3], [0, 1e3, -1e3]])
+        np.testing.assert_allclose(state_space.b, [[0], [1e6], [-5e5]])
+        np.testing.assert_allclose(state_space.state_constants, [1e3, 0, 0])
+        self.assertEqual(state_space.c.shape, (len(state_space.outputs), 3))
+
+    def test_stateless_circuit(self):
+        circuit = Circuit("tests/test_files/multiple_voltage_sources.cir", "1e-6")
+        self.assertEqual(circuit.states, {})
+        self.assertIsNone(circuit.trapezoidal)
@@ -1,8 +1,11 @@
+import io
+import tempfile
 import unittest
 
 import sympy
 
-from rtds_circuit_analysis.parse_netlist import parse_value
+from rtds_circuit_analysis.parse_netlist import NODE_NAMES, NetlistParser, parse_components, parse_value
+from rtds_circuit_analysis.utils import NetlistError
 
 
 class TestValues(unittest.TestCase):
@@ -155,3 +158,71 @@ class TestValues(unittest.TestCase):
         for n, correct_n in zip(expressions, correct_expressions):
             parsed_n = parse_value(n)
             self.assertEqual(parsed_n, correct_n)
+
+
+class TestComponents(unittest.TestCase):
+
+    def test_node_ids(self):
+        components, _ = parse_components(["V1 in 0 V", "R1 IN out 10", "C1 0 Out 1u"], None)
+        ids = [component.node_ids for component in components]
+        self.assertEqual(ids[0][0], ids[1][0])
+        self.assertEqual(ids[1][1], ids[2][1])
+        self.assertEqual((ids[0][1], ids[2][0]), (0, 0))
+        self.assertEqual([NODE_NAMES[node] for node in ids[1]], ["IN", "OUT"])
+        # The names are shared between the components, instead of one string for each of them
+        self.assertIs(components[0].nodes[0], components[1].nodes[0])
+
+    def test_slots(self):
+        components, _ = parse_components(["R1 1 0 10"], None)
+        self.assertFalse(hasattr(components[0], "__dict__"))
+
+
+class TestNetlistParser(unittest.TestCase):
+
+    netlist = "* A comment\n\nV1 1 0 V\nR1 1 2 1k\n.STEP 1u\nC1 2 0 1u\n"
+
+    def test_stream(self):
+        parser = NetlistParser(io.StringIO(self.netlist))
+        components = iter(parser)
+        self.assertEqual(next(components).name, "V1")
+        self.assertIsNone(parser.time_step)
+        self.assertEqual([component.name for component in components], ["R1", "C1"])
+        self.assertEqual(parser.time_step, sympy.Rational(1, 10**6))
+
+    def test_file(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".cir") as file:
+            file.write(self.netlist)
+            file.flush()
+            components, time_step = parse_components(file.name, "1e-3")
+        self.assertEqual(len(components), 3)
+        self.assertEqual(time_step, sympy.Rational(1, 10**6))
+
+    def test_line_numbers(self):
+        errors = {
+            "R2 2 0": "Expected 4 words",
+            "R2 2 0 @": "Invalid value",
+            "Q2 2 0 1": "Unknown type 'Q'",
+            "X2 2 0 1": "Unknown subcircuit '1'",
+        }
+        for line, reason in errors.items():
+            with self.subTest(line=line):
+                with self.assertRaises(NetlistError) as context:
+                    parse_components((self.netlist + line).split("\n"), None)
+                self.assertEqual(context.exception.line_number, 7)
+                self.assertEqual(context.exception.line, line)
+                self.assertIn(reason, context.exception.reason)
+                self.assertIn("line 7", context.exception.message)
+
+    def test_lazy_unknowns(self):
+        components, _ = parse_components(["V1 1 0 V", "R1 1 0 10"], None)
+        self.assertEqual(components[0].voltage, sympy.Symbol("V"))
+        self.assertEqual(components[1].current, sympy.Symbol("_IR1"))
+        self.assertIsNone(components[1].voltage)
+        components[1].voltage = 0
+        self.assertEqual(components[1].voltage, 0)
+
+    def test_memoized_values(self):
+        parse_value("47u")
+        hits = parse_value.cache_info().hits
+        self.assertEqual(parse_value("47u"), sympy.Rational(47, 10**6))
+        self.assertEqual(parse_value.cache_info().hits, hits + 1)
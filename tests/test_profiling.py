@@ -0,0 +1,41 @@
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from rtds_circuit_analysis import Circuit
+from rtds_circuit_analysis.profiling import Profiler, stage
+
+
+class TestProfiler(unittest.TestCase):
+
+    def test_circuit_stages(self):
+        circuit = Circuit("tests/test_files/series_rlc.cir", "1e-6", profiler=Profiler())
+        circuit.backward
+        timings = circuit.timings
+        for name in ("parse_components", "condense_circuit", "find_loops", "linsolve", "discretize_backward"):
+            self.assertIn(name, timings)
+        self.assertNotIn("discretize_forward", timings)
+        self.assertEqual(timings["linsolve"].calls, 1)
+        self.assertGreater(timings["discretize_backward"].operations, 0)
+        self.assertIn("simplify_results", circuit.profiler.report())
+
+    def test_no_profiler(self):
+        circuit = Circuit("tests/test_files/series_rlc.cir")
+        circuit.states
+        self.assertEqual(circuit.timings, {})
+
+    def test_nested_stages(self):
+        profiler = Profiler()
+        with profiler.activate():
+            with stage("outer"):
+                with stage("inner"):
+                    time.sleep(0.05)
+        self.assertLess(profiler.stages["outer"].seconds, 0.04)
+        self.assertGreaterEqual(profiler.stages["inner"].seconds, 0.05)
+
+    def test_cprofile_dump(self):
+        with tempfile.TemporaryDirectory() as directory:
+            profiler = Profiler(["linsolve"], directory)
+            Circuit("tests/test_files/series_rlc.cir", profiler=profiler).currents
+            self.assertTrue((Path(directory) / "linsolve.prof").exists())
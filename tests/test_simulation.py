@@ -0,0 +1,86 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+import sympy as sp
+
+from rtds_circuit_analysis import Circuit
+from rtds_circuit_analysis.utils import CircuitError
+
+PARAMETERS = {"R": 10, "L": 1e-3, "C": 1e-6}
+
+
+def reference(equations: dict[str, sp.Expr], inputs: np.ndarray, initial: dict[str, float]) -> dict[str, list]:
+    """Runs the discrete state equations one step at a time, through subs."""
+    values = {sp.Symbol(name): value for name, value in PARAMETERS.items()}
+    states = dict(initial)
+    trajectory = {name: [value] for name, value in states.items()}
+    for n in range(1, len(inputs)):
+        step = {sp.Symbol(f"{name}_{{n-1}}"): value for name, value in states.items()}
+        step.update(values)
+        step.update({sp.Symbol("V_{n-1}"): inputs[n - 1], sp.Symbol("V_{n}"): inputs[n]})
+        states = {"IL1": float(equations["L1"].subs(step)), "VC1": float(equations["C1"].subs(step))}
+        for name, value in states.items():
+            trajectory[name].append(value)
+    return trajectory
+
+
+class TestSimulate(unittest.TestCase):
+
+    def setUp(self):
+        self.circuit = Circuit("tests/test_files/series_rlc.cir", "1e-6")
+        self.inputs = np.sin(np.arange(20) * 0.3)
+
+    def test_same_as_subs(self):
+        initial = {"IL1": 0.0, "VC1": 0.5}
+        for method in ("forward", "backward", "trapezoidal"):
+            with self.subTest(method=method):
+                result = self.circuit.simulate({"V": self.inputs}, method, initial, chunk_size=7, **PARAMETERS)
+                expected = reference(getattr(self.circuit, method), self.inputs, initial)
+                for name, values in expected.items():
+                    np.testing.assert_allclose(result.states[name], values, atol=1e-12)
+
+    def test_step_by_step_fallback(self):
+        modal = self.circuit.simulate({"V": self.inputs}, "trapezoidal", **PARAMETERS)
+        with mock.patch("rtds_circuit_analysis.simulation.MAX_CONDITION", 0):
+            stepped = self.circuit.simulate({"V": self.inputs}, "trapezoidal", **PARAMETERS)
+        np.testing.assert_allclose(modal.states["VC1"], stepped.states["VC1"], atol=1e-12)
+
+    def test_outputs(self):
+        result = self.circuit.simulate({"V": 2}, steps=50, **PARAMETERS)
+        states = result.states
+        np.testing.assert_allclose(result.node_voltages["1"], 2)
+        np.testing.assert_allclose(result.node_voltages["3"], states["VC1"])
+        np.testing.assert_allclose(result.node_voltages["2"], 2 - 10 * states["IL1"])
+        np.testing.assert_allclose(result.currents["R1"], states["IL1"])
+        self.assertEqual(len(states["VC1"]), 50)
+
+    def test_time_step_parameter(self):
+        circuit = Circuit("tests/test_files/series_rlc.cir")
+        result = circuit.simulate({"V": self.inputs}, Ts=1e-6, **PARAMETERS)
+        expected = self.circuit.simulate({"V": self.inputs}, **PARAMETERS)
+        np.testing.assert_allclose(result.states["IL1"], expected.states["IL1"])
+
+    def test_numeric_circuit(self):
+        circuit = Circuit("V1 1 0 V\nR1 1 2 10\nL1 2 3 1m\nC1 3 0 1u", "1e-6")
+        result = circuit.simulate({"V": self.inputs}, "trapezoidal")
+        expected = self.circuit.simulate({"V": self.inputs}, "trapezoidal", **PARAMETERS)
+        np.testing.assert_allclose(result.states["VC1"], expected.states["VC1"], atol=1e-12)
+
+    def test_wrong_arguments(self):
+        with self.assertRaises(CircuitError):
+            self.circuit.simulate({"V": self.inputs}, R=10, L=1e-3)
+        with self.assertRaises(CircuitError):
+            self.circuit.simulate({"V": self.inputs}, X=1, **PARAMETERS)
+        with self.assertRaises(CircuitError):
+            self.circuit.simulate({}, **PARAMETERS)
+        with self.assertRaises(CircuitError):
+            self.circuit.simulate({"V": 1}, **PARAMETERS)
+        with self.assertRaises(CircuitError):
+            self.circuit.simulate({"V": self.inputs}, initial={"VC2": 1}, **PARAMETERS)
+        with self.assertRaises(CircuitError):
+            Circuit("tests/test_files/voltage_divider.cir").simulate({"V": self.inputs})
+
+
+if __name__ == "__main__":
+    unittest.main()
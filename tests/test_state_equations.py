@@ -432,6 +432,12 @@ class TestResistiveCircuits(_AssertResults):
         self._assert_all_results_equal(inspect.currentframe().f_code.co_name, correct_values)
 
 
+class TestResistiveCircuitsMna(TestResistiveCircuits):
+    """Same tests for purely resistive circuits, solved through the Modified Nodal Analysis"""
+
+    solver = "mna"
+
+
 class TestStateEquations(_AssertResults):
     """Tests for circuits with energy storage elements"""
 
@@ -867,3 +873,9 @@ class TestStateEquations(_AssertResults):
     #         "VIN": IL1A + IL3A,
     #     }
     #     self._assert_all_results_equal(inspect.currentframe().f_code.co_name, correct_values)
+
+
+class TestStateEquationsMna(TestStateEquations):
+    """Same tests for circuits with energy storing elements, solved through the Modified Nodal Analysis"""
+
+    solver = "mna"
@@ -18,12 +18,16 @@ class _CorrectValues:
 class _AssertResults(unittest.TestCase):
     """Functions for asserting that the results of the main program are correct"""
 
+    solver = "kirchhoff"
+    # The expected values are exact, so numeric netlists are still solved symbolically
+    numeric = False
+
     def _assert_all_results_equal(self, function_name, correct_values):
         """Asserts that all the results for a given circuit are correct"""
         file_name = f"tests/test_files/{function_name[5:]}.cir"
 
         try:
-            calculated_values = Circuit(file_name)
+            calculated_values = Circuit(file_name, solver=self.solver, numeric=self.numeric)
         except FileNotFoundError:
             self.fail(f"Could not access file: {file_name}")
 
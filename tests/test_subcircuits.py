@@ -0,0 +1,64 @@
+import unittest
+
+import sympy
+
+from rtds_circuit_analysis import Circuit
+from rtds_circuit_analysis.parse_netlist import parse_components
+from rtds_circuit_analysis.subcircuits import reduce_resistors
+from rtds_circuit_analysis.utils import NetlistError
+
+DIVIDER = ".SUBCKT DIV IN OUT\nR1 IN MID Ra\nR2 MID OUT Ra\nR3 MID 0 Rb\n.ENDS DIV\n"
+FLAT_DIVIDERS = "V1 1 0 V\nR1 1 m1 Ra\nR2 m1 2 Ra\nR3 m1 0 Rb\nR4 2 m2 Ra\nR5 m2 3 Ra\nR6 m2 0 Rb\nR9 3 0 Rl"
+
+
+class TestReduction(unittest.TestCase):
+
+    def test_same_as_flat(self):
+        circuit = Circuit(DIVIDER + "V1 1 0 V\nX1 1 2 DIV\nX2 2 3 DIV\nR9 3 0 Rl")
+        flat = Circuit(FLAT_DIVIDERS)
+        # Only the ports are left
+        self.assertEqual(set(circuit.node_voltages), {"1", "2", "3"})
+        for node, voltage in circuit.node_voltages.items():
+            self.assertEqual(sympy.simplify(voltage - flat.node_voltages[node]), 0, node)
+
+    def test_series_resistors(self):
+        components, _ = parse_components([".SUBCKT S A B", "R1 A C 1k", "R2 C B 2k", ".ENDS", "X1 1 0 S"], None)
+        self.assertEqual([(c.name, c.nodes, c.value) for c in components], [("R_A_B_X1", ("1", "0"), 3000)])
+
+    def test_reduced_once(self):
+        Circuit(DIVIDER + "X1 1 0 DIV")
+        misses = reduce_resistors.cache_info().misses
+        Circuit(DIVIDER + "V1 1 0 V\nX1 1 2 DIV\nX2 2 3 DIV\nX3 3 0 DIV")
+        self.assertEqual(reduce_resistors.cache_info().misses, misses)
+
+
+class TestExpansion(unittest.TestCase):
+
+    def test_storage_components(self):
+        netlist = "V1 1 0 V\nXA 1 0 RLC\n.SUBCKT RLC A B\nR1 A N 10\nL1 N M 1m\nC1 M B 1u\n.ENDS"
+        circuit = Circuit(netlist, "1e-6")
+        flat = Circuit("V1 1 0 V\nR1_XA 1 XA_N 10\nL1_XA XA_N XA_M 1m\nC1_XA XA_M 0 1u", "1e-6")
+        self.assertEqual(circuit.states, flat.states)
+        self.assertEqual(circuit.node_voltages, flat.node_voltages)
+
+    def test_nested(self):
+        netlist = ".SUBCKT TANK P\nL1 P 0 L\nXR P 0 DIV\n.ENDS\nV1 1 0 V\nX1 1 TANK\nX2 1 TANK\n" + DIVIDER
+        components, _ = parse_components(netlist.split("\n"), None)
+        names = [component.name for component in components]
+        self.assertEqual(names[:3], ["V1", "L1_X1", "R_IN_OUT_XR_X1"])
+        self.assertIn("L1_X2", names)
+
+    def test_errors(self):
+        errors = {
+            "X1 1 0 NONE": "Unknown subcircuit 'NONE'",
+            "X1 1 2 0 DIV": "has 2 ports, got 3 nodes",
+            ".SUBCKT LOOP A\nX9 A LOOP\n.ENDS\nX1 1 LOOP": "used inside its own definition",
+            ".SUBCKT OPEN A\nR1 A 0 1": "has no .ENDS line",
+            ".ENDS": "without a .SUBCKT line",
+        }
+        for lines, reason in errors.items():
+            with self.subTest(lines=lines):
+                with self.assertRaises(NetlistError) as context:
+                    parse_components((DIVIDER + lines).split("\n"), None)
+                self.assertIn(reason, context.exception.reason)
+                self.assertGreater(context.exception.line_number, 5)
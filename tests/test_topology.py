@@ -0,0 +1,92 @@
+import tempfile
+import unittest
+
+import sympy
+
+from rtds_circuit_analysis import Circuit, topology
+from rtds_circuit_analysis.parse_netlist import Component
+from rtds_circuit_analysis.topology import structure_graph, topology_key
+
+NETLIST = "V1 1 0 V\nR1 1 2 10\nL1 2 3 1m\nC1 3 0 1u\nR2 3 0 5"
+# The same topology, with other names, values and node names, and the components in another order
+RENAMED = "Ra a b 22\nVs a 0 Vs*sin(w*t)\nCx c 0 4.7u\nRb c 0 1k\nLx b c 2m"
+
+
+def components(netlist: str) -> list[Component]:
+    return Circuit(netlist).components
+
+
+class TestTopologyKey(unittest.TestCase):
+
+    def test_ignores_names_and_values(self):
+        self.assertEqual(
+            topology_key(structure_graph(components(NETLIST)), "1e-6"),
+            topology_key(structure_graph(components(RENAMED)), "1e-6"),
+        )
+
+    def test_depends_on_types_and_connections(self):
+        key = topology_key(structure_graph(components(NETLIST)))
+        # R2 becomes an inductor
+        self.assertNotEqual(key, topology_key(structure_graph(components(NETLIST.replace("R2 3 0 5", "L2 3 0 5m")))))
+        # R2 goes to node 2 instead of ground
+        self.assertNotEqual(key, topology_key(structure_graph(components(NETLIST.replace("R2 3 0", "R2 3 2")))))
+        self.assertNotEqual(key, topology_key(structure_graph(components(NETLIST)), "1e-6"))
+
+    def test_substitutions(self):
+        circuit = Circuit(NETLIST)
+        parts = [Component(c.name, c.nodes, sympy.Symbol(f"x{c.name}")) for c in circuit.components]
+        template = topology.identity_template(circuit, {c.name: c.value for c in parts})
+        substitutions = template.substitutions(circuit.components)
+        self.assertEqual(substitutions[sympy.Symbol("xR1")], 10)
+        self.assertEqual(substitutions[sympy.Symbol("xV1_{n}")], sympy.Symbol("V_{n}"))
+
+
+class TestShareTopology(unittest.TestCase):
+
+    def setUp(self):
+        topology.TEMPLATES.clear()
+
+    def tearDown(self):
+        topology.TEMPLATES.clear()
+
+    def assertSameSolutions(self, circuit: Circuit, reference: Circuit):
+        for solution in ("currents", "node_voltages", "states", "backward"):
+            expected = getattr(reference, solution)
+            results = getattr(circuit, solution)
+            self.assertEqual(results.keys(), expected.keys())
+            for key, expression in results.items():
+                self.assertEqual(sympy.simplify(expression - expected[key]), 0, f"{solution} {key}")
+
+    def test_same_as_solving_again(self):
+        first = Circuit(NETLIST, "1e-6", share_topology=True)
+        second = Circuit(RENAMED, "1e-6", share_topology=True)
+        self.assertIs(first._template.circuit, second._template.circuit)
+        self.assertNotIn("_solution", vars(first))
+        self.assertNotIn("_solution", vars(second))
+        self.assertSameSolutions(first, Circuit(NETLIST, "1e-6"))
+
+        self.assertSameSolutions(second, Circuit(RENAMED, "1e-6"))
+
+    def test_different_topology(self):
+        first = Circuit(NETLIST, share_topology=True)
+        second = Circuit(NETLIST.replace("R2 3 0", "R2 3 2"), share_topology=True)
+        self.assertIsNot(first._template.circuit, second._template.circuit)
+        self.assertEqual(sum(len(templates) for templates in topology.TEMPLATES.values()), 2)
+
+    def test_numeric(self):
+        circuit = Circuit(RENAMED, "1e-6", numeric=True, share_topology=True)
+        reference = Circuit(RENAMED, "1e-6", numeric=True)
+        for key, expression in circuit.states.items():
+            difference = sympy.expand(expression - reference.states[key])
+            self.assertTrue(all(abs(coefficient) < 1e-6 for coefficient in difference.as_coefficients_dict().values()))
+
+    def test_on_disk(self):
+        with tempfile.TemporaryDirectory() as directory:
+            Circuit(NETLIST, "1e-6", cache_dir=directory, share_topology=True).states
+            # Another process only has the on-disk cache
+            topology.TEMPLATES.clear()
+            circuit = Circuit(RENAMED, "1e-6", cache_dir=directory, share_topology=True)
+            template = circuit._template.circuit
+            self.assertIn("states", vars(template))
+            self.assertNotIn("_solution", vars(template))
+            self.assertSameSolutions(circuit, Circuit(RENAMED, "1e-6"))
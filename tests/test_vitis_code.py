@@ -0,0 +1,175 @@
+import argparse
+import io
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+
+import numpy as np
+import sympy as sp
+
+from rtds_circuit_analysis import Circuit
+from rtds_circuit_analysis.utils import CircuitError
+from rtds_vitis.matrix_code import print_matrix_code
+from rtds_vitis.parameters import parameter_values
+from rtds_vitis.testbench import write_testbench
+from rtds_vitis.vitis_code import (
+    count_operations,
+    format_equations,
+    get_equations,
+    get_inputs_and_states,
+    print_vitis_code,
+)
+
+
+def run_statements(code: str) -> dict[str, sp.Expr]:
+    """Replaces each temporary in the statements by its expression."""
+    values = {}
+    for line in code.strip().split("\n"):
+        name, expression = line.removeprefix("data_t ").rstrip(";").split(" = ")
+        values[sp.Symbol(name)] = sp.sympify(expression).xreplace(values)
+    return {str(name): value for name, value in values.items() if not str(name).startswith("cse")}
+
+
+class TestCommonSubexpressions(unittest.TestCase):
+
+    def setUp(self):
+        circuit = Circuit("V1 1 0 V\nR1 1 2 R1\nL1 2 3 L1\nC1 3 0 C1\nR2 3 4 R2\nL2 4 0 L2", "1e-6")
+        args = argparse.Namespace(forward=False, backward=False, trapezoidal=True)
+        self.equations = get_equations(circuit, args)
+        self.inputs, self.states = get_inputs_and_states(circuit.state_space())
+
+    def test_same_equations(self):
+        plain = run_statements(format_equations(self.equations, self.states, self.inputs))
+        shared = run_statements(format_equations(self.equations, self.states, self.inputs, cse=True))
+        self.assertEqual(plain.keys(), shared.keys())
+        for name, expression in plain.items():
+            self.assertEqual(sp.simplify(expression - shared[name]), 0)
+
+    def test_fewer_operations(self):
+        plain = count_operations(format_equations(self.equations, self.states, self.inputs))
+        shared = format_equations(self.equations, self.states, self.inputs, cse=True)
+        self.assertLess(count_operations(shared)[0], plain[0])
+        self.assertLessEqual(count_operations(shared)[1], plain[1])
+        # Reciprocals in data_t would be truncated to integers
+        self.assertNotIn("= 1/", shared)
+
+    def test_count_operations(self):
+        self.assertEqual(count_operations("x = a*b/c + d**2*e;"), (2, 1))
+
+
+class TestParameters(unittest.TestCase):
+
+    def setUp(self):
+        self.circuit = Circuit("tests/test_files/series_rlc.cir", "1e-6")
+        self.args = argparse.Namespace(
+            filepath="rlc.cir", fixed="32", point="16", forward=False, backward=False, trapezoidal=True, cse=False
+        )
+
+    def test_folded_equations(self):
+        parameters = {"R": 10, "L": 1e-3, "C": 1e-6}
+        symbolic = get_equations(self.circuit, self.args)
+        folded = get_equations(self.circuit, self.args, parameters)
+        values = {sp.Symbol(name): sp.nsimplify(value, rational=True) for name, value in parameters.items()}
+        for component, equation in folded.items():
+            # Each coefficient is a single number
+            self.assertTrue(all(term.as_coeff_Mul()[1].is_Symbol for term in sp.Add.make_args(equation.rhs)))
+            difference = equation.rhs - symbolic[component].rhs.xreplace(values)
+            self.assertEqual(sp.simplify(difference), 0)
+
+    def test_some_parameters(self):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            print_vitis_code(self.circuit, self.args, {"C": 1e-6})
+        code = output.getvalue()
+        self.assertIn("#define R data_t(CHANGEME)", code)
+        self.assertNotIn("#define C", code)
+
+    def test_unknown_parameter(self):
+        with self.assertRaises(CircuitError) as context:
+            get_equations(self.circuit, self.args, {"R2": 1})
+        self.assertIn("C, L, R", context.exception.message)
+
+    def test_parameter_file(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".txt") as file:
+            file.write("* Values for the series RLC\nR=10\n\nL = 1m\n")
+            file.flush()
+            args = argparse.Namespace(params=file.name, define=["R=20", "C=1u"])
+            self.assertEqual(parameter_values(args), {"R": 20, "L": 1e-3, "C": 1e-6})
+
+
+class TestMatrixForm(unittest.TestCase):
+
+    def setUp(self):
+        self.circuit = Circuit("V1 1 0 V\nR1 1 2 R1\nL1 2 3 1m\nC1 3 0 1m\nR2 3 4 2\nL2 4 0 2m", "1e-6")
+
+    def matrix_code(self, method: str, parameters: dict[str, float]) -> str:
+        methods = {name: name == method for name in ("forward", "backward", "trapezoidal")}
+        args = argparse.Namespace(filepath="ladder.cir", fixed="32", point="16", **methods)
+        output = io.StringIO()
+        with redirect_stdout(output):
+            print_matrix_code(self.circuit, args, parameters)
+        return output.getvalue()
+
+    def test_arrays_and_pragmas(self):
+        code = self.matrix_code("trapezoidal", {"R1": 1})
+        self.assertIn("const data_t PHI[3][3]", code)
+        self.assertIn("const data_t GAMMA_OLD[3][1]", code)
+        self.assertIn("#pragma HLS PIPELINE II=1", code)
+        self.assertIn("#pragma HLS ARRAY_PARTITION variable=PHI complete dim=2", code)
+        self.assertIn("void ladder(uint1_t sinc, data_t V, data_t *IL1, data_t *IL2, data_t *VC1){", code)
+
+    def test_backward_has_no_old_inputs(self):
+        code = self.matrix_code("backward", {"R1": 1})
+        self.assertNotIn("GAMMA_OLD", code)
+        self.assertNotIn("u_old", code)
+
+    def test_literal_values(self):
+        with self.assertRaises(CircuitError) as context:
+            self.matrix_code("backward", {})
+        self.assertIn("R1", context.exception.message)
+
+
+class TestTestbench(unittest.TestCase):
+
+    def setUp(self):
+        self.circuit = Circuit("V1 1 0 V\nR1 1 2 10\nL1 2 3 1m\nC1 3 0 1u", "1e-6")
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, method: str, **options) -> tuple[str, np.ndarray]:
+        methods = {name: name == method for name in ("forward", "backward", "trapezoidal")}
+        options = {"steps": 300, "tolerance": None, "input": ["V=1"], "cse": False, "matrix": False} | options
+        args = argparse.Namespace(
+            filepath="rlc.cir", fixed="32", point="16", testbench=self.directory.name, **methods, **options
+        )
+        with redirect_stderr(io.StringIO()):
+            testbench, golden = write_testbench(self.circuit, args, {})
+        return testbench.read_text(), np.loadtxt(golden, delimiter=",", skiprows=1, ndmin=2)
+
+    def test_golden_vectors(self):
+        _, golden = self.write("backward")
+        self.assertEqual(golden.shape, (300, 3))
+        # The first call to the top function gives the states after one step
+        result = self.circuit.simulate({"V": np.ones(301)}, method="backward")
+        np.testing.assert_allclose(golden[:, 1], result.states["IL1"][1:])
+        np.testing.assert_allclose(golden[:, 2], result.states["VC1"][1:])
+
+    def test_testbench(self):
+        code, _ = self.write("trapezoidal", tolerance=0.01)
+        self.assertIn("void rlc(uint1_t sinc, data_t V, data_t *IL1, data_t *VC1);", code)
+        self.assertIn("#define TOLERANCE 0.01", code)
+        self.assertIn("rlc(sinc, data_t(V), &IL1, &VC1);", code)
+        self.assertIn('fopen("rlc_golden.csv", "r")', code)
+
+    def test_steps_from_inputs(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".txt") as file:
+            np.savetxt(file, np.linspace(0, 1, 50))
+            file.flush()
+            _, golden = self.write("forward", steps=None, input=[f"V={file.name}"])
+        np.testing.assert_allclose(golden[:, 0], np.linspace(0, 1, 50))
+        with self.assertRaises(CircuitError):
+            self.write("forward", steps=None)
+
+
+if __name__ == "__main__":
+    unittest.main()